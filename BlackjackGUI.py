@@ -1,4 +1,5 @@
 # BlackjackGUI.py
+import multiprocessing
 import threading
 import tkinter as tk
 from os import path
@@ -132,112 +133,119 @@ def run_specific_card_OCR_Test():
         print("Specific Card BBox not set.")
 
 
-# --- Tkinter GUI setup ---
-root = tk.Tk()
-root.title("Blackjack Controller")
-
-frame = tk.Frame(root, padx=10, pady=10)
-frame.pack()
-
-# Run / Stop main buttons
-run_button = tk.Button(
-    frame, text="Start Blackjack Main", command=run_main, width=25, height=2
-)
-run_button.pack(pady=5)
-
-stop_button = tk.Button(
-    frame, text="Stop Blackjack Main", command=stop_main, width=25, height=2
-)
-stop_button.pack(pady=5)
-
-# Update bbox buttons
-dealer_button = tk.Button(
-    frame,
-    text="Set Dealer BBox",
-    command=lambda: [update_dealer(), refresh_vars()],
-    width=25,
-)
-dealer_button.pack(pady=5)
-
-player_button = tk.Button(
-    frame,
-    text="Set Player Table BBox",
-    command=lambda: [update_player_table(), refresh_vars()],
-    width=25,
-)
-player_button.pack(pady=5)
-
-button_bbox_button = tk.Button(
-    frame,
-    text="Set Button BBox",
-    command=lambda: [update_button_bbox(), refresh_vars()],
-    width=25,
-)
-button_bbox_button.pack(pady=5)
-
-specific_card_button = tk.Button(
-    frame,
-    text="Set Specific Card BBox",
-    command=lambda: [update_specific_card_bbox(), refresh_vars()],
-    width=25,
-)
-specific_card_button.pack(pady=5)
-
-
-# Dynamic dealer toggle
-def toggle_dynamic_dealer():
-    current_value = ReadVars.read_tuples_from_file("Vars.txt").get("dynamicDealer")
-    new_value = 0 if current_value == 1 else 1
-    ReadVars.update_var_in_file("dynamicDealer", new_value)
-    refresh_vars()
+if __name__ == "__main__":
+    # Frozen builds start OCR worker processes through this entry point
+    multiprocessing.freeze_support()
+
+    # --- Tkinter GUI setup ---
+    root = tk.Tk()
+    root.title("Blackjack Controller")
+
+    frame = tk.Frame(root, padx=10, pady=10)
+    frame.pack()
+
+    # Run / Stop main buttons
+    run_button = tk.Button(
+        frame, text="Start Blackjack Main", command=run_main, width=25, height=2
+    )
+    run_button.pack(pady=5)
+
+    stop_button = tk.Button(
+        frame, text="Stop Blackjack Main", command=stop_main, width=25, height=2
+    )
+    stop_button.pack(pady=5)
+
+    # Update bbox buttons
+    dealer_button = tk.Button(
+        frame,
+        text="Set Dealer BBox",
+        command=lambda: [update_dealer(), refresh_vars()],
+        width=25,
+    )
+    dealer_button.pack(pady=5)
+
+    player_button = tk.Button(
+        frame,
+        text="Set Player Table BBox",
+        command=lambda: [update_player_table(), refresh_vars()],
+        width=25,
+    )
+    player_button.pack(pady=5)
+
+    button_bbox_button = tk.Button(
+        frame,
+        text="Set Button BBox",
+        command=lambda: [update_button_bbox(), refresh_vars()],
+        width=25,
+    )
+    button_bbox_button.pack(pady=5)
 
+    specific_card_button = tk.Button(
+        frame,
+        text="Set Specific Card BBox",
+        command=lambda: [update_specific_card_bbox(), refresh_vars()],
+        width=25,
+    )
+    specific_card_button.pack(pady=5)
+
+    # Dynamic dealer toggle
+    def toggle_dynamic_dealer():
+        current_value = ReadVars.read_tuples_from_file("Vars.txt").get("dynamicDealer")
+        new_value = 0 if current_value == 1 else 1
+        ReadVars.update_var_in_file("dynamicDealer", new_value)
+        refresh_vars()
+
+    dynamic_dealer_button = tk.Button(
+        frame,
+        text="Toggle Dynamic Dealer BBox",
+        command=toggle_dynamic_dealer,
+        width=25,
+    )
+    dynamic_dealer_button.pack(pady=5)
+
+    # Labels showing current values
+    dealer_label = tk.Label(frame, text="Dealer: ")
+    dealer_label.pack()
+    player_label = tk.Label(frame, text="Player Table: ")
+    player_label.pack()
+    button_label = tk.Label(frame, text="Button: ")
+    button_label.pack()
+    dynamic_dealer_label = tk.Label(frame, text="Dynamic Dealer BBox: (1=Yes, 0=No)")
+    dynamic_dealer_label.pack()
+    specific_card_label = tk.Label(frame, text="Specific Card BBox: ")
+    specific_card_label.pack()
+    surrender_specific = tk.Label(
+        frame, text="Hit on 15 instead of surrender w/ 7 or 8: "
+    )
+    surrender_specific.pack()
+
+    # Test buttons
+    number_grabber_button = tk.Button(
+        frame, text="Run NumberGrabber", command=run_NumberGrabber, width=25, height=2
+    )
+    number_grabber_button.pack(pady=5)
+
+    ocr_test_button = tk.Button(
+        frame, text="Run OCR Test", command=run_OCR_Test, width=25, height=2
+    )
+    ocr_test_button.pack(pady=5)
+
+    specific_card_test = tk.Button(
+        frame,
+        text="Run Specific Card OCR Test",
+        command=run_specific_card_OCR_Test,
+        width=25,
+        height=2,
+    )
+    specific_card_test.pack(pady=5)
+
+    # Instruction note
+    note_label = tk.Label(
+        frame, text="Press F8 to start/stop script. Press ESC to exit.", fg="blue"
+    )
+    note_label.pack(pady=10)
+
+    # Refresh on start
+    refresh_vars()
 
-dynamic_dealer_button = tk.Button(
-    frame, text="Toggle Dynamic Dealer BBox", command=toggle_dynamic_dealer, width=25
-)
-dynamic_dealer_button.pack(pady=5)
-
-# Labels showing current values
-dealer_label = tk.Label(frame, text="Dealer: ")
-dealer_label.pack()
-player_label = tk.Label(frame, text="Player Table: ")
-player_label.pack()
-button_label = tk.Label(frame, text="Button: ")
-button_label.pack()
-dynamic_dealer_label = tk.Label(frame, text="Dynamic Dealer BBox: (1=Yes, 0=No)")
-dynamic_dealer_label.pack()
-specific_card_label = tk.Label(frame, text="Specific Card BBox: ")
-specific_card_label.pack()
-surrender_specific = tk.Label(frame, text="Hit on 15 instead of surrender w/ 7 or 8: ")
-surrender_specific.pack()
-
-# Test buttons
-number_grabber_button = tk.Button(
-    frame, text="Run NumberGrabber", command=run_NumberGrabber, width=25, height=2
-)
-number_grabber_button.pack(pady=5)
-
-ocr_test_button = tk.Button(
-    frame, text="Run OCR Test", command=run_OCR_Test, width=25, height=2
-)
-ocr_test_button.pack(pady=5)
-
-specific_card_test = tk.Button(
-    frame,
-    text="Run Specific Card OCR Test",
-    command=run_specific_card_OCR_Test,
-    width=25,
-    height=2,
-)
-specific_card_test.pack(pady=5)
-
-# Instruction note
-note_label = tk.Label(
-    frame, text="Press F8 to start/stop script. Press ESC to exit.", fg="blue"
-)
-note_label.pack(pady=10)
-
-# Refresh on start
-refresh_vars()
-
-root.mainloop()
+    root.mainloop()
@@ -1,35 +1,45 @@
 import cv2
 import numpy as np
-from PIL import ImageGrab
 import os
+import color_classes
 import resource_path
+import screen_capture
 
 # Path to your folder of images
 image_folder = r"BJ Buttons"
 image_folder = resource_path.resource_path(image_folder)
 
-# Image pairs with their specific color ranges (lower, upper)
+# Image pairs with the color class (HSV range in color_classes) of the available state
 image_pairs = [
-    ("SplitAvailable.PNG", "SplitUnavailable.PNG", np.array([28, 255, 223]), np.array([28, 255, 236])),
-    ("DoubleAvailable.PNG", "DoubleUnavailable.PNG", np.array([45, 193, 245]), np.array([45, 194, 255])),
-    ("SurrenderAvailable.PNG", "SurrenderUnavailable.PNG", np.array([0, 0, 242]), np.array([60, 5, 255]))
+    ("SplitAvailable.PNG", "SplitUnavailable.PNG", color_classes.SPLIT_AVAILABLE),
+    ("DoubleAvailable.PNG", "DoubleUnavailable.PNG", color_classes.DOUBLE_AVAILABLE),
+    ("SurrenderAvailable.PNG", "SurrenderUnavailable.PNG", color_classes.SURRENDER_AVAILABLE)
 ]
 
-# Create dictionary: available_image -> (unavailable_image, lower_color, upper_color)
-pair_dict = {pair[0]: (pair[1], pair[2], pair[3]) for pair in image_pairs}
+# Create dictionary: available_image -> (unavailable_image, color_class)
+pair_dict = {pair[0]: (pair[1], pair[2]) for pair in image_pairs}
 
-# Screen bbox
-def check_buttons(bbox):
-    # Grab screen
-    screenshot = ImageGrab.grab(bbox=bbox)
-    screen_img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+# OPTIMIZATION: templates are read from disk once instead of on every scan
+_template_cache = {}
+
+def load_template(template_name):
+    if template_name not in _template_cache:
+        _template_cache[template_name] = cv2.imread(os.path.join(image_folder, template_name))
+    return _template_cache[template_name]
+
+# Screen bbox, or an already captured BGR image of it. names limits the scan to those templates
+def check_buttons(bbox, screen_img=None, names=None):
+    if screen_img is None:
+        # Grab screen
+        screen_img = cv2.cvtColor(screen_capture.grab(bbox), cv2.COLOR_RGB2BGR)
+    # OPTIMIZATION: classify every pixel once, each region test is then a slice
+    screen_classes = color_classes.classify(screen_img)
 
     def find_image_location(template_name, screen_img, threshold=0.5):
         """Returns top-left and bottom-right coordinates of the detected image, or None."""
-        template_path = os.path.join(image_folder, template_name)
-        template = cv2.imread(template_path)
+        template = load_template(template_name)
         if template is None:
-            print(f"Error: Could not load template {template_path}")
+            print(f"Error: Could not load template {os.path.join(image_folder, template_name)}")
             return None
 
         # Rescale template if larger than screen region
@@ -53,8 +63,8 @@ def check_buttons(bbox):
             return top_left, bottom_right
         return None
 
-    def is_color_in_region(img, top_left, bottom_right, lower_color, upper_color):
-        """Checks if a given color exists in the detected region."""
+    def is_color_in_region(classes, top_left, bottom_right, color_class):
+        """Checks if a given color class exists in the detected region."""
         y1, y2 = top_left[1], bottom_right[1]
         x1, x2 = top_left[0], bottom_right[0]
 
@@ -62,33 +72,27 @@ def check_buttons(bbox):
             print("Warning: Invalid region coordinates!")
             return False
 
-        region = img[y1:y2, x1:x2]
+        region = classes[y1:y2, x1:x2]
 
         if region.size == 0:
             print("Warning: Empty region!")
             return False
 
-        # Convert region to HSV
-        region_hsv = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
-
-        # Create mask using HSV color range
-        mask = cv2.inRange(region_hsv, lower_color, upper_color)
-        count = cv2.countNonZero(mask)
-        #print count and lower/upper bounds for debugging
-        #print(f"Color check in region: count={count}, lower={lower_color}, upper={upper_color}")
-        return count > 0
+        return color_classes.has_class(region, color_class)
 
     # Get all images in folder
     all_images = [f for f in os.listdir(image_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    if names is not None:
+        all_images = [f for f in all_images if f in names]
 
     detected_images = {}
     for key in pair_dict:
-        if key in all_images:
+        if key in all_images and pair_dict[key][0] in all_images:
             all_images.remove(key)
             all_images.remove(pair_dict[key][0])  # Remove unavailable version too
             detection = find_image_location(key, screen_img)
             if detection:
-                if is_color_in_region(screen_img, detection[0], detection[1], pair_dict[key][1], pair_dict[key][2]):
+                if is_color_in_region(screen_classes, detection[0], detection[1], pair_dict[key][1]):
                     detected_images[key] = detection
                 else:
                     detected_images[pair_dict[key][0]] = detection
@@ -8,11 +8,12 @@ from skimage.metrics import structural_similarity as ssim
 
 import find_player
 import resource_path
+import screen_capture
 
 dealer = (983, 310, 1010, 330)
 
-PLAYER_DIR = "captured_cards/player"
-DEALER_DIR = "captured_cards/dealer"
+PLAYER_DIR = "Captured_Cards/player"
+DEALER_DIR = "Captured_Cards/dealer"
 
 PLAYER_DIR = resource_path.resource_path(PLAYER_DIR)
 DEALER_DIR = resource_path.resource_path(DEALER_DIR)
@@ -60,13 +61,18 @@ def imageCheck():
 
 
 # OPTIMIZATION: Initialize PaddleOCR with minimal settings for speed
-paddle_ocr_model = PaddleOCR(
-    use_angle_cls=False,  # Disable angle classification (cards are always upright)
-    use_doc_orientation_classify=False,
-    use_doc_unwarping=False,
-    device="gpu",
-    enable_mkldnn=True,
-)
+def create_ocr_model():
+    """PaddleOCR predictors are not thread-safe, each worker thread needs its own"""
+    return PaddleOCR(
+        use_angle_cls=False,  # Disable angle classification (cards are always upright)
+        use_doc_orientation_classify=False,
+        use_doc_unwarping=False,
+        device="gpu",
+        enable_mkldnn=True,
+    )
+
+
+paddle_ocr_model = create_ocr_model()
 
 valid_values = set(
     [
@@ -140,13 +146,54 @@ def normalize_ocr_result(text, mode="player"):
     return text
 
 
-def ocr_card(bbox, scale_factor=2, mode="player", debug=False):
+# Preprocessing settings, set from Vars.txt with configure_preprocessing.
+# A scale_factor of None in the functions below means these.
+preprocessing = {
+    "scale": 2,
+    "interpolation": "cubic",
+    "adaptive_block": 11,
+    "adaptive_c": 2,
+    "specific_scale": 5,
+    "specific_interpolation": "cubic",
+}
+
+# Vars.txt name -> preprocessing key
+PREPROCESSING_VARS = {
+    "ocrScale": "scale",
+    "ocrInterpolation": "interpolation",
+    "ocrAdaptiveBlock": "adaptive_block",
+    "ocrAdaptiveC": "adaptive_c",
+    "specificScale": "specific_scale",
+    "specificInterpolation": "specific_interpolation",
+}
+
+INTERPOLATIONS = {
+    "nearest": cv2.INTER_NEAREST,
+    "linear": cv2.INTER_LINEAR,
+    "cubic": cv2.INTER_CUBIC,
+    "area": cv2.INTER_AREA,
+    "lanczos": cv2.INTER_LANCZOS4,
+}
+
+
+def configure_preprocessing(config):
+    """Apply the PREPROCESSING_VARS found in a Vars.txt dict, or preprocessing keys"""
+    for name, value in config.items():
+        key = PREPROCESSING_VARS.get(name, name)
+        if key not in preprocessing:
+            continue
+        if key.endswith("interpolation") and value not in INTERPOLATIONS:
+            print(f"WARNING: Unknown interpolation '{value}' for {name}, keeping cubic")
+            continue
+        preprocessing[key] = value
+
+
+def ocr_card(bbox, scale_factor=None, mode="player", debug=False):
     """
     OPTIMIZED: OCR card detection with single-pass approach.
     Removed max_retries parameter (not used) and multiple preprocessing attempts.
     """
-    screen_shot = ImageGrab.grab(bbox=bbox)
-    img = np.array(screen_shot)
+    img = screen_capture.grab(bbox)
     img_rgb = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
 
     if debug:
@@ -160,24 +207,66 @@ def ocr_card(bbox, scale_factor=2, mode="player", debug=False):
         print(f"ERROR: Image too small ({width}x{height}) from bbox {bbox}")
         return None
 
+    return ocr_card_image(img_rgb, scale_factor=scale_factor, mode=mode, debug=debug)
+
+
+# ocr_card_image tries these in order until one gives a valid read
+PREPROCESSING_METHODS = ("otsu", "original", "adaptive")
+
+
+def _upscale(img_rgb, scale_factor=None, interpolation=None):
+    scale_factor = scale_factor or preprocessing["scale"]
+    interpolation = interpolation or preprocessing["interpolation"]
+    height, width = img_rgb.shape[:2]
     # OPTIMIZATION: Only resize once with optimal settings
-    img_resized = cv2.resize(
+    return cv2.resize(
         img_rgb,
-        (width * scale_factor, height * scale_factor),
-        interpolation=cv2.INTER_CUBIC,
+        (round(width * scale_factor), round(height * scale_factor)),
+        interpolation=INTERPOLATIONS[interpolation],
     )
 
-    if debug:
-        cv2.imwrite(f"debug_{mode}_resized.png", img_resized)
-        print(f"Debug: Resized to {img_resized.shape}")
+
+def _adaptive_threshold(gray):
+    return cv2.cvtColor(
+        cv2.adaptiveThreshold(
+            gray,
+            255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            preprocessing["adaptive_block"],
+            preprocessing["adaptive_c"],
+        ),
+        cv2.COLOR_GRAY2BGR,
+    )
+
+
+def _upscale_and_otsu(img_rgb, scale_factor):
+    """Shared preprocessing: one resize, grayscale and OTSU threshold."""
+    img_resized = _upscale(img_rgb, scale_factor)
 
     # OPTIMIZATION: Try only the best preprocessing method first (OTSU)
     # Most cards read well with OTSU thresholding
     gray = cv2.cvtColor(img_resized, cv2.COLOR_BGR2GRAY)
     _, thresh_otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     thresh_otsu_bgr = cv2.cvtColor(thresh_otsu, cv2.COLOR_GRAY2BGR)
+    return img_resized, gray, thresh_otsu_bgr
+
+
+def ocr_card_image(img_rgb, scale_factor=None, mode="player", debug=False):
+    """
+    OCR an already captured BGR image with the same pipeline as ocr_card.
+    Lets callers crop several cards from one screenshot instead of grabbing each.
+    """
+    height, width = img_rgb.shape[:2]
+    if height < 10 or width < 10:
+        print(f"ERROR: Image too small ({width}x{height})")
+        return None
+
+    img_resized, gray, thresh_otsu_bgr = _upscale_and_otsu(img_rgb, scale_factor)
 
     if debug:
+        cv2.imwrite(f"debug_{mode}_resized.png", img_resized)
+        print(f"Debug: Resized to {img_resized.shape}")
         cv2.imwrite(f"debug_{mode}_otsu.png", thresh_otsu_bgr)
 
     try:
@@ -219,15 +308,7 @@ def ocr_card(bbox, scale_factor=2, mode="player", debug=False):
 
     fallback_methods = [
         ("original", img_resized),
-        (
-            "adaptive",
-            cv2.cvtColor(
-                cv2.adaptiveThreshold(
-                    gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-                ),
-                cv2.COLOR_GRAY2BGR,
-            ),
-        ),
+        ("adaptive", _adaptive_threshold(gray)),
     ]
 
     for method_name, processed_img in fallback_methods:
@@ -256,27 +337,124 @@ def ocr_card(bbox, scale_factor=2, mode="player", debug=False):
     return None
 
 
-def ocr_specific_card(bbox, scale_factor=5, debug=False):
+def preprocess_card_image(img_rgb, method="otsu", scale_factor=None):
+    """One of the PREPROCESSING_METHODS on its own, without the others' work"""
+    if method == "otsu":
+        return _upscale_and_otsu(img_rgb, scale_factor)[2]
+    img_resized = _upscale(img_rgb, scale_factor)
+    if method == "original":
+        return img_resized
+    if method == "adaptive":
+        return _adaptive_threshold(cv2.cvtColor(img_resized, cv2.COLOR_BGR2GRAY))
+    raise ValueError(f"Unknown preprocessing method: {method}")
+
+
+def read_card_image(
+    img_rgb, method="otsu", scale_factor=None, mode="player", model=None
+):
+    """
+    Read a card with one preprocessing method and no fallbacks.
+    Returns (label, confidence), label is None when the read isn't a valid total.
+    """
+    processed = preprocess_card_image(img_rgb, method, scale_factor)
+    try:
+        result = (model or paddle_ocr_model).predict(processed)
+    except Exception:
+        return None, 0.0
+    if not result or not result[0] or not result[0].get("rec_texts"):
+        return None, 0.0
+    normalized_text = normalize_ocr_result(result[0]["rec_texts"][0], mode)
+    if not normalized_text or normalized_text not in valid_values:
+        return None, 0.0
+    scores = result[0].get("rec_scores")
+    return normalized_text, float(scores[0]) if scores else 0.0
+
+
+def ocr_card_images(images, scale_factor=None, mode="player"):
+    """
+    OPTIMIZED: OCR several card images with one batched OTSU predict call.
+    Images the batch can't read go through the single-image fallbacks.
+    """
+    return [label for label, _ in recognize_card_images(images, scale_factor, mode)]
+
+
+def recognize_card_images(images, scale_factor=None, mode="player"):
+    """
+    Same as ocr_card_images but returns (label, confidence) pairs.
+    Reads that needed a fallback method report that method's score.
+    """
+    results = [(None, 0.0)] * len(images)
+    batch = []
+    batch_indices = []
+    for index, img_rgb in enumerate(images):
+        height, width = img_rgb.shape[:2]
+        if height < 10 or width < 10:
+            continue
+        batch.append(_upscale_and_otsu(img_rgb, scale_factor)[2])
+        batch_indices.append(index)
+
+    if not batch:
+        return results
+
+    # The batch already tried OTSU unless predict itself failed
+    fallbacks = PREPROCESSING_METHODS[1:]
+    try:
+        predictions = paddle_ocr_model.predict(batch)
+        for index, prediction in zip(batch_indices, predictions):
+            if prediction and prediction.get("rec_texts"):
+                normalized_text = normalize_ocr_result(prediction["rec_texts"][0], mode)
+                if normalized_text and normalized_text in valid_values:
+                    scores = prediction.get("rec_scores")
+                    results[index] = (
+                        normalized_text,
+                        float(scores[0]) if scores else 0.0,
+                    )
+    except Exception:
+        fallbacks = PREPROCESSING_METHODS
+
+    for index in batch_indices:
+        if results[index][0] is not None:
+            continue
+        for method in fallbacks:
+            label, confidence = read_card_image(
+                images[index], method, scale_factor=scale_factor, mode=mode
+            )
+            if label is not None:
+                results[index] = (label, confidence)
+                break
+    return results
+
+
+def grab_region(bbox):
+    """Capture a screen region as a BGR image"""
+    return cv2.cvtColor(screen_capture.grab(bbox), cv2.COLOR_RGB2BGR)
+
+
+def ocr_specific_card(bbox, scale_factor=None, debug=False):
     """OPTIMIZED: Simplified specific card OCR."""
-    screen_shot = ImageGrab.grab(bbox=bbox)
-    img = np.array(screen_shot)
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    return ocr_specific_card_image(
+        grab_region(bbox), scale_factor=scale_factor, debug=debug, bbox=bbox
+    )
 
+
+def ocr_specific_card_image(
+    img_rgb, scale_factor=None, debug=False, bbox=None, model=None
+):
+    """Specific card OCR on an already captured image. Worker threads pass their own model."""
     if debug:
         cv2.imwrite("debug_specific_card_bbox.png", img_rgb)
 
-    height, width = img_rgb.shape[:2]
-    img_resized = cv2.resize(
+    img_resized = _upscale(
         img_rgb,
-        (width * scale_factor, height * scale_factor),
-        interpolation=cv2.INTER_CUBIC,
+        scale_factor or preprocessing["specific_scale"],
+        preprocessing["specific_interpolation"],
     )
 
     if debug:
         cv2.imwrite("debug_specific_card_resized.png", img_resized)
 
     try:
-        result = paddle_ocr_model.predict(img_resized)
+        result = (model or paddle_ocr_model).predict(img_resized)
 
         if debug:
             print(f"Debug: OCR result: {result}")
@@ -320,12 +498,19 @@ def ocr_card_old(
     """
     Legacy SSIM-based card detection. Only use this if you specifically want SSIM method.
     """
-    if mode not in ["player", "dealer"]:
-        raise ValueError(f"Invalid mode: {mode}. Must be 'player' or 'dealer'")
-
     screen_shot = ImageGrab.grab(bbox=bbox)
     img = np.array(screen_shot)
     img_rgb = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    return ocr_card_old_image(img_rgb, mode, resize_dim, show_images, ssim_threshold)
+
+
+def ocr_card_old_image(
+    img_rgb, mode, resize_dim=(200, 200), show_images=False, ssim_threshold=0.05
+):
+    """ocr_card_old on an already captured BGR image"""
+    if mode not in ["player", "dealer"]:
+        raise ValueError(f"Invalid mode: {mode}. Must be 'player' or 'dealer'")
+
     img_resized = cv2.resize(img_rgb, resize_dim, interpolation=cv2.INTER_CUBIC)
 
     folder = PLAYER_DIR if mode == "player" else DEALER_DIR
@@ -1,6 +1,3 @@
-import boundingbox
-import resource_path
-
 import ast
 import resource_path
 
@@ -62,10 +59,16 @@ def update_var_in_file(var_name, value, filename="Vars.txt"):
 
 
 
+def _pick_bbox():
+    # Imported here so reading Vars.txt doesn't pull in pyautogui (and tkinter)
+    import boundingbox
+    return boundingbox.pick_bbox()
+
+
 def setDealerBbox():
     global dealer
     print("Select dealer bounding box")
-    dealer = boundingbox.pick_bbox()
+    dealer = _pick_bbox()
     print("Dealer bbox set to:", dealer)
     update_var_in_file("dealer", dealer)
     return dealer
@@ -74,7 +77,7 @@ def setDealerBbox():
 def setPlayerTableBbox():
     global playerTable
     print("Select player table bounding box")
-    playerTable = boundingbox.pick_bbox()
+    playerTable = _pick_bbox()
     print("Player table bbox set to:", playerTable)
     update_var_in_file("playerTable", playerTable)
     return playerTable
@@ -83,7 +86,7 @@ def setPlayerTableBbox():
 def setButtonBbox():
     global buttonBbox
     print("Select button bounding box")
-    buttonBbox = boundingbox.pick_bbox()
+    buttonBbox = _pick_bbox()
     print("Button bbox set to:", buttonBbox)
     update_var_in_file("buttonBbox", buttonBbox)
     return buttonBbox
@@ -91,7 +94,7 @@ def setButtonBbox():
 def setSpecificCardBbox():
     global specificCardBbox
     print("Select specific card bounding box")
-    specificCardBbox = boundingbox.pick_bbox()
+    specificCardBbox = _pick_bbox()
     print("Specific card bbox set to:", specificCardBbox)
     update_var_in_file("specificCard", specificCardBbox)
     return specificCardBbox
@@ -1,41 +1,162 @@
+import math
 import time
-from typing import Dict
-
-import keyboard
+from typing import Dict, Optional
 
+import color_classes
+import OCR
 import resource_path
 
-from .enums import Action, GamePhase
+from .enums import Action, Detector, Event, GamePhase
 from .game.action_executor import ActionExecutor
 from .game.button_manager import ButtonManager
 from .game.card_reader import CardReader
-from .models import GameState, Statistics
+from .game.hand_validator import HandValidator
+from .game.input_backend import InputBackend, create_input_backend
+from .game.poll_scheduler import PollScheduler
+from .game.state_machine import GameStateMachine
+from .models import ButtonSnapshot, GameState, Statistics
+from .history.store import (
+    CTX_COMPOSITION_HIT,
+    CTX_DEVIATIONS,
+    CTX_DOUBLE_OFFERED,
+    CTX_FIRST,
+    CTX_SPLIT_HAND,
+    CTX_SPLIT_OFFERED,
+    FLAG_TIMEOUT,
+    HandHistory,
+    HandRecord,
+)
+from .recognition import RecognitionService
+from .recognition.cascade import RecognizerCascade
 from .strategy.decider import StrategyDecider
+from .strategy.deviations import DeviationEngine
 from .strategy.tables import StrategyTables
+from .utils.event_log import event_log
+from .utils.flight_recorder import FlightRecorder
 
 
 class BlackjackBot:
     """Main bot controller that orchestrates all components"""
 
-    def __init__(self, config: Dict):
-        strategy_sheet = resource_path.resource_path("Strategy.xlsx")
+    def __init__(
+        self,
+        config: Dict,
+        input_backend: Optional[InputBackend] = None,
+        recognition: Optional[RecognitionService] = None,
+        history: Optional[HandHistory] = None,
+        table: int = 0,
+    ):
+        event_log.configure(
+            quiet=config.get("logQuiet", 0) == 1,
+            path=config.get("logFile", "bot_events.log"),
+        )
+        strategy_sheet = resource_path.resource_path(
+            config.get("strategySheet", "Strategy.xlsx")
+        )
         self.strategy_tables = StrategyTables(strategy_sheet)
+        self.deviations = None
+        if config.get("deviations", 0) == 1:
+            self.deviations = DeviationEngine.from_file(
+                "Deviations.txt",
+                config.get("decks", 8),
+                config.get("penetration", 0.75),
+                config.get("countCardsPerRound", 5.4),
+            )
         self.strategy_decider = StrategyDecider(
-            self.strategy_tables, config.get("surrender15Specific", 0)
+            self.strategy_tables, config.get("surrender15Specific", 0), self.deviations
         )
+        # Only the 15v10 rule looks at the specific card
+        self.uses_specific_card = config.get("surrender15Specific", 0) == 1
+        OCR.configure_preprocessing(config)
+        # A service passed in is shared with other tables and closed by its owner
+        self.recognition = recognition
+        self._owns_recognition = False
+        workers = config.get("recognitionWorkers", 0)
+        if recognition is None and workers > 0:
+            print(f"Starting {workers} OCR worker processes...")
+            self.recognition = RecognitionService(workers)
+            if not self.recognition.wait_ready():
+                event_log.warning(
+                    "recognition_unhealthy",
+                    "WARNING: OCR workers didn't start, recognizing in process",
+                )
+            self._owns_recognition = True
+        cascade = None
+        if config.get("recognizerCascade", 0) == 1:
+            thresholds = config.get("cascadeThresholds")
+            if not thresholds:
+                event_log.warning(
+                    "cascade_uncalibrated",
+                    "WARNING: No cascadeThresholds in the config, every read goes "
+                    "to PaddleOCR until the cascade is calibrated",
+                )
+            cascade = RecognizerCascade.default(self.recognition, thresholds)
         self.card_reader = CardReader(
             config.get("playerTable"),
             config.get("dealer"),
             config.get("dynamicDealer"),
             config.get("specificCard"),
+            self.recognition,
+            cascade,
+            config.get("voteFrames", 3),
+            config.get("voteSeconds", 0.25),
+            config.get("voteConfidence", 0.9),
         )
-        self.button_manager = ButtonManager(config.get("buttonBbox"))
+        if self.uses_specific_card:
+            self.card_reader.warm_prefetch_model()
+        self.button_manager = ButtonManager(
+            config.get("buttonBbox"),
+            input_backend
+            or create_input_backend(config.get("inputBackend", "lowlatency")),
+        )
+        print("Building color lookup table...")
+        color_classes.get_lut()
         self.stats = Statistics()
+        self.recorder = None
+        recorder_ticks = config.get("flightRecorderTicks", 16)
+        if recorder_ticks > 0:
+            self.recorder = FlightRecorder(
+                {
+                    "player": config.get("playerTable"),
+                    "dealer": config.get("dealer"),
+                    "buttons": config.get("buttonBbox"),
+                    "specific": config.get("specificCard"),
+                },
+                recorder_ticks,
+            )
         self.executor = ActionExecutor(
-            self.button_manager, self.card_reader, self.strategy_decider, self.stats
+            self.button_manager,
+            self.card_reader,
+            self.strategy_decider,
+            self.stats,
+            self.recorder,
         )
         self.game_state = GameState()
+        self.validator = HandValidator()
+        self.state_machine = GameStateMachine()
+        self.state_machine.on_transition(self.on_phase_change)
+        self.poll_scheduler = PollScheduler(cpu_budget=config.get("cpuBudget", 0))
+        # Like the recognition service, a history passed in belongs to the caller
+        self.table = table
+        self.history = history
+        self._owns_history = False
+        history_folder = config.get("handHistory", "hand_history")
+        if history is None and history_folder:
+            self.history = HandHistory(history_folder)
+            self._owns_history = True
+        self.hand_record: Optional[HandRecord] = None
+        # CTX_* bits of the decision being made, logged for the strategy audit
+        self.decision_context = 0
+        self._phase_handlers = {
+            GamePhase.DEALING: self.handle_idle,
+            GamePhase.WAITING_FOR_REBET: self.handle_waiting_for_rebet,
+            GamePhase.ACTIVE_GAME: self.handle_active_game,
+            GamePhase.WAITING_FOR_CARD_CHANGE: self.handle_waiting_for_card_change,
+            GamePhase.HAND_COMPLETE: self.handle_idle,
+        }
         self.running = False
+        # Set by toggle_running on the hotkey or daemon thread, handled by the loop
+        self._resync_pending = False
 
     def toggle_running(self):
         """Toggle bot on/off"""
@@ -43,38 +164,132 @@ class BlackjackBot:
         print("Script running:", self.running)
         if self.running and self.stats.start_time is None:
             self.stats.start_time = time.time()
+        if self.running:
+            # The table may have moved on while paused. The loop thread owns the
+            # state machine, so it resyncs on its next tick.
+            self._resync_pending = True
         if not self.running and self.stats.start_time is not None:
+            # Let queued events print before the stats
+            event_log.flush()
             self.stats.print_stats()
+            self.card_reader.print_stats()
+            self.validator.print_stats()
+            self.button_manager.print_stats(self.stats.hands_played)
+            self.button_manager.input.latency.print_stats()
+            self.poll_scheduler.print_stats()
+            if self.recorder:
+                self.recorder.print_stats()
+            if self.history:
+                self.history.flush()
+                self.history.print_stats()
+            if self.deviations:
+                self.deviations.print_stats()
 
-    def handle_waiting_for_card_change(self) -> bool:
-        """Handle waiting for card change after HIT or SPLIT. Returns True if still waiting."""
-        if not self.game_state.waiting_for_change:
-            return False
-        current_player = self.card_reader.read_player_cards()
-        if current_player and current_player != self.game_state.last_player_value:
-            self.game_state.waiting_for_change = False
-            self.game_state.current_game_state = None
-            return False
-        elif time.time() - self.game_state.change_start_time > 2.0:
-            print("WARNING: Timeout waiting for card change")
+    def on_phase_change(
+        self, previous: GamePhase, phase: GamePhase, event: Optional[Event]
+    ):
+        """Bookkeeping that used to be rebuilt from GameState flags every tick"""
+        if previous == GamePhase.WAITING_FOR_CARD_CHANGE:
+            if event == Event.TIMEOUT:
+                event_log.warning(
+                    "card_timeout", "WARNING: Timeout waiting for card change"
+                )
+                self.game_state.current_game_state = None
+                if self.hand_record:
+                    self.hand_record.flags |= FLAG_TIMEOUT
+                self.executor.dump_recorder("card_change_timeout")
             self.game_state.waiting_for_change = False
-            self.game_state.current_game_state = None
-            return False
-        time.sleep(0.005)
-        return True
+            if phase != GamePhase.ACTIVE_GAME:
+                self.game_state.last_player_value = None
+        if (
+            phase == GamePhase.HAND_COMPLETE
+            and self.game_state.current_game_state not in [None, "waiting"]
+        ):
+            event_log.info(
+                "hand_complete",
+                f"{'=' * 50}\nHand #{self.stats.hands_played} complete\n"
+                f"{'=' * 50}\nWaiting for rebet...",
+                hand=self.stats.hands_played,
+            )
+        if phase in (GamePhase.HAND_COMPLETE, GamePhase.WAITING_FOR_REBET):
+            self.finish_hand_record()
+            self.validator.new_round()
+        elif event is None:
+            # A resync lost track of the round
+            self.validator.new_round()
+
+    def start_hand_record(self, player_text: str, dealer_text: str):
+        """Open the history record for a hand that just started"""
+        self.finish_hand_record()
+        if self.history is None:
+            return
+        self.hand_record = HandRecord(
+            self.stats.hands_played,
+            player_text,
+            dealer_text,
+            self.card_reader.last_player_confidence,
+            self.card_reader.last_dealer_confidence,
+            table=self.table,
+        )
+
+    def finish_hand_record(self):
+        if self.hand_record is None:
+            return
+        self.history.record(self.hand_record)
+        self.hand_record = None
 
-    def get_game_phase(self, buttons: Dict) -> GamePhase:
-        """Determine current game phase"""
+    def observe_buttons(self, buttons: ButtonSnapshot) -> bool:
+        """Turn a button snapshot into an event. Returns True if the phase changed."""
         in_active_game = self.button_manager.is_in_active_game(buttons)
         if "RebetDealAvailable.PNG" in buttons and not in_active_game:
-            return GamePhase.WAITING_FOR_REBET
-        if self.game_state.waiting_for_change:
-            return GamePhase.WAITING_FOR_CARD_CHANGE
-        if "RebetDealUnavailable.PNG" in buttons and not in_active_game:
-            return GamePhase.HAND_COMPLETE
+            return self.state_machine.fire(Event.REBET_AVAILABLE)
         if in_active_game:
-            return GamePhase.ACTIVE_GAME
-        return GamePhase.HAND_COMPLETE
+            return self.state_machine.fire(Event.GAMEPLAY_BUTTONS)
+        return self.state_machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+
+    def handle_idle(self, buttons: Optional[ButtonSnapshot]) -> bool:
+        """DEALING and HAND_COMPLETE only wait for the next button event"""
+        return False
+
+    def handle_waiting_for_rebet(self, buttons: ButtonSnapshot) -> bool:
+        if self.executor.execute_rebet(buttons, self.game_state):
+            self.state_machine.fire(Event.REBET_CLICKED)
+            return True
+        return False
+
+    def handle_waiting_for_card_change(self, buttons: ButtonSnapshot) -> bool:
+        """Wait for the card after HIT or SPLIT. Returns True once it arrived."""
+        current_player = self.read_player_checked()
+        if current_player and current_player != self.game_state.last_player_value:
+            latency = self.button_manager.input.latency
+            latency.screen_changed()
+            if self.hand_record:
+                self.hand_record.final_player = current_player
+                if math.isnan(self.hand_record.click_ms):
+                    self.hand_record.click_ms = latency.last * 1000
+            self.game_state.current_game_state = None
+            self.state_machine.fire(Event.PLAYER_CHANGED)
+            return True
+        return False
+
+    def read_player_checked(self) -> Optional[str]:
+        """Active player total, re-read at once while it's impossible for the hand"""
+        for attempt in range(self.validator.rereads + 1):
+            player_text = self.card_reader.read_player_cards(new_frame=attempt > 0)
+            hands = self.card_reader.last_hands
+            index = hands.active_index if hands else 0
+            if not player_text or self.validator.check_player(player_text, index):
+                return player_text
+        event_log.warning(
+            "impossible_read",
+            f"Rejected player read {player_text} after hitting {self.validator.hit_on}",
+            player=player_text,
+            hit_on=self.validator.hit_on,
+        )
+        self.executor.dump_recorder(
+            "impossible_player_read", f"{player_text} after {self.validator.hit_on}"
+        )
+        return None
 
     def handle_hand_start(self, player_text: str, dealer_text: str):
         """Handle start of new hand"""
@@ -82,12 +297,28 @@ class BlackjackBot:
         if self.game_state.current_game_state != current_game_state_id:
             if self.game_state.current_game_state == "waiting":
                 self.stats.hands_played += 1
-                print(f"\n>>> Starting Hand #{self.stats.hands_played}")
-                self.game_state.hand_complete_printed = False
-            print(f"\nCards: Player={player_text} | Dealer={dealer_text}")
+                event_log.info(
+                    "hand_start",
+                    f"\n>>> Starting Hand #{self.stats.hands_played}",
+                    hand=self.stats.hands_played,
+                )
+                if self.deviations:
+                    self.deviations.observe_hand_start(player_text, dealer_text)
+                self.start_hand_record(player_text, dealer_text)
+            event_log.info(
+                "cards",
+                f"\nCards: Player={player_text} | Dealer={dealer_text}",
+                player=player_text,
+                dealer=dealer_text,
+            )
             if self.game_state.in_split_hand:
-                print(
-                    f"[Split hand - last_action: {self.game_state.last_action.value}]"
+                hands = self.card_reader.last_hands
+                hand_label = (
+                    f" {hands.active_index + 1}/{len(hands.hands)}" if hands else ""
+                )
+                event_log.info(
+                    "split_hand",
+                    f"[Split hand{hand_label} - last_action: {self.game_state.last_action.value}]",
                 )
             if self.game_state.current_game_state != "waiting":
                 if self.game_state.last_action not in [Action.REBET, Action.SPLIT]:
@@ -95,7 +326,7 @@ class BlackjackBot:
             self.game_state.current_game_state = current_game_state_id
 
     def handle_split_decision(
-        self, player_text: str, dealer_text: str, buttons: Dict
+        self, player_text: str, dealer_text: str, buttons: ButtonSnapshot
     ) -> bool:
         """Handle split decision. Returns True if split was executed."""
         if (
@@ -114,24 +345,30 @@ class BlackjackBot:
         return False
 
     def handle_surrender_decision(
-        self, player_text: str, dealer_text: str, buttons: Dict
+        self, player_text: str, dealer_text: str, buttons: ButtonSnapshot
     ) -> bool:
         """Handle surrender decision. Returns True if action was taken."""
         specific_card = None
-        if player_text == "15" and dealer_text == "10":
+        if self.uses_specific_card and player_text == "15" and dealer_text == "10":
             specific_card = self.card_reader.read_specific_card()
         should_surrender, should_hit = self.strategy_decider.should_surrender(
             player_text, dealer_text, self.game_state.last_action, specific_card
         )
         if should_hit:
-            print("Strategy: HIT (15v10 w/ 7-8) | Action: HIT ✓")
+            self.decision_context |= CTX_COMPOSITION_HIT
+            event_log.info(
+                "action",
+                "Strategy: HIT (15v10 w/ 7-8) | Action: HIT ✓",
+                strategy="H",
+                action="HIT",
+            )
             return self.executor.execute_hit(buttons, self.game_state, player_text)
         if should_surrender:
             return self.executor.execute_surrender(buttons, self.game_state)
         return False
 
     def handle_soft_hand(
-        self, player_text: str, dealer_text: str, buttons: Dict
+        self, player_text: str, dealer_text: str, buttons: ButtonSnapshot
     ) -> bool:
         """Handle soft hand decision. Returns True if action was taken."""
         action = self.strategy_decider.get_soft_action(player_text, dealer_text)
@@ -139,17 +376,28 @@ class BlackjackBot:
             if self.strategy_decider.can_double(
                 self.game_state.last_action,
                 self.game_state.in_split_hand,
+                buttons,
                 self.button_manager,
             ):
                 if self.executor.execute_double(buttons, self.game_state, "soft"):
                     return True
                 else:
-                    print("Strategy: DOUBLE (soft) | Action: HIT (can't double)")
+                    event_log.info(
+                        "action",
+                        "Strategy: DOUBLE (soft) | Action: HIT (can't double)",
+                        strategy="D",
+                        action="HIT",
+                    )
                     return self.executor.execute_hit(
                         buttons, self.game_state, player_text, "soft"
                     )
             else:
-                print("Strategy: DOUBLE (soft) | Action: HIT (can't double)")
+                event_log.info(
+                    "action",
+                    "Strategy: DOUBLE (soft) | Action: HIT (can't double)",
+                    strategy="D",
+                    action="HIT",
+                )
                 return self.executor.execute_hit(
                     buttons, self.game_state, player_text, "soft"
                 )
@@ -157,17 +405,26 @@ class BlackjackBot:
             if self.strategy_decider.can_double(
                 self.game_state.last_action,
                 self.game_state.in_split_hand,
+                buttons,
                 self.button_manager,
             ):
                 if self.executor.execute_double(buttons, self.game_state, "soft"):
                     return True
                 else:
-                    print(
-                        "Strategy: DOUBLE/STAND (soft) | Action: STAND (can't double)"
+                    event_log.info(
+                        "action",
+                        "Strategy: DOUBLE/STAND (soft) | Action: STAND (can't double)",
+                        strategy="Ds",
+                        action="STAND",
                     )
                     return self.executor.execute_stand(buttons, self.game_state, "soft")
             else:
-                print("Strategy: DOUBLE/STAND (soft) | Action: STAND (can't double)")
+                event_log.info(
+                    "action",
+                    "Strategy: DOUBLE/STAND (soft) | Action: STAND (can't double)",
+                    strategy="Ds",
+                    action="STAND",
+                )
                 return self.executor.execute_stand(buttons, self.game_state, "soft")
         elif action == "H":
             return self.executor.execute_hit(
@@ -178,7 +435,7 @@ class BlackjackBot:
         return False
 
     def handle_hard_hand(
-        self, player_text: str, dealer_text: str, buttons: Dict
+        self, player_text: str, dealer_text: str, buttons: ButtonSnapshot
     ) -> bool:
         """Handle hard hand decision. Returns True if action was taken."""
         self.card_reader.read_player_cards()
@@ -187,17 +444,28 @@ class BlackjackBot:
             if self.strategy_decider.can_double(
                 self.game_state.last_action,
                 self.game_state.in_split_hand,
+                buttons,
                 self.button_manager,
             ):
                 if self.executor.execute_double(buttons, self.game_state, "hard"):
                     return True
                 else:
-                    print("Strategy: DOUBLE | Action: HIT (button disappeared)")
+                    event_log.info(
+                        "action",
+                        "Strategy: DOUBLE | Action: HIT (button disappeared)",
+                        strategy="D",
+                        action="HIT",
+                    )
                     return self.executor.execute_hit(
                         buttons, self.game_state, player_text
                     )
             else:
-                print("Strategy: DOUBLE | Action: HIT (can't double - game state)")
+                event_log.info(
+                    "action",
+                    "Strategy: DOUBLE | Action: HIT (can't double - game state)",
+                    strategy="D",
+                    action="HIT",
+                )
                 return self.executor.execute_hit(buttons, self.game_state, player_text)
         elif action == "H":
             return self.executor.execute_hit(buttons, self.game_state, player_text)
@@ -208,40 +476,17 @@ class BlackjackBot:
                 return False
         return False
 
-    def run_one_iteration(self):
-        """Run one iteration of the bot loop"""
-        buttons = self.button_manager.check_buttons()
-        phase = self.get_game_phase(buttons)
-
-        if phase == GamePhase.WAITING_FOR_CARD_CHANGE:
-            self.handle_waiting_for_card_change()
-            return
-        if phase == GamePhase.WAITING_FOR_REBET:
-            self.executor.execute_rebet(buttons, self.game_state)
-            return
-        if phase == GamePhase.HAND_COMPLETE:
-            if (
-                not self.game_state.hand_complete_printed
-                and self.game_state.current_game_state not in [None, "waiting"]
-            ):
-                print("=" * 50)
-                print(f"Hand #{self.stats.hands_played} complete")
-                print("=" * 50)
-                print("Waiting for rebet...")
-                self.game_state.hand_complete_printed = True
-            time.sleep(0.01)
-            return
-        if phase != GamePhase.ACTIVE_GAME:
-            if self.game_state.waiting_for_change:
-                self.game_state.waiting_for_change = False
-                self.game_state.last_player_value = None
-            time.sleep(0.01)
-            return
+    def handle_active_game(self, buttons: ButtonSnapshot) -> bool:
+        """Read the cards and play one decision. Returns True if an action was taken."""
+        if not self.button_manager.is_in_active_game(buttons):
+            # Buttons vanished, wait for the debounced HAND_COMPLETE transition
+            return False
 
-        player_text = self.card_reader.read_player_cards()
+        read_start = time.perf_counter()
+        player_text = self.read_player_checked()
         if not player_text:
-            time.sleep(0.01)
-            return
+            return False
+        player_done = time.perf_counter()
 
         current_hand_id = (
             f"{self.game_state.last_action.value}_{self.stats.bets_placed}"
@@ -252,43 +497,140 @@ class BlackjackBot:
         ):
             dealer_text = self.game_state.cached_dealer
         else:
+            if (
+                self.uses_specific_card
+                and player_text == "15"
+                and self.game_state.last_action == Action.REBET
+            ):
+                # Read the specific card while the dealer read runs, in case it's 15v10
+                self.card_reader.prefetch_specific_card()
             dealer_text = self.card_reader.read_dealer_card(
                 self.game_state.cached_dealer
             )
+            if dealer_text != "10":
+                self.card_reader.discard_specific_prefetch()
             if not dealer_text:
-                time.sleep(0.01)
-                return
+                return False
             self.game_state.cached_dealer = dealer_text
             self.game_state.cached_dealer_hand_id = current_hand_id
 
+        reads_done = time.perf_counter()
+        if self.recorder:
+            self.recorder.note(player_text, dealer_text)
         self.handle_hand_start(player_text, dealer_text)
+        record = self.hand_record
+        if record and not record.actions:
+            record.player_ms = (player_done - read_start) * 1000
+            record.dealer_ms = (reads_done - player_done) * 1000
+        self.decision_context = self.get_decision_context(buttons)
 
-        if self.handle_split_decision(player_text, dealer_text, buttons):
-            return
-        if self.handle_surrender_decision(player_text, dealer_text, buttons):
-            return
-        if "_" in player_text:
-            if self.handle_soft_hand(player_text, dealer_text, buttons):
-                return
-        else:
-            if self.handle_hard_hand(player_text, dealer_text, buttons):
-                return
-        time.sleep(0.005)
+        acted = (
+            self.handle_split_decision(player_text, dealer_text, buttons)
+            or self.handle_surrender_decision(player_text, dealer_text, buttons)
+            or (
+                self.handle_soft_hand(player_text, dealer_text, buttons)
+                if "_" in player_text
+                else self.handle_hard_hand(player_text, dealer_text, buttons)
+            )
+        )
+        if acted and self.game_state.last_action == Action.HIT:
+            hands = self.card_reader.last_hands
+            self.validator.hit(player_text, hands.active_index if hands else 0)
+        if acted and self.recorder:
+            self.recorder.note(action=self.game_state.last_action.value)
+        if acted and record:
+            record.final_player = player_text
+            self.history.record_decision(
+                record,
+                player_text,
+                dealer_text,
+                self.decision_context,
+                self.game_state.last_action,
+            )
+            record.add_action(
+                self.game_state.last_action, time.perf_counter() - reads_done
+            )
+        if self.game_state.waiting_for_change:
+            self.state_machine.fire(Event.CARD_REQUESTED)
+        return acted
+
+    def get_decision_context(self, buttons: ButtonSnapshot) -> int:
+        """CTX_* bits describing what the decider may do with this hand"""
+        context = 0
+        if self.game_state.in_split_hand:
+            context |= CTX_SPLIT_HAND
+        elif self.game_state.last_action == Action.REBET:
+            context |= CTX_FIRST
+        if "DoubleAvailable.PNG" in buttons:
+            context |= CTX_DOUBLE_OFFERED
+        if "SplitAvailable.PNG" in buttons:
+            context |= CTX_SPLIT_OFFERED
+        if self.deviations:
+            context |= CTX_DEVIATIONS
+        return context
 
-    def run(self):
-        """Main bot loop"""
-        while True:
+    def run_one_iteration(self):
+        """Run one iteration of the bot loop"""
+        machine = self.state_machine
+        if self._resync_pending:
+            self._resync_pending = False
+            machine.resync()
+        machine.check_timeout()
+        phase = machine.phase
+        if self.recorder:
+            self.recorder.begin_tick(phase.value)
+
+        buttons = None
+        if machine.needs(Detector.BUTTONS):
+            buttons = self.button_manager.snapshot()
+        elif machine.needs(Detector.REBET):
+            buttons = self.button_manager.snapshot(ButtonManager.REBET_BUTTONS)
+        changed = buttons is not None and self.observe_buttons(buttons)
+        if not changed:
+            changed = self._phase_handlers[phase](buttons)
+        time.sleep(self.poll_scheduler.next_interval(phase, changed))
+
+    def run(self, stop_event=None, hotkeys: bool = True):
+        """Main bot loop. Exits on ESC (with hotkeys) or once stop_event is set."""
+        if hotkeys:
+            # Imported here so headless runs never load the keyboard hook
+            import keyboard
+        while stop_event is None or not stop_event.is_set():
+            if hotkeys and keyboard.is_pressed("esc"):
+                print("Exiting script.")
+                break
             if not self.running:
                 time.sleep(0.05)
-                if keyboard.is_pressed("esc"):
-                    print("Exiting script.")
-                    break
                 continue
-            if keyboard.is_pressed("esc"):
-                print("Exiting script.")
-                break
             try:
                 self.run_one_iteration()
             except Exception as e:
-                print(f"ERROR in bot loop: {e}")
+                event_log.error("loop_error", f"ERROR in bot loop: {e}")
                 time.sleep(0.1)
+        self.close()
+
+    def stats_summary(self) -> Dict:
+        """Current statistics as plain values, for the daemon's stats command"""
+        return {
+            "running": self.running,
+            "phase": self.state_machine.phase.value,
+            "hands_played": self.stats.hands_played,
+            "bets_placed": self.stats.bets_placed,
+            "hands_per_hour": round(self.stats.hands_per_hour(), 2),
+            "button_scans": self.button_manager.full_scans,
+            "box_window_hit_rate": round(self.card_reader.box_tracker.hit_rate(), 3),
+            "wrong_actions_prevented": self.validator.prevented,
+        }
+
+    def close(self):
+        """Release worker processes, threads and shared memory, write pending history"""
+        self.card_reader.close()
+        if self.history is not None:
+            self.finish_hand_record()
+            if self._owns_history:
+                self.history.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.recognition is not None and self._owns_recognition:
+            self.recognition.close()
+        self.recognition = None
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Dict, Union
+
+import ReadVars
+
+from .bot import BlackjackBot
+from .game.input_backend import create_input_backend
+from .utils.event_log import event_log
+
+Address = Union[str, tuple]
+
+# Unix socket where available, localhost TCP on Pythons without AF_UNIX
+DEFAULT_ADDRESS: Address = (
+    "blackjack_bot.sock" if hasattr(socket, "AF_UNIX") else ("127.0.0.1", 47821)
+)
+
+COMMANDS = ("start", "stop", "stats", "reload", "shutdown")
+
+
+class BotDaemon:
+    """Runs the bot headless, controlled over a local socket.
+
+    Clients send one JSON object per line, e.g. ``{"cmd": "stats"}``, and get
+    one JSON line back. Nothing here imports tkinter, matplotlib or the
+    keyboard hook: unless inputBackend says otherwise clicks go through the
+    native backend, which doesn't need pyautogui.
+    """
+
+    def __init__(
+        self, config_path: str = "Vars.txt", address: Address = DEFAULT_ADDRESS
+    ):
+        self.config_path = config_path
+        self.address = address
+        self.shutdown_event = threading.Event()
+        self._lock = threading.Lock()
+        self._start_bot()
+
+    def _start_bot(self):
+        config = ReadVars.read_tuples_from_file(self.config_path)
+        self.bot = BlackjackBot(
+            config, create_input_backend(config.get("inputBackend", "native"))
+        )
+        self._bot_stop = threading.Event()
+        self._bot_thread = threading.Thread(
+            target=self.bot.run, args=(self._bot_stop, False), daemon=True
+        )
+        self._bot_thread.start()
+
+    def _stop_bot(self):
+        """Stop the bot loop, which closes the bot's workers and threads on its way out"""
+        self._bot_stop.set()
+        self._bot_thread.join(timeout=10.0)
+        if self._bot_thread.is_alive():
+            event_log.warning(
+                "bot_stop_timeout",
+                "WARNING: Bot loop didn't stop, its resources stay open",
+            )
+
+    def handle(self, command: Dict) -> Dict:
+        """Run one control command and return the reply"""
+        cmd = command.get("cmd")
+        with self._lock:
+            if cmd == "start":
+                if not self.bot.running:
+                    self.bot.toggle_running()
+                return {"ok": True, "running": True}
+            if cmd == "stop":
+                if self.bot.running:
+                    self.bot.toggle_running()
+                return {"ok": True, "running": False}
+            if cmd == "stats":
+                return {"ok": True, **self.bot.stats_summary()}
+            if cmd == "reload":
+                was_running = self.bot.running
+                self._stop_bot()
+                self._start_bot()
+                if was_running:
+                    self.bot.toggle_running()
+                return {"ok": True, "running": was_running}
+            if cmd == "shutdown":
+                self.shutdown_event.set()
+                return {"ok": True}
+        return {"ok": False, "error": f"Unknown command {cmd!r}"}
+
+    def serve(self):
+        """Serve control commands until shutdown"""
+        server = _make_server(self.address, self)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        print(f"Daemon listening on {self.address}")
+        try:
+            self.shutdown_event.wait()
+        except KeyboardInterrupt:
+            print("Daemon interrupted")
+        server.shutdown()
+        server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        if self.bot.running:
+            self.bot.toggle_running()
+        self._stop_bot()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.daemon.handle(json.loads(line))
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+def _make_server(address: Address, daemon: BotDaemon) -> socketserver.BaseServer:
+    if isinstance(address, str):
+        if os.path.exists(address):
+            # Left over from a daemon that didn't shut down cleanly
+            os.remove(address)
+        server = socketserver.ThreadingUnixStreamServer(address, _CommandHandler)
+    else:
+        server = socketserver.ThreadingTCPServer(address, _CommandHandler)
+    server.daemon_threads = True
+    server.daemon = daemon
+    return server
+
+
+def send_command(cmd: str, address: Address = DEFAULT_ADDRESS) -> Dict:
+    """Send one command to a running daemon and return its reply"""
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        sock.sendall((json.dumps({"cmd": cmd}) + "\n").encode())
+        reply = sock.makefile("rb").readline()
+    return json.loads(reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bot with socket control")
+    parser.add_argument("command", choices=("serve",) + COMMANDS)
+    parser.add_argument("--config", default="Vars.txt")
+    parser.add_argument("--socket", help="Socket path (or host:port without AF_UNIX)")
+    args = parser.parse_args()
+
+    address = DEFAULT_ADDRESS
+    if args.socket:
+        if isinstance(DEFAULT_ADDRESS, str):
+            address = args.socket
+        else:
+            host, port = args.socket.rsplit(":", 1)
+            address = (host, int(port))
+
+    if args.command == "serve":
+        BotDaemon(args.config, address).serve()
+    else:
+        print(json.dumps(send_command(args.command, address), indent=2))
+
+
+if __name__ == "__main__":
+    main()
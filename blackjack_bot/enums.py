@@ -20,3 +20,23 @@ class GamePhase(Enum):
     HAND_COMPLETE = "hand_complete"
     ACTIVE_GAME = "active_game"
     WAITING_FOR_CARD_CHANGE = "waiting_for_card_change"
+    DEALING = "dealing"
+
+
+class Event(Enum):
+    """Observations and actions that move the bot between phases"""
+
+    REBET_AVAILABLE = "rebet_available"
+    GAMEPLAY_BUTTONS = "gameplay_buttons"
+    NO_GAMEPLAY_BUTTONS = "no_gameplay_buttons"
+    REBET_CLICKED = "rebet_clicked"
+    CARD_REQUESTED = "card_requested"
+    PLAYER_CHANGED = "player_changed"
+    TIMEOUT = "timeout"
+
+
+class Detector(Enum):
+    """Which button scan a phase runs on each tick"""
+
+    BUTTONS = "buttons"
+    REBET = "rebet"
@@ -1,5 +1,18 @@
-from .action_executor import ActionExecutor
-from .button_manager import ButtonManager
-from .card_reader import CardReader
+import importlib
 
-__all__ = ["CardReader", "ButtonManager", "ActionExecutor"]
+# Loaded on first use so the pure logic modules (hand_validator, poll_scheduler,
+# state_machine) import without OCR and its PaddleOCR model
+_EXPORTS = {
+    "ActionExecutor": ".action_executor",
+    "ButtonManager": ".button_manager",
+    "CardReader": ".card_reader",
+    "GameStateMachine": ".state_machine",
+}
+
+__all__ = ["CardReader", "ButtonManager", "ActionExecutor", "GameStateMachine"]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
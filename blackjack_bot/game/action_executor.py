@@ -1,9 +1,10 @@
 import time
-from typing import Dict
+from typing import Optional
 
 from ..enums import Action
-from ..models import GameState, Statistics
-from ..utils.screenshot import ScreenshotManager
+from ..models import ButtonSnapshot, GameState, Statistics
+from ..utils.event_log import event_log
+from ..utils.flight_recorder import FlightRecorder
 from .button_manager import ButtonManager
 from .card_reader import CardReader
 
@@ -17,33 +18,45 @@ class ActionExecutor:
         card_reader: CardReader,
         strategy_decider,
         stats: Statistics,
+        recorder: Optional[FlightRecorder] = None,
     ):
         self.buttons = button_manager
         self.cards = card_reader
         self.strategy = strategy_decider
         self.stats = stats
-        self.screenshot_mgr = ScreenshotManager()
+        self.recorder = recorder
 
-    def execute_rebet(self, buttons: Dict, game_state: GameState) -> bool:
+    def dump_recorder(self, reason: str, details: str = ""):
+        """Save the last few ticks' screen regions for a failure"""
+        if self.recorder is not None:
+            self.recorder.dump(reason, details)
+
+    def execute_rebet(self, buttons: ButtonSnapshot, game_state: GameState) -> bool:
         """Execute rebet action. Returns True if rebet was clicked."""
         if "RebetDealAvailable.PNG" in buttons:
             self.stats.bets_placed += 1
             game_state.reset_for_new_hand()
             game_state.current_game_state = "waiting"
-            self.buttons.click_button(buttons["RebetDealAvailable.PNG"])
+            self.cards.reset_hands()
+            self.buttons.click_button(buttons["RebetDealAvailable.PNG"], "REBET")
             time.sleep(0.05)
             return True
         return False
 
     def execute_split(
-        self, buttons: Dict, game_state: GameState, pair_notation: str
+        self, buttons: ButtonSnapshot, game_state: GameState, pair_notation: str
     ) -> bool:
         """Execute split action. Returns True if split was executed."""
-        time.sleep(0.15)
-        buttons = self.buttons.check_buttons()
+        self.buttons.wait_for_change(buttons, 0.15)
 
         if "SplitAvailable.PNG" in buttons:
-            print(f"Strategy: SPLIT {pair_notation} | Action: SPLIT ✓")
+            event_log.info(
+                "action",
+                f"Strategy: SPLIT {pair_notation} | Action: SPLIT ✓",
+                strategy="P",
+                action="SPLIT",
+                pair=pair_notation,
+            )
             self.stats.bets_placed += 1
             game_state.last_action = Action.SPLIT
             game_state.current_game_state = None
@@ -52,64 +65,72 @@ class ActionExecutor:
             # Store current player value before split
             current_player_value = self.cards.read_player_cards()
 
-            self.buttons.click_button(buttons["SplitAvailable.PNG"])
-
-            time.sleep(0.5)
-            validation_buttons = self.buttons.check_buttons()
-            is_active_game = any(
-                btn in validation_buttons for btn in self.buttons.GAMEPLAY_BUTTONS
-            )
+            self.buttons.click_button(buttons["SplitAvailable.PNG"], "SPLIT")
+            self.cards.invalidate_tracking()
+
+            # Move on as soon as the active hand box shows its new card
+            start_time = time.time()
+            timeout = 2.0
+            while time.time() - start_time < timeout:
+                hands = self.cards.read_player_hands()
+                if (
+                    hands
+                    and len(hands.hands) > 1
+                    and hands.active.value
+                    and hands.active.value != current_player_value
+                ):
+                    player_value = hands.active.value
+                    event_log.info(
+                        "split_ready",
+                        f"[Split hand {hands.active_index + 1}/{len(hands.hands)} ready: "
+                        f"{current_player_value} -> {player_value}]",
+                        before=current_player_value,
+                        after=player_value,
+                    )
+                    return True
+                time.sleep(0.01)
+
+            self.buttons.wait_for_change(buttons)
+            is_active_game = self.buttons.is_in_active_game(buttons)
 
             if is_active_game:
-                print("Split validated - continuing with split hand")
-
-                # Poll until card changes or timeout
-                start_time = time.time()
-                timeout = 2.0
-                card_changed = False
-                while time.time() - start_time < timeout:
-                    time.sleep(0.05)
-                    player_value = self.cards.read_player_cards()
-                    if player_value and player_value != current_player_value:
-                        # Successfully detected card change
-                        print(
-                            f"[Split hand ready: {current_player_value} -> {player_value}]"
-                        )
-                        card_changed = True
-                        break
-
-                if not card_changed:
-                    print("WARNING: Timeout waiting for split hand card change")
-
+                event_log.warning(
+                    "split_timeout",
+                    "WARNING: Timeout waiting for split hand card change",
+                )
+                self.dump_recorder("split_timeout", pair_notation)
                 return True
             else:
-                # print(
-                #     "WARNING: Split may have failed - no active game buttons detected"
-                # )
-                # self.screenshot_mgr.save_screenshot(
-                #     "split_validation_failed", pair_notation
-                # )
+                event_log.warning(
+                    "split_failed",
+                    "WARNING: Split may have failed - no active game buttons detected",
+                )
+                self.dump_recorder("split_validation_failed", pair_notation)
                 game_state.last_action = Action.NONE
                 game_state.in_split_hand = False
                 game_state.current_game_state = None
                 return False
         return False
 
-    def execute_surrender(self, buttons: Dict, game_state: GameState) -> bool:
+    def execute_surrender(self, buttons: ButtonSnapshot, game_state: GameState) -> bool:
         """Execute surrender action. Returns True if surrendered."""
-        time.sleep(0.3)
-        buttons = self.buttons.check_buttons()
+        self.buttons.wait_for_change(buttons, 0.3)
         if "SurrenderAvailable.PNG" in buttons:
-            print("Strategy: SURRENDER | Action: SURRENDER ✓")
+            event_log.info(
+                "action",
+                "Strategy: SURRENDER | Action: SURRENDER ✓",
+                strategy="R",
+                action="SURRENDER",
+            )
             game_state.last_action = Action.SURRENDER
             game_state.current_game_state = None
-            self.buttons.click_button(buttons["SurrenderAvailable.PNG"])
+            self.buttons.click_button(buttons["SurrenderAvailable.PNG"], "SURRENDER")
             return True
         return False
 
     def execute_hit(
         self,
-        buttons: Dict,
+        buttons: ButtonSnapshot,
         game_state: GameState,
         player_text: str,
         hand_type: str = "",
@@ -120,18 +141,23 @@ class ActionExecutor:
         )
         if button_loc:
             prefix = f" ({hand_type})" if hand_type else ""
-            print(f"Strategy: HIT{prefix} | Action: HIT ✓")
+            event_log.info(
+                "action",
+                f"Strategy: HIT{prefix} | Action: HIT ✓",
+                strategy="H",
+                action="HIT",
+                hand_type=hand_type,
+            )
             game_state.last_action = Action.HIT
             game_state.current_game_state = None
-            self.buttons.click_button(button_loc)
+            self.buttons.click_button(button_loc, "HIT")
             game_state.last_player_value = player_text
             game_state.waiting_for_change = True
-            game_state.change_start_time = time.time()
             return True
         return False
 
     def execute_stand(
-        self, buttons: Dict, game_state: GameState, hand_type: str = ""
+        self, buttons: ButtonSnapshot, game_state: GameState, hand_type: str = ""
     ) -> bool:
         """Execute stand action. Returns True if stand was executed."""
         button_loc = self.buttons.safe_click_with_verification(
@@ -139,25 +165,40 @@ class ActionExecutor:
         )
         if button_loc:
             prefix = f" ({hand_type})" if hand_type else ""
-            print(f"Strategy: STAND{prefix} | Action: STAND ✓")
+            event_log.info(
+                "action",
+                f"Strategy: STAND{prefix} | Action: STAND ✓",
+                strategy="S",
+                action="STAND",
+                hand_type=hand_type,
+            )
             game_state.last_action = Action.STAND
-            self.buttons.click_button(button_loc)
+            self.buttons.click_button(button_loc, "STAND")
             time.sleep(0.2)
             if game_state.in_split_hand:
                 game_state.last_action = Action.SPLIT
-                print("[Split hand complete - ready for next split hand]")
+                event_log.info(
+                    "split_hand", "[Split hand complete - ready for next split hand]"
+                )
             return True
         return False
 
     def execute_double(
-        self, buttons: Dict, game_state: GameState, hand_type: str = ""
+        self, buttons: ButtonSnapshot, game_state: GameState, hand_type: str = ""
     ) -> bool:
         """Execute double action. Returns True if doubled."""
-        time.sleep(0.3 if not hand_type or hand_type == "hard" else 0.05)
-        buttons = self.buttons.check_buttons()
+        self.buttons.wait_for_change(
+            buttons, 0.3 if not hand_type or hand_type == "hard" else 0.05
+        )
         if "DoubleAvailable.PNG" in buttons:
             prefix = f" ({hand_type})" if hand_type else ""
-            print(f"Strategy: DOUBLE{prefix} | Action: DOUBLE ✓")
+            event_log.info(
+                "action",
+                f"Strategy: DOUBLE{prefix} | Action: DOUBLE ✓",
+                strategy="D",
+                action="DOUBLE",
+                hand_type=hand_type,
+            )
             self.stats.bets_placed += 1
             game_state.last_action = Action.DOUBLE
             game_state.current_game_state = None
@@ -165,7 +206,7 @@ class ActionExecutor:
             # Store current player value before double
             current_player_value = self.cards.read_player_cards()
 
-            self.buttons.click_button(buttons["DoubleAvailable.PNG"])
+            self.buttons.click_button(buttons["DoubleAvailable.PNG"], "DOUBLE")
             time.sleep(0.15 if hand_type == "soft" else 0.3)
 
             # For split hands, poll until card changes or timeout
@@ -177,13 +218,20 @@ class ActionExecutor:
                     player_value = self.cards.read_player_cards()
                     if player_value and player_value != current_player_value:
                         # Successfully detected card change
-                        print(
-                            f"[Split hand card changed: {current_player_value} -> {player_value}]"
+                        event_log.info(
+                            "split_ready",
+                            f"[Split hand card changed: {current_player_value} -> {player_value}]",
+                            before=current_player_value,
+                            after=player_value,
                         )
                         break
                 else:
                     # Timeout reached
-                    print("WARNING: Timeout waiting for next split hand after double")
+                    event_log.warning(
+                        "split_timeout",
+                        "WARNING: Timeout waiting for next split hand after double",
+                    )
+                    self.dump_recorder("split_double_timeout")
             elif not hand_type or hand_type == "hard":
                 self.cards.read_player_cards()
 
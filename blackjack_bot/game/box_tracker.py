@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+
+import find_player
+
+Box = Tuple[int, int, int, int]
+
+
+class BoxTracker:
+    """Finds total boxes by searching around the last known boxes first.
+
+    The gold player box only moves a little between reads, so a small window
+    around it is scanned before falling back to the whole player table.
+    """
+
+    def __init__(
+        self,
+        table_bbox: Box,
+        mode: str = "player",
+        margin: int = 60,
+        full_scan_interval: int = 25,
+    ):
+        self.table_bbox = table_bbox
+        self.mode = mode
+        self.margin = margin
+        self.full_scan_interval = full_scan_interval
+        self.window_hits = 0
+        self.window_misses = 0
+        self.full_scans = 0
+        self._last_boxes: List[Box] = []
+        self._reads_since_full_scan = 0
+
+    def detect(self) -> Tuple[List[Box], object, Box]:
+        """Return (boxes in screen coords, captured image, bbox the image covers)"""
+        window = self._search_window()
+        if window is not None:
+            boxes, img = find_player.detect_boxes(bbox=window, mode=self.mode)
+            if (
+                boxes
+                and len(boxes) >= len(self._last_boxes)
+                and not any(self._touches_edge(box, window) for box in boxes)
+            ):
+                self.window_hits += 1
+                self._reads_since_full_scan += 1
+                self._last_boxes = boxes
+                return boxes, img, window
+            self.window_misses += 1
+
+        self.full_scans += 1
+        boxes, img = find_player.detect_boxes(bbox=self.table_bbox, mode=self.mode)
+        self._last_boxes = boxes
+        self._reads_since_full_scan = 0
+        return boxes, img, self.table_bbox
+
+    def invalidate(self):
+        """Force the next read to scan the whole table (e.g. after a split)"""
+        self._last_boxes = []
+
+    def hit_rate(self) -> float:
+        attempts = self.window_hits + self.window_misses
+        return self.window_hits / attempts if attempts else 0.0
+
+    def print_stats(self):
+        print(
+            f"Box tracking: {self.hit_rate() * 100:.1f}% window hit rate "
+            f"({self.window_hits} hits, {self.window_misses} misses, "
+            f"{self.full_scans} full scans)"
+        )
+
+    def _search_window(self) -> Optional[Box]:
+        if not self._last_boxes:
+            return None
+        if self._reads_since_full_scan >= self.full_scan_interval:
+            return None
+        left = min(box[0] for box in self._last_boxes) - self.margin
+        top = min(box[1] for box in self._last_boxes) - self.margin
+        right = max(box[2] for box in self._last_boxes) + self.margin
+        bottom = max(box[3] for box in self._last_boxes) + self.margin
+        return (
+            max(left, self.table_bbox[0]),
+            max(top, self.table_bbox[1]),
+            min(right, self.table_bbox[2]),
+            min(bottom, self.table_bbox[3]),
+        )
+
+    def _touches_edge(self, box: Box, window: Box) -> bool:
+        """A box cut off by the window edge may have moved, unless it's the table edge"""
+        return (
+            (box[0] <= window[0] and window[0] != self.table_bbox[0])
+            or (box[1] <= window[1] and window[1] != self.table_bbox[1])
+            or (box[2] >= window[2] and window[2] != self.table_bbox[2])
+            or (box[3] >= window[3] and window[3] != self.table_bbox[3])
+        )
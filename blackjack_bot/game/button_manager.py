@@ -1,9 +1,15 @@
 import time
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
-import pyautogui
+import cv2
+import numpy as np
 
 import ButtonChecker
+import screen_capture
+
+from ..models import ButtonSnapshot
+from ..utils.event_log import event_log
+from .input_backend import InputBackend, create_input_backend
 
 
 class ButtonManager:
@@ -17,18 +23,80 @@ class ButtonManager:
         "SurrenderAvailable.PNG",
     ]
 
-    def __init__(self, button_bbox):
+    REBET_BUTTONS = ("RebetDealAvailable.PNG", "RebetDealUnavailable.PNG")
+
+    def __init__(self, button_bbox, input_backend: Optional[InputBackend] = None):
         self.button_bbox = button_bbox
+        self.input = input_backend or create_input_backend()
+        self._last_button_names = frozenset()
+        self.full_scans = 0
+        self.partial_scans = 0
+        self.scans_skipped = 0
+
+    def snapshot(self, names: Optional[Tuple[str, ...]] = None) -> ButtonSnapshot:
+        """
+        Capture the button bar once and run the template scan.
+        With ``names`` only those templates are matched (e.g. REBET_BUTTONS).
+        """
+        frame = self._grab()
+        if names is None:
+            return ButtonSnapshot(self._scan(frame), frame, time.time())
+        self.partial_scans += 1
+        buttons = ButtonChecker.check_buttons(
+            bbox=self.button_bbox, screen_img=frame, names=names
+        )
+        # Leave the frame unset so wait_for_change does a full rescan
+        return ButtonSnapshot(buttons, None, time.time())
 
     def check_buttons(self) -> Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]]:
         """Check which buttons are available"""
-        return ButtonChecker.check_buttons(bbox=self.button_bbox)
+        return self.snapshot().buttons
+
+    def wait_for_change(self, snapshot: ButtonSnapshot, settle: float = 0.0) -> bool:
+        """
+        Wait for the UI to settle, then rescan only if the button bar changed.
+        Updates the snapshot in place. Returns True if the screen changed.
+        """
+        if settle:
+            time.sleep(settle)
+        frame = self._grab()
+        snapshot.captured_at = time.time()
+        if snapshot.frame is not None and np.array_equal(frame, snapshot.frame):
+            self.scans_skipped += 1
+            return False
+        snapshot.buttons = self._scan(frame)
+        snapshot.frame = frame
+        return True
+
+    def _grab(self):
+        return cv2.cvtColor(screen_capture.grab(self.button_bbox), cv2.COLOR_RGB2BGR)
 
-    def is_in_active_game(self, buttons: Dict) -> bool:
+    def _scan(self, frame) -> Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]]:
+        self.full_scans += 1
+        buttons = ButtonChecker.check_buttons(bbox=self.button_bbox, screen_img=frame)
+        button_names = frozenset(buttons)
+        if button_names != self._last_button_names:
+            self.input.latency.screen_changed()
+            self._last_button_names = button_names
+        return buttons
+
+    def print_stats(self, hands_played: int):
+        per_hand = self.full_scans / hands_played if hands_played else 0
+        print(
+            f"Button scans: {self.full_scans} ({per_hand:.1f}/hand), "
+            f"{self.partial_scans} rebet-only, "
+            f"{self.scans_skipped} skipped because the screen had not changed"
+        )
+
+    def is_in_active_game(self, buttons: ButtonSnapshot) -> bool:
         """Check if we're in an active game"""
         return any(btn in buttons for btn in self.GAMEPLAY_BUTTONS)
 
-    def click_button(self, button_location: Tuple[Tuple[int, int], Tuple[int, int]]):
+    def click_button(
+        self,
+        button_location: Tuple[Tuple[int, int], Tuple[int, int]],
+        label: str = "",
+    ):
         """Click a button at the given location"""
         abs_top_left = (
             button_location[0][0] + self.button_bbox[0],
@@ -42,23 +110,22 @@ class ButtonManager:
             (abs_top_left[0] + abs_bottom_right[0]) / 2,
             (abs_top_left[1] + abs_bottom_right[1]) / 2,
         )
-        pyautogui.moveTo(midPoint[0], midPoint[1], duration=0)
-        pyautogui.click()
+        self.input.click(midPoint[0], midPoint[1], label)
 
     def safe_click_with_verification(
         self,
-        buttons: Dict,
+        buttons: ButtonSnapshot,
         target_button: str,
         action_name: str,
         avoid_button: str = "DoubleAvailable.PNG",
     ):
         """Click a button with verification to avoid misclicks"""
-        time.sleep(0.15)
-        buttons = self.check_buttons()
+        self.wait_for_change(buttons, 0.15)
         if target_button in buttons:
             if avoid_button in buttons:
-                print(
-                    f"WARNING: Both {action_name} and DOUBLE available - verifying button location"
+                event_log.warning(
+                    "button_overlap",
+                    f"WARNING: Both {action_name} and DOUBLE available - verifying button location",
                 )
                 time.sleep(0.05)
             return buttons.get(target_button)
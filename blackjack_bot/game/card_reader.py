@@ -1,6 +1,16 @@
-from typing import Optional
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 import OCR
+import screen_capture
+
+from ..models import PlayerHand, PlayerHands
+from .box_tracker import BoxTracker
 
 
 class CardReader:
@@ -8,28 +18,139 @@ class CardReader:
 
     VALID_DEALER = {"2", "3", "4", "5", "6", "7", "8", "9", "10", "1_11"}
 
-    def __init__(self, player_bbox, dealer_bbox, dynamic_dealer, specific_card):
+    def __init__(
+        self,
+        player_bbox,
+        dealer_bbox,
+        dynamic_dealer,
+        specific_card,
+        recognition=None,
+        cascade=None,
+        vote_frames: int = 3,
+        vote_seconds: float = 0.25,
+        vote_confidence: float = 0.9,
+    ):
         self.player_bbox = player_bbox
         self.dealer_bbox = dealer_bbox
         self.dynamic_dealer = dynamic_dealer
         self.specific_card = specific_card
+        self.last_hands: Optional[PlayerHands] = None
+        # OCR confidence of the latest reads, 0 when a fallback method was used
+        self.last_player_confidence = 0.0
+        self.last_dealer_confidence = 0.0
+        self.box_tracker = BoxTracker(player_bbox, mode="player")
+        # Optional RecognitionService, OCR runs in worker processes when set
+        self.recognition = recognition
+        # Optional RecognizerCascade, totals go to the cheapest confident tier
+        self.cascade = cascade
+        # Borderline reads are re-read on up to vote_frames fresh frames within
+        # vote_seconds and the majority label wins. 0 frames turns voting off.
+        self.vote_frames = vote_frames
+        self.vote_seconds = vote_seconds
+        self.vote_confidence = vote_confidence
+        self.votes_started = 0
+        self.votes_overturned = 0
+        self.vote_seconds_spent = 0.0
+        self._prefetch_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="specific-card"
+        )
+        self._specific_prefetch: Optional[Future] = None
+        # Second PaddleOCR model for the prefetch thread, see warm_prefetch_model
+        self._prefetch_model = None
+        self.prefetches_started = 0
+        self.prefetches_used = 0
+        self.prefetches_discarded = 0
+        self.prefetches_timed_out = 0
+
+    def read_player_cards(self, new_frame: bool = False) -> Optional[str]:
+        """
+        Read the active player hand and return the value, or None if failed.
+        new_frame skips a shared frame the last read may have used.
+        """
+        if new_frame:
+            screen_capture.require_new_frame()
+        hands = self.read_player_hands()
+        if hands is None:
+            return None
+        return hands.active.value
 
-    def read_player_cards(self) -> Optional[str]:
-        """Read player cards and return the value, or None if failed"""
+    def read_player_hands(self) -> Optional[PlayerHands]:
+        """Read every player hand box from one capture and track the active one"""
         try:
-            player_boxes = OCR.find_player.detect_boxes(
-                bbox=self.player_bbox, mode="player"
-            )
+            player_boxes, table_img, origin = self.box_tracker.detect()
             if not player_boxes or len(player_boxes) == 0:
                 return None
-            playerLoc = player_boxes[0][0]
-            player_text = str(OCR.ocr_card(playerLoc, mode="player"))
-            if player_text == "None":
-                return None
-            return player_text
+            player_boxes = sorted(player_boxes, key=lambda box: box[0])
+            origin_x, origin_y = origin[0], origin[1]
+            crops = [
+                table_img[y1 - origin_y : y2 - origin_y, x1 - origin_x : x2 - origin_x]
+                for x1, y1, x2, y2 in player_boxes
+            ]
+            results = self._recognize(crops, "player")
+            hands = [
+                PlayerHand(box, label)
+                for box, (label, _, _) in zip(player_boxes, results)
+            ]
+            tracked = self._track_active_hand(hands)
+            index = tracked.active_index
+            label, confidence, confident = results[index]
+            if not confident:
+                # Only the hand being acted on is worth the wait
+                label, confidence = self._vote(
+                    tracked.active.box, "player", crops[index], label, confidence
+                )
+                tracked.active.value = label
+            self.last_player_confidence = confidence
+            return tracked
         except Exception:
             return None
 
+    def reset_hands(self):
+        """Forget hand positions at the start of a new round"""
+        self.last_hands = None
+        self.discard_specific_prefetch()
+
+    def invalidate_tracking(self):
+        """Rescan the whole table next read, e.g. when a split adds a hand"""
+        self.box_tracker.invalidate()
+
+    def _track_active_hand(self, hands: List[PlayerHand]) -> PlayerHands:
+        """The active hand is the one that just changed, else the previous one"""
+        previous = self.last_hands
+        changed = []
+        kept_active = None
+        for index, hand in enumerate(hands):
+            match_index = self._match_previous(hand, previous)
+            if match_index is None or previous.hands[match_index].value != hand.value:
+                if hand.value:
+                    changed.append(index)
+            elif match_index == previous.active_index:
+                kept_active = index
+
+        if changed:
+            active_index = changed[0]
+        elif kept_active is not None:
+            active_index = kept_active
+        else:
+            active_index = 0
+        self.last_hands = PlayerHands(hands, active_index)
+        return self.last_hands
+
+    @staticmethod
+    def _match_previous(
+        hand: PlayerHand, previous: Optional[PlayerHands]
+    ) -> Optional[int]:
+        """Index of the previous hand box at the same position, if any"""
+        if previous is None:
+            return None
+        x1, _, x2, _ = hand.box
+        center = (x1 + x2) / 2
+        for index, old in enumerate(previous.hands):
+            old_center = (old.box[0] + old.box[2]) / 2
+            if abs(center - old_center) <= (x2 - x1) / 2:
+                return index
+        return None
+
     def read_dealer_card(self, cached_dealer: Optional[str] = None) -> Optional[str]:
         """Read dealer card, using cache if available"""
         if cached_dealer:
@@ -41,9 +162,11 @@ class CardReader:
                 )
                 if not dealer_boxes or len(dealer_boxes) == 0:
                     return None
-                dealer_text = str(OCR.ocr_card(dealer_boxes[0][0], mode="dealer"))
+                label, confidence = self._ocr_region(dealer_boxes[0][0], "dealer")
             else:
-                dealer_text = str(OCR.ocr_card(self.dealer_bbox, mode="dealer"))
+                label, confidence = self._ocr_region(self.dealer_bbox, "dealer")
+            dealer_text = str(label)
+            self.last_dealer_confidence = confidence
 
             if dealer_text == "None":
                 return None
@@ -59,9 +182,166 @@ class CardReader:
         except Exception:
             return None
 
+    def _ocr_region(self, bbox, mode: str) -> Tuple[Optional[str], float]:
+        img = OCR.grab_region(bbox)
+        label, confidence, confident = self._recognize([img], mode)[0]
+        if confident:
+            return label, confidence
+        return self._vote(bbox, mode, img, label, confidence)
+
+    def _recognize(self, images, mode: str) -> List[Tuple[Optional[str], float, bool]]:
+        """(label, confidence, confident) for each image"""
+        if self.cascade is not None:
+            reads = []
+            for img in images:
+                label, confidence = self.cascade.recognize(img, mode)
+                reads.append((label, confidence, self.cascade.last_confident))
+            return reads
+        if self.recognition is not None:
+            results = self.recognition.recognize_many(images, mode)
+        else:
+            results = OCR.recognize_card_images(images, mode=mode)
+        return [
+            (label, confidence, bool(label) and confidence >= self.vote_confidence)
+            for label, confidence in results
+        ]
+
+    def _vote(
+        self, bbox, mode: str, img, label: Optional[str], confidence: float
+    ) -> Tuple[Optional[str], float]:
+        """
+        Re-read a borderline region on fresh frames until one label has a
+        majority of vote_frames reads, a read is confident, or vote_seconds
+        pass. Frames whose pixels haven't changed are skipped without OCR,
+        they would only read the same again. A failed read isn't voted on,
+        the caller reads it again anyway.
+        """
+        if self.vote_frames <= 1 or label is None:
+            return label, confidence
+        self.votes_started += 1
+        started = time.perf_counter()
+        deadline = started + self.vote_seconds
+        needed = self.vote_frames // 2 + 1
+        votes = Counter([label])
+        best = {label: confidence}
+        winner = None
+        reads = 1
+        while reads < self.vote_frames and time.perf_counter() < deadline:
+            # A shared multi-table frame would only hand back the same pixels
+            screen_capture.require_new_frame()
+            frame = OCR.grab_region(bbox)
+            if frame.shape == img.shape and np.array_equal(frame, img):
+                time.sleep(0.01)
+                continue
+            img = frame
+            reads += 1
+            read, read_confidence, confident = self._recognize([img], mode)[0]
+            if not read:
+                continue
+            if confident:
+                winner = (read, read_confidence)
+                break
+            votes[read] += 1
+            best[read] = max(best.get(read, 0.0), read_confidence)
+            if votes[read] >= needed:
+                break
+        self.vote_seconds_spent += time.perf_counter() - started
+        if winner is None:
+            majority = votes.most_common(1)[0][0]
+            winner = (majority, best[majority])
+        if winner[0] != label:
+            self.votes_overturned += 1
+        return winner
+
     def read_specific_card(self) -> Optional[str]:
         """Read specific card for special rules (e.g., 15v10 with 7-8)"""
+        prefetch = self._specific_prefetch
+        self._specific_prefetch = None
         try:
+            if prefetch is not None:
+                try:
+                    label = prefetch.result(timeout=2.0)[0]
+                    self.prefetches_used += 1
+                    return label
+                except FutureTimeoutError:
+                    # Still queued or loading its model, read it here instead
+                    prefetch.cancel()
+                    self.prefetches_timed_out += 1
+                    return OCR.ocr_specific_card(self.specific_card)
+            if self.recognition is not None:
+                img = OCR.grab_region(self.specific_card)
+                return self.recognition.recognize(img, "specific")[0]
             return OCR.ocr_specific_card(self.specific_card)
         except Exception:
             return None
+
+    def prefetch_specific_card(self):
+        """
+        Capture the specific card now and recognize it on a worker thread,
+        so it's ready if the dealer read turns out to be a 10
+        """
+        if self._specific_prefetch is not None or not self.specific_card:
+            return
+        try:
+            img = OCR.grab_region(self.specific_card)
+        except Exception:
+            return
+        self.prefetches_started += 1
+        if self.recognition is not None:
+            self._specific_prefetch = self.recognition.submit(img, "specific")
+            return
+        self._specific_prefetch = self._prefetch_pool.submit(
+            self._recognize_specific_card, img
+        )
+
+    def warm_prefetch_model(self):
+        """
+        Load the prefetch thread's model in the background now, so the first
+        prefetch doesn't wait for it. Not needed when a RecognitionService runs.
+        """
+        if self.recognition is None and self.specific_card:
+            self._prefetch_pool.submit(self._get_prefetch_model)
+
+    def _get_prefetch_model(self):
+        if self._prefetch_model is None:
+            self._prefetch_model = OCR.create_ocr_model()
+        return self._prefetch_model
+
+    def _recognize_specific_card(self, img) -> Tuple[Optional[str], float]:
+        """Runs on the prefetch thread with its own model"""
+        label = OCR.ocr_specific_card_image(img, model=self._get_prefetch_model())
+        return label, 0.0
+
+    def discard_specific_prefetch(self):
+        """Drop a speculative read that no decision needs"""
+        if self._specific_prefetch is None:
+            return
+        self._specific_prefetch.cancel()
+        self._specific_prefetch = None
+        self.prefetches_discarded += 1
+
+    def close(self):
+        """Stop the prefetch thread and drop its model"""
+        self._specific_prefetch = None
+        self._prefetch_pool.shutdown(wait=True, cancel_futures=True)
+        self._prefetch_model = None
+
+    def print_stats(self):
+        self.box_tracker.print_stats()
+        if self.cascade is not None:
+            self.cascade.print_stats()
+        if self.recognition is not None:
+            self.recognition.print_stats()
+        if self.votes_started:
+            print(
+                f"Frame voting: {self.votes_started} borderline reads, "
+                f"{self.votes_overturned} overturned, "
+                f"{self.vote_seconds_spent / self.votes_started * 1000:.0f} ms added "
+                "per vote"
+            )
+        if self.prefetches_started:
+            print(
+                f"Specific card prefetch: {self.prefetches_started} started, "
+                f"{self.prefetches_used} used, {self.prefetches_discarded} discarded, "
+                f"{self.prefetches_timed_out} timed out"
+            )
@@ -0,0 +1,104 @@
+from typing import Optional, Set, Tuple
+
+
+def _hands(label: str) -> Set[Tuple[int, bool]]:
+    """(count with every ace as 1, holds an ace) hands a total label can show"""
+    if "_" in label:
+        return {(int(label.split("_")[0]), True)}
+    total = int(label)
+    if total <= 11:
+        # An ace with 11 or less would show soft
+        return {(total, False)}
+    return {(total, False), (total, True)}
+
+
+def _label(low: int, ace: bool) -> str:
+    if ace and low + 10 < 21:
+        return f"{low}_{low + 10}"
+    if ace and low + 10 == 21:
+        return "21"
+    return str(low)
+
+
+def totals_after_hit(label: str) -> Set[str]:
+    """Every total a hand showing label can show after drawing one card"""
+    totals = set()
+    for low, ace in _hands(label):
+        for card in range(1, 11):
+            totals.add(_label(low + card, ace or card == 1))
+    return totals
+
+
+class HandValidator:
+    """Rejects reads the hand's history makes impossible.
+
+    After a HIT the total is either still the one hit on, until the card
+    lands, or one card more: it can't drop, and it only turns soft when that
+    card is an ace. A rejected read is re-read up to ``rereads`` times straight away, and a
+    value rejected ``trust_after`` times in a row is accepted anyway, in case
+    the read it was checked against was the wrong one.
+    """
+
+    def __init__(self, rereads: int = 2, trust_after: int = 6):
+        self.rereads = rereads
+        self.trust_after = trust_after
+        # Total the bot last hit on, and the hand it was on
+        self.hit_on: Optional[str] = None
+        self.hit_hand = 0
+        self._rejected: Optional[Tuple[str, str]] = None
+        self._rejected_count = 0
+        self.player_rejected = 0
+        self.prevented = 0
+        self.trusted = 0
+
+    def new_round(self):
+        self.hit_on = None
+        self._rejected = None
+        self._rejected_count = 0
+
+    def hit(self, player: str, hand_index: int = 0):
+        """The bot hit the hand at hand_index while it showed player"""
+        self.hit_on = player
+        self.hit_hand = hand_index
+
+    def check_player(self, player: str, hand_index: int = 0) -> bool:
+        """Whether the active hand can show player, given the last HIT"""
+        if self.hit_on is None or hand_index != self.hit_hand:
+            return True
+        if player == self.hit_on or player in totals_after_hit(self.hit_on):
+            return self._accept("player")
+        self.player_rejected += 1
+        return self._reject("player", player)
+
+    def _accept(self, kind: str) -> bool:
+        if self._rejected is not None and self._rejected[0] == kind:
+            # A consistent read replaced an impossible one before it was acted on
+            self.prevented += 1
+            self._rejected = None
+            self._rejected_count = 0
+        return True
+
+    def _reject(self, kind: str, value: str) -> bool:
+        """False, or True once the same value has been rejected trust_after times"""
+        if self._rejected == (kind, value):
+            self._rejected_count += 1
+        else:
+            self._rejected = (kind, value)
+            self._rejected_count = 1
+        if self._rejected_count < self.trust_after:
+            return False
+        self.trusted += 1
+        self._rejected = None
+        self._rejected_count = 0
+        if kind == "player":
+            self.hit_on = None
+        return True
+
+    def print_stats(self):
+        if not self.player_rejected:
+            return
+        print(
+            f"Hand validator: {self.player_rejected} impossible reads rejected, "
+            f"{self.prevented} wrong actions prevented, "
+            f"{self.trusted} accepted after repeating"
+        )
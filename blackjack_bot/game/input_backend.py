@@ -0,0 +1,291 @@
+import abc
+import ctypes
+import ctypes.util
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import screen_capture
+
+
+class ClickLatencyTracker:
+    """Times each click from being issued to the first screen change it causes"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._pending: Optional[Tuple[str, float]] = None
+        self.last: Optional[float] = None
+
+    def click_issued(self, label: str = ""):
+        self._pending = (label or "click", time.perf_counter())
+
+    def screen_changed(self):
+        """Call when a detector sees the screen react. Closes the pending click."""
+        if self._pending is None:
+            return
+        label, issued_at = self._pending
+        self._pending = None
+        self.last = time.perf_counter() - issued_at
+        self.samples.setdefault(label, []).append(self.last)
+
+    def print_stats(self):
+        for label, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            median = ordered[len(ordered) // 2]
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(
+                f"Click->screen {label}: n={len(ordered)} "
+                f"p50={median * 1000:.0f}ms p95={p95 * 1000:.0f}ms"
+            )
+
+
+class InputBackend(abc.ABC):
+    """Base class for sending clicks. Subclasses implement _send_click."""
+
+    name = "base"
+
+    def __init__(self):
+        self.latency = ClickLatencyTracker()
+
+    def click(self, x: float, y: float, label: str = ""):
+        """Click at absolute screen coordinates and start the latency timer"""
+        self._send_click(int(x), int(y))
+        screen_capture.mark_click()
+        self.latency.click_issued(label)
+
+    @abc.abstractmethod
+    def _send_click(self, x: int, y: int):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    """Original behavior: moveTo then click, with pyautogui.PAUSE after each"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+
+        self._pyautogui = pyautogui
+
+    def _send_click(self, x: int, y: int):
+        self._pyautogui.moveTo(x, y, duration=0)
+        self._pyautogui.click()
+
+
+class LowLatencyBackend(InputBackend):
+    """Move and click without the global pause.
+
+    On Windows the move, button down and button up go out in one SendInput
+    call. Elsewhere pyautogui.click moves and clicks in one call with
+    _pause disabled.
+    """
+
+    name = "lowlatency"
+
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+
+    def __init__(self):
+        super().__init__()
+        self._user32 = None
+        self._pyautogui = None
+        if sys.platform == "win32":
+            self._load_user32()
+        else:
+            import pyautogui
+
+            self._pyautogui = pyautogui
+
+    def _send_click(self, x: int, y: int):
+        if self._user32 is None:
+            self._pyautogui.click(x, y, _pause=False)
+            return
+        self._send_input(x, y)
+
+    def _load_user32(self):
+        self._user32 = ctypes.windll.user32
+        # Match the physical pixel coordinates ImageGrab uses
+        self._user32.SetProcessDPIAware()
+        self._screen_w = self._user32.GetSystemMetrics(0)
+        self._screen_h = self._user32.GetSystemMetrics(1)
+
+    def _send_input(self, x: int, y: int):
+        dx = int(x * 65535 / max(self._screen_w - 1, 1))
+        dy = int(y * 65535 / max(self._screen_h - 1, 1))
+        flags = [
+            self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE,
+            self.MOUSEEVENTF_LEFTDOWN,
+            self.MOUSEEVENTF_LEFTUP,
+        ]
+        inputs = (_INPUT * len(flags))()
+        for event, flag in zip(inputs, flags):
+            event.type = 0  # INPUT_MOUSE
+            event.mi = _MOUSEINPUT(dx, dy, 0, flag, 0, 0)
+        self._user32.SendInput(len(flags), inputs, ctypes.sizeof(_INPUT))
+
+
+class NativeBackend(LowLatencyBackend):
+    """Low latency clicks that never import pyautogui, and with it tkinter.
+
+    SendInput on Windows like LowLatencyBackend, elsewhere the X11 XTest
+    extension through ctypes. Used by the headless daemon.
+    """
+
+    name = "native"
+
+    def __init__(self):
+        InputBackend.__init__(self)
+        self._user32 = None
+        if sys.platform == "win32":
+            self._load_user32()
+            return
+        xlib = ctypes.util.find_library("X11")
+        xtst = ctypes.util.find_library("Xtst")
+        if not xlib or not xtst:
+            raise RuntimeError(
+                "The native input backend needs Windows or X11 with XTest"
+            )
+        self._xlib = ctypes.cdll.LoadLibrary(xlib)
+        self._xtst = ctypes.cdll.LoadLibrary(xtst)
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self._xtst.XTestFakeMotionEvent.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_ulong,
+        ]
+        self._xtst.XTestFakeButtonEvent.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_ulong,
+        ]
+        self._display = self._xlib.XOpenDisplay(None)
+        if not self._display:
+            raise RuntimeError("Can't open the X display for the native input backend")
+
+    def _send_click(self, x: int, y: int):
+        if self._user32 is not None:
+            self._send_input(x, y)
+            return
+        # Screen -1 is the pointer's current screen, button 1 the left button
+        self._xtst.XTestFakeMotionEvent(self._display, -1, x, y, 0)
+        self._xtst.XTestFakeButtonEvent(self._display, 1, True, 0)
+        self._xtst.XTestFakeButtonEvent(self._display, 1, False, 0)
+        self._xlib.XFlush(self._display)
+
+
+class RecordingBackend(InputBackend):
+    """Records clicks instead of sending them, for replay and tests"""
+
+    name = "recording"
+
+    def __init__(self, on_click=None):
+        super().__init__()
+        self.clicks: List[Tuple[float, int, int, str]] = []
+        self.on_click = on_click
+
+    def click(self, x: float, y: float, label: str = ""):
+        self.clicks.append((time.time(), int(x), int(y), label))
+        super().click(x, y, label)
+
+    def _send_click(self, x: int, y: int):
+        if self.on_click is not None:
+            self.on_click(x, y)
+
+
+class ClickQueue:
+    """Sends clicks from several tables one at a time through a single backend"""
+
+    def __init__(self, backend: InputBackend):
+        self.backend = backend
+        self.wait_times: List[float] = []
+        self._queue: "queue.Queue[Tuple[int, int, threading.Event, float]]" = (
+            queue.Queue()
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, x: int, y: int):
+        """Queue a click and wait until it has been sent"""
+        done = threading.Event()
+        self._queue.put((x, y, done, time.perf_counter()))
+        done.wait()
+
+    def _run(self):
+        while True:
+            x, y, done, queued_at = self._queue.get()
+            self.wait_times.append(time.perf_counter() - queued_at)
+            try:
+                self.backend._send_click(x, y)
+            except Exception as e:
+                print(f"ERROR sending click: {e}")
+            finally:
+                done.set()
+
+    def print_stats(self):
+        if not self.wait_times:
+            return
+        ordered = sorted(self.wait_times)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"Click queue: {len(ordered)} clicks, "
+            f"p95 wait {p95 * 1000:.0f}ms, max {ordered[-1] * 1000:.0f}ms"
+        )
+
+
+class QueuedBackend(InputBackend):
+    """One table's view of a shared ClickQueue, with its own latency tracker"""
+
+    name = "queued"
+
+    def __init__(self, click_queue: ClickQueue):
+        super().__init__()
+        self.click_queue = click_queue
+
+    def _send_click(self, x: int, y: int):
+        self.click_queue.send(x, y)
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUT(ctypes.Structure):
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", _MOUSEINPUT)]
+
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+
+INPUT_BACKENDS = {
+    PyAutoGuiBackend.name: PyAutoGuiBackend,
+    LowLatencyBackend.name: LowLatencyBackend,
+    NativeBackend.name: NativeBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def create_input_backend(name: str = "lowlatency") -> InputBackend:
+    """Build an input backend by its Vars.txt name"""
+    if name not in INPUT_BACKENDS:
+        print(f"WARNING: Unknown input backend '{name}', using lowlatency")
+        name = LowLatencyBackend.name
+    return INPUT_BACKENDS[name]()
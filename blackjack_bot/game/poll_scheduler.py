@@ -0,0 +1,96 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from ..enums import GamePhase
+
+# (fastest, slowest) poll interval in seconds for each phase
+PHASE_POLL_BOUNDS: Dict[GamePhase, Tuple[float, float]] = {
+    GamePhase.WAITING_FOR_CARD_CHANGE: (0.002, 0.01),
+    GamePhase.ACTIVE_GAME: (0.002, 0.02),
+    GamePhase.DEALING: (0.005, 0.05),
+    GamePhase.WAITING_FOR_REBET: (0.01, 0.2),
+    GamePhase.HAND_COMPLETE: (0.02, 0.25),
+}
+
+
+class PollScheduler:
+    """Picks the sleep between ticks from how often each phase sees a change.
+
+    Each phase keeps a moving average of the time between changes and polls
+    about ``polls_per_change`` times in that span, clamped to the phase
+    bounds. With a CPU budget (fraction of one core) every interval is
+    stretched while the process uses more than that.
+    """
+
+    def __init__(
+        self,
+        bounds: Dict[GamePhase, Tuple[float, float]] = PHASE_POLL_BOUNDS,
+        cpu_budget: Optional[float] = None,
+        polls_per_change: int = 20,
+        smoothing: float = 0.2,
+        window: float = 1.0,
+    ):
+        self.bounds = bounds
+        self.cpu_budget = cpu_budget
+        self.polls_per_change = polls_per_change
+        self.smoothing = smoothing
+        self.window = window
+        self.polls = 0
+        self.throttle = 1.0
+        self._change_gap: Dict[GamePhase, float] = {}
+        self._phase: Optional[GamePhase] = None
+        self._last_change = 0.0
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self._window_wall = self._started_wall
+        self._window_cpu = self._started_cpu
+
+    def next_interval(self, phase: GamePhase, changed: bool) -> float:
+        """Record one tick and return how long to sleep before the next one"""
+        now = time.perf_counter()
+        self.polls += 1
+        if phase != self._phase:
+            self._phase = phase
+            self._last_change = now
+        if changed:
+            gap = now - self._last_change
+            previous = self._change_gap.get(phase, gap)
+            self._change_gap[phase] = previous + self.smoothing * (gap - previous)
+            self._last_change = now
+        self._update_throttle(now)
+        if changed:
+            # Something just happened, look again straight away
+            return 0.0
+        return self.interval(phase)
+
+    def interval(self, phase: GamePhase) -> float:
+        fastest, slowest = self.bounds[phase]
+        gap = self._change_gap.get(phase)
+        base = fastest if gap is None else gap / self.polls_per_change
+        return min(max(base, fastest), slowest) * self.throttle
+
+    def _update_throttle(self, now: float):
+        if not self.cpu_budget or now - self._window_wall < self.window:
+            return
+        cpu = time.process_time()
+        usage = (cpu - self._window_cpu) / (now - self._window_wall)
+        self._window_wall = now
+        self._window_cpu = cpu
+        if usage > self.cpu_budget:
+            self.throttle = min(self.throttle * 1.25, 20.0)
+        elif usage < self.cpu_budget * 0.8:
+            self.throttle = max(self.throttle / 1.25, 1.0)
+
+    def print_stats(self):
+        wall = time.perf_counter() - self._started_wall
+        cpu = time.process_time() - self._started_cpu
+        if wall <= 0:
+            return
+        budget = f", budget {self.cpu_budget * 100:.0f}%" if self.cpu_budget else ""
+        print(
+            f"Polling: {self.polls / wall:.1f} polls/s, "
+            f"CPU {cpu / wall * 100:.1f}% of one core{budget}, "
+            f"throttle x{self.throttle:.2f}"
+        )
+        for phase in self.bounds:
+            print(f"  {phase.value}: {self.interval(phase) * 1000:.1f}ms")
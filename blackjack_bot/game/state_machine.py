@@ -0,0 +1,125 @@
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from ..enums import Detector, Event, GamePhase
+
+# (phase, event) -> next phase. Events with no entry leave the phase unchanged.
+TRANSITIONS: Dict[Tuple[GamePhase, Event], GamePhase] = {
+    (GamePhase.DEALING, Event.REBET_AVAILABLE): GamePhase.WAITING_FOR_REBET,
+    (GamePhase.DEALING, Event.GAMEPLAY_BUTTONS): GamePhase.ACTIVE_GAME,
+    (GamePhase.WAITING_FOR_REBET, Event.REBET_CLICKED): GamePhase.DEALING,
+    (GamePhase.WAITING_FOR_REBET, Event.NO_GAMEPLAY_BUTTONS): GamePhase.DEALING,
+    (GamePhase.ACTIVE_GAME, Event.REBET_AVAILABLE): GamePhase.WAITING_FOR_REBET,
+    (GamePhase.ACTIVE_GAME, Event.NO_GAMEPLAY_BUTTONS): GamePhase.HAND_COMPLETE,
+    (GamePhase.ACTIVE_GAME, Event.CARD_REQUESTED): GamePhase.WAITING_FOR_CARD_CHANGE,
+    (GamePhase.WAITING_FOR_CARD_CHANGE, Event.PLAYER_CHANGED): GamePhase.ACTIVE_GAME,
+    (GamePhase.WAITING_FOR_CARD_CHANGE, Event.TIMEOUT): GamePhase.ACTIVE_GAME,
+    # A busting hit ends the hand instead of changing the total
+    (
+        GamePhase.WAITING_FOR_CARD_CHANGE,
+        Event.NO_GAMEPLAY_BUTTONS,
+    ): GamePhase.HAND_COMPLETE,
+    (
+        GamePhase.WAITING_FOR_CARD_CHANGE,
+        Event.REBET_AVAILABLE,
+    ): GamePhase.WAITING_FOR_REBET,
+    (GamePhase.HAND_COMPLETE, Event.REBET_AVAILABLE): GamePhase.WAITING_FOR_REBET,
+    (GamePhase.HAND_COMPLETE, Event.TIMEOUT): GamePhase.DEALING,
+}
+
+# Button scans each phase runs. Card reads happen only in the ACTIVE_GAME and
+# WAITING_FOR_CARD_CHANGE handlers, so they need no entry here.
+PHASE_DETECTORS: Dict[GamePhase, FrozenSet[Detector]] = {
+    GamePhase.DEALING: frozenset({Detector.BUTTONS}),
+    GamePhase.WAITING_FOR_REBET: frozenset({Detector.REBET}),
+    GamePhase.ACTIVE_GAME: frozenset({Detector.BUTTONS}),
+    GamePhase.WAITING_FOR_CARD_CHANGE: frozenset({Detector.BUTTONS}),
+    GamePhase.HAND_COMPLETE: frozenset({Detector.REBET}),
+}
+
+# Seconds a phase may last before Event.TIMEOUT fires
+PHASE_TIMEOUTS: Dict[GamePhase, float] = {
+    GamePhase.WAITING_FOR_CARD_CHANGE: 2.0,
+    GamePhase.HAND_COMPLETE: 10.0,
+}
+
+# Events that must be seen on consecutive ticks before they move the phase,
+# so a button bar caught mid-animation doesn't end the hand early
+DEBOUNCED: Dict[Tuple[GamePhase, Event], int] = {
+    (GamePhase.ACTIVE_GAME, Event.NO_GAMEPLAY_BUTTONS): 3,
+    (GamePhase.WAITING_FOR_CARD_CHANGE, Event.NO_GAMEPLAY_BUTTONS): 3,
+}
+
+
+class GameStateMachine:
+    """Explicit game phase driven by observation events.
+
+    Starts in DEALING, which runs the full button scan and resyncs to
+    whatever the table shows. Each phase declares the button scan it needs so
+    the bot only runs the full scan when a phase acts on its result.
+    """
+
+    def __init__(
+        self,
+        transitions: Dict[Tuple[GamePhase, Event], GamePhase] = TRANSITIONS,
+        detectors: Dict[GamePhase, FrozenSet[Detector]] = PHASE_DETECTORS,
+        timeouts: Dict[GamePhase, float] = PHASE_TIMEOUTS,
+        debounced: Dict[Tuple[GamePhase, Event], int] = DEBOUNCED,
+    ):
+        self.transitions = transitions
+        self.detectors = detectors
+        self.timeouts = timeouts
+        self.debounced = debounced
+        self.phase = GamePhase.DEALING
+        self.entered_at = time.time()
+        self.transition_count = 0
+        self._listeners: List[
+            Callable[[GamePhase, GamePhase, Optional[Event]], None]
+        ] = []
+        self._streak: Tuple[Optional[Event], int] = (None, 0)
+
+    def needs(self, detector: Detector) -> bool:
+        return detector in self.detectors[self.phase]
+
+    def on_transition(
+        self, callback: Callable[[GamePhase, GamePhase, Optional[Event]], None]
+    ):
+        """Register callback(old_phase, new_phase, event), called after every move"""
+        self._listeners.append(callback)
+
+    def fire(self, event: Event) -> bool:
+        """Apply an event. Returns True if the phase changed."""
+        target = self.transitions.get((self.phase, event))
+        if target is None:
+            self._streak = (None, 0)
+            return False
+        required = self.debounced.get((self.phase, event), 1)
+        if required > 1:
+            last_event, count = self._streak
+            count = count + 1 if last_event == event else 1
+            self._streak = (event, count)
+            if count < required:
+                return False
+        self._move(target, event)
+        return True
+
+    def check_timeout(self) -> bool:
+        """Fire Event.TIMEOUT if the current phase has run too long"""
+        timeout = self.timeouts.get(self.phase)
+        if timeout is None or time.time() - self.entered_at < timeout:
+            return False
+        return self.fire(Event.TIMEOUT)
+
+    def resync(self):
+        """Drop back to DEALING and rebuild the phase from a full scan"""
+        if self.phase != GamePhase.DEALING:
+            self._move(GamePhase.DEALING, None)
+
+    def _move(self, target: GamePhase, event: Optional[Event]):
+        previous = self.phase
+        self.phase = target
+        self.entered_at = time.time()
+        self.transition_count += 1
+        self._streak = (None, 0)
+        for callback in self._listeners:
+            callback(previous, target, event)
@@ -0,0 +1,3 @@
+from .store import HAND_DTYPE, HandHistory, HandRecord, list_months, load_month
+
+__all__ = ["HAND_DTYPE", "HandHistory", "HandRecord", "list_months", "load_month"]
@@ -0,0 +1,466 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import resource_path
+
+from ..strategy.decider import StrategyDecider
+from ..strategy.deviations import DeviationEngine
+from ..strategy.generator import (
+    DEALER_COLUMNS,
+    DEALER_UPCARDS,
+    HandEvaluator,
+    RuleSet,
+    dealer_distribution,
+    hand_value,
+)
+from ..strategy.tables import StrategyTables
+from .store import (
+    CTX_COMPOSITION_HIT,
+    CTX_DEVIATIONS,
+    CTX_DOUBLE_OFFERED,
+    CTX_FIRST,
+    CTX_SPLIT_HAND,
+    CTX_SPLIT_OFFERED,
+    list_months,
+    load_month,
+)
+
+HARD_READS = [str(total) for total in range(2, 21)]
+SOFT_READS = [f"{low}_{low + 10}" for low in range(1, 11)]
+PLAYER_READS = HARD_READS + SOFT_READS
+ACTIONS = "HSDPR"
+HIT, STAND, DOUBLE, SPLIT, SURRENDER = range(len(ACTIONS))
+
+# Decision contexts that allow different actions
+FIRST, SPLIT_HAND, LATER = range(3)
+
+MISREADS = ["soft read as hard", "hard read as soft", "inconsistent"]
+
+# Consecutive decisions further apart than this belong to different sessions
+SAME_HAND_SECONDS = 60.0
+
+# Records each worker audits, and the rows past them it may pair a hit with
+CHUNK_RECORDS = 1_000_000
+LOOKAHEAD_RECORDS = 64
+
+
+def _read_state(read: str) -> Tuple[int, bool]:
+    """(low total, has ace) for a player read like "16" or "7_17" """
+    if "_" in read:
+        return int(read.split("_")[0]), True
+    return int(read), False
+
+
+def _read_of(low: int, has_ace: bool) -> Optional[str]:
+    """Player read the table would show for a hand, None once it's 21 or over"""
+    value = hand_value(low, has_ace)
+    if value > 20:
+        return None
+    if has_ace and low + 10 <= 21:
+        return f"{low}_{value}"
+    return str(low)
+
+
+def _lookup(values: np.ndarray, codes: List[str]) -> np.ndarray:
+    """Index of each byte string in ``codes``, -1 when it isn't there"""
+    table = np.array(codes, dtype=values.dtype)
+    order = np.argsort(table)
+    ordered = table[order]
+    position = np.clip(np.searchsorted(ordered, values), 0, len(codes) - 1)
+    return np.where(ordered[position] == values, order[position], -1)
+
+
+def build_expected(tables: StrategyTables) -> np.ndarray:
+    """
+    Action index the decider picks for every (context, double offered,
+    split offered, player, dealer), following StrategyDecider's order of checks
+    """
+    expected = np.empty(
+        (3, 2, 2, len(PLAYER_READS), len(DEALER_COLUMNS)), dtype=np.uint8
+    )
+    for context, offered, split_offered in np.ndindex(3, 2, 2):
+        can_double = context != LATER and offered == 1
+        for p, read in enumerate(PLAYER_READS):
+            for d, dealer in enumerate(DEALER_COLUMNS):
+                if (
+                    context != LATER
+                    and split_offered
+                    and read in StrategyDecider.PAIR_NOTATIONS
+                    and bool(tables.split_cache.get((read, dealer), False))
+                ):
+                    action = SPLIT
+                elif (
+                    context == FIRST
+                    and "_" not in read
+                    and bool(tables.surrender_cache.get((read, dealer), False))
+                ):
+                    action = SURRENDER
+                else:
+                    cache = tables.soft_cache if "_" in read else tables.hard_cache
+                    letter = cache.get((read, dealer), "S")
+                    if letter == "Ds":
+                        action = DOUBLE if can_double else STAND
+                    elif letter == "D":
+                        action = DOUBLE if can_double else HIT
+                    else:
+                        action = ACTIONS.index(letter)
+                expected[context, offered, split_offered, p, d] = action
+    return expected
+
+
+def build_deviations(entries: Dict) -> np.ndarray:
+    """
+    Which (expected, taken) action swaps a deviation index can make at every
+    (player, dealer), from DeviationEngine entries
+    """
+    deviates = np.zeros(
+        (len(PLAYER_READS), len(DEALER_COLUMNS), len(ACTIONS), len(ACTIONS)),
+        dtype=bool,
+    )
+    letters = {"H": [HIT], "S": [STAND], "D": [DOUBLE, HIT], "Ds": [DOUBLE, STAND]}
+    for (table, player, dealer), (_, _, action) in entries.items():
+        if player not in PLAYER_READS or dealer not in DEALER_COLUMNS:
+            continue
+        spot = deviates[PLAYER_READS.index(player), DEALER_COLUMNS.index(dealer)]
+        if table in ("hard", "soft"):
+            for taken in letters.get(action, []):
+                spot[:, taken] = True
+        else:
+            option = SPLIT if table == "split" else SURRENDER
+            if action:
+                spot[:, option] = True
+            else:
+                # The index turns the option off, any other action may follow
+                spot[option, :] = True
+                spot[option, option] = False
+    return deviates
+
+
+def _ev_column(upcard: int, rules: RuleSet) -> np.ndarray:
+    """EV of each action for every player read against one upcard. Runs in a worker."""
+    evaluator = HandEvaluator(dealer_distribution(upcard, rules))
+    column = np.full((len(PLAYER_READS), len(ACTIONS)), np.nan)
+    for p, read in enumerate(PLAYER_READS):
+        low, has_ace = _read_state(read)
+        column[p, HIT] = evaluator.hit(low, has_ace)
+        column[p, STAND] = evaluator.stand(hand_value(low, has_ace))
+        column[p, DOUBLE] = evaluator.double(low, has_ace)
+        if read in StrategyDecider.PAIR_NOTATIONS:
+            card = 1 if has_ace else low // 2
+            column[p, SPLIT] = evaluator.split(card, rules.double_after_split)
+        if rules.late_surrender and not has_ace:
+            column[p, SURRENDER] = -0.5
+    return column
+
+
+def build_transitions() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Which reads can follow each read after one hit, and the index of the
+    soft (for hard reads) and hard (for soft reads) read with the same total
+    """
+    index = {read: p for p, read in enumerate(PLAYER_READS)}
+    reachable = np.zeros((len(PLAYER_READS), len(PLAYER_READS)), dtype=bool)
+    as_soft = np.full(len(PLAYER_READS), -1)
+    as_hard = np.full(len(PLAYER_READS), -1)
+    for p, read in enumerate(PLAYER_READS):
+        low, has_ace = _read_state(read)
+        for card in range(1, 11):
+            after = _read_of(low + card, has_ace or card == 1)
+            if after is not None:
+                reachable[p, index[after]] = True
+        if has_ace:
+            as_hard[p] = index.get(str(low + 10), -1)
+        else:
+            as_soft[p] = index.get(f"{low - 10}_{low}", -1)
+    return reachable, as_soft, as_hard
+
+
+@dataclass
+class AuditResult:
+    """Counts and EV costs, in initial bets, summed over one or more months"""
+
+    decisions: int = 0
+    unreadable: int = 0
+    misplays: int = 0
+    misplay_cost: float = 0.0
+    deviation_plays: int = 0
+    deviation_cost: float = 0.0
+    misreads: np.ndarray = field(default_factory=lambda: np.zeros(len(MISREADS), int))
+    misread_cost: np.ndarray = field(default_factory=lambda: np.zeros(len(MISREADS)))
+    # Misplay counts and costs by player, dealer, expected action, action taken
+    cells: np.ndarray = field(
+        default_factory=lambda: np.zeros(
+            (len(PLAYER_READS), len(DEALER_COLUMNS), len(ACTIONS), len(ACTIONS)), int
+        )
+    )
+    cell_cost: np.ndarray = field(
+        default_factory=lambda: np.zeros(
+            (len(PLAYER_READS), len(DEALER_COLUMNS), len(ACTIONS), len(ACTIONS))
+        )
+    )
+
+    def merge(self, other: "AuditResult"):
+        self.decisions += other.decisions
+        self.unreadable += other.unreadable
+        self.misplays += other.misplays
+        self.misplay_cost += other.misplay_cost
+        self.deviation_plays += other.deviation_plays
+        self.deviation_cost += other.deviation_cost
+        self.misreads += other.misreads
+        self.misread_cost += other.misread_cost
+        self.cells += other.cells
+        self.cell_cost += other.cell_cost
+
+    def print_report(self, top: int = 10):
+        print("=" * 50)
+        print(f"Decisions audited: {self.decisions} ({self.unreadable} unreadable)")
+        if self.decisions:
+            rate = self.misplays / self.decisions * 100
+            print(
+                f"Misplays: {self.misplays} ({rate:.2f}%), "
+                f"EV cost {self.misplay_cost:.2f} bets "
+                f"({self.misplay_cost / self.decisions * 1000:.2f} per 1000 decisions)"
+            )
+        if self.deviation_plays:
+            print(
+                f"Count deviations: {self.deviation_plays}, "
+                f"EV vs basic strategy {-self.deviation_cost:+.2f} bets"
+            )
+        for name, count, cost in zip(MISREADS, self.misreads, self.misread_cost):
+            if count:
+                print(f"Misread ({name}): {count}, EV cost {cost:.2f} bets")
+        worst = np.argsort(self.cell_cost, axis=None)[::-1][:top]
+        for flat in worst:
+            p, d, expected, taken = np.unravel_index(flat, self.cells.shape)
+            count = self.cells[p, d, expected, taken]
+            if not count:
+                break
+            print(
+                f"  {PLAYER_READS[p]} v {DEALER_COLUMNS[d]}: took {ACTIONS[taken]}, "
+                f"table says {ACTIONS[expected]} x{count} "
+                f"(cost {self.cell_cost[p, d, expected, taken]:.2f})"
+            )
+        print("=" * 50)
+
+
+def audit_decisions(
+    rows: np.ndarray,
+    expected: np.ndarray,
+    ev: np.ndarray,
+    transitions: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    deviations: Optional[np.ndarray] = None,
+    owned: Optional[int] = None,
+) -> AuditResult:
+    """
+    Audit a DECISION_DTYPE array in one vectorized pass. A mismatch counts as
+    a deviation play when deviations (from build_deviations) has an index for
+    it. Only the first ``owned`` rows are audited, later ones only serve as the
+    read that follows a hit.
+    """
+    result = AuditResult()
+    owned = len(rows) if owned is None else min(owned, len(rows))
+    result.decisions = owned
+    if not owned:
+        return result
+    own = np.arange(len(rows)) < owned
+    # Tables' rows interleave in multi-table mode, keep each table's in order
+    order = np.lexsort((rows["time"], rows["table"]))
+    rows, own = rows[order], own[order]
+
+    p = _lookup(rows["player"], PLAYER_READS)
+    d = _lookup(rows["dealer"], DEALER_COLUMNS)
+    taken = _lookup(rows["action"], list(ACTIONS))
+    valid = (p >= 0) & (d >= 0) & (taken >= 0)
+    result.unreadable = int((~valid & own).sum())
+    p, d, taken = (
+        np.where(valid, p, 0),
+        np.where(valid, d, 0),
+        np.where(valid, taken, 0),
+    )
+
+    bits = rows["context"]
+    context = np.where(
+        bits & CTX_SPLIT_HAND, SPLIT_HAND, np.where(bits & CTX_FIRST, FIRST, LATER)
+    )
+    offered = ((bits & CTX_DOUBLE_OFFERED) > 0).astype(int)
+    # A double that went through was offered, even if the first snapshot missed it
+    offered = np.where(taken == DOUBLE, 1, offered)
+    split_offered = ((bits & CTX_SPLIT_OFFERED) > 0).astype(int)
+    split_offered = np.where(taken == SPLIT, 1, split_offered)
+    table = expected[context, offered, split_offered, p, d]
+    table = np.where(
+        (table == SURRENDER) & ((bits & CTX_COMPOSITION_HIT) > 0), HIT, table
+    )
+    cost = np.nan_to_num(ev[p, d, table] - ev[p, d, taken])
+
+    mismatch = own & valid & (table != taken)
+    # The count isn't logged, so a mismatch is a deviation play when an index
+    # for the spot would make it
+    explained = deviations[p, d, table, taken] if deviations is not None else False
+    deviation = mismatch & ((bits & CTX_DEVIATIONS) > 0) & explained
+    misplay = mismatch & ~deviation
+    result.misplays = int(misplay.sum())
+    result.misplay_cost = float(cost[misplay].sum())
+    result.deviation_plays = int(deviation.sum())
+    result.deviation_cost = float(cost[deviation].sum())
+    np.add.at(
+        result.cells,
+        (p[misplay], d[misplay], table[misplay], taken[misplay]),
+        1,
+    )
+    np.add.at(
+        result.cell_cost,
+        (p[misplay], d[misplay], table[misplay], taken[misplay]),
+        cost[misplay],
+    )
+
+    # A hit is followed by a read of the same hand. Reads no single card can
+    # reach mean one of the two was wrong.
+    reachable, as_soft, as_hard = transitions
+    before, after = slice(None, -1), slice(1, None)
+    follows = (
+        own[before]
+        & valid[before]
+        & valid[after]
+        & (taken[before] == HIT)
+        & (rows["table"][before] == rows["table"][after])
+        & (rows["hand"][before] == rows["hand"][after])
+        & (np.diff(rows["time"]) < SAME_HAND_SECONDS)
+        & ((bits[before] & CTX_SPLIT_HAND) == 0)
+        & ((bits[after] & CTX_SPLIT_HAND) == 0)
+    )
+    p0, p1 = p[before], p[after]
+    bad = follows & ~reachable[p0, p1]
+    soft = as_soft[p0]
+    hard = as_hard[p0]
+    soft_as_hard = bad & (soft >= 0) & reachable[np.maximum(soft, 0), p1]
+    hard_as_soft = (
+        bad & ~soft_as_hard & (hard >= 0) & reachable[np.maximum(hard, 0), p1]
+    )
+    inconsistent = bad & ~soft_as_hard & ~hard_as_soft
+
+    d0, taken0 = d[before], taken[before]
+    context0, offered0, split0 = context[before], offered[before], split_offered[before]
+    for index, (mask, actual) in enumerate(
+        [(soft_as_hard, soft), (hard_as_soft, hard), (inconsistent, None)]
+    ):
+        result.misreads[index] = int(mask.sum())
+        if actual is None or not mask.any():
+            continue
+        actual = np.maximum(actual[mask], 0)
+        best = expected[context0[mask], offered0[mask], split0[mask], actual, d0[mask]]
+        result.misread_cost[index] = float(
+            np.nan_to_num(
+                ev[actual, d0[mask], best] - ev[actual, d0[mask], taken0[mask]]
+            ).sum()
+        )
+    return result
+
+
+def _audit_range(
+    folder: str,
+    month: str,
+    start: int,
+    stop: int,
+    expected,
+    ev,
+    transitions,
+    deviations,
+) -> AuditResult:
+    rows = load_month(folder, month, "decisions")[start : stop + LOOKAHEAD_RECORDS]
+    return audit_decisions(
+        rows, expected, ev, transitions, deviations, owned=stop - start
+    )
+
+
+def audit(
+    folder: str = "hand_history",
+    months: Optional[List[str]] = None,
+    strategy_sheet: str = "Strategy.xlsx",
+    rules: RuleSet = RuleSet(),
+    max_workers: Optional[int] = None,
+    deviations_file: Optional[str] = "Deviations.txt",
+    chunk_records: int = CHUNK_RECORDS,
+) -> AuditResult:
+    """
+    Audit every decision in ``months`` (default all). Each worker maps one
+    range of up to chunk_records records, so a busy month spreads over them all.
+    """
+    months = months or list_months(folder, "decisions")
+    expected = build_expected(
+        StrategyTables(resource_path.resource_path(strategy_sheet))
+    )
+    transitions = build_transitions()
+    deviations = None
+    if deviations_file and os.path.exists(deviations_file):
+        deviations = build_deviations(
+            DeviationEngine.from_file(deviations_file).entries
+        )
+    range_months, starts, stops = [], [], []
+    for month in months:
+        total = len(load_month(folder, month, "decisions"))
+        for start in range(0, total, chunk_records):
+            range_months.append(month)
+            starts.append(start)
+            stops.append(min(start + chunk_records, total))
+    result = AuditResult()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        columns = list(
+            pool.map(_ev_column, DEALER_UPCARDS, [rules] * len(DEALER_UPCARDS))
+        )
+        ev = np.stack(columns, axis=1)
+        count = len(starts)
+        for range_result in pool.map(
+            _audit_range,
+            [folder] * count,
+            range_months,
+            starts,
+            stops,
+            [expected] * count,
+            [ev] * count,
+            [transitions] * count,
+            [deviations] * count,
+        ):
+            result.merge(range_result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check logged decisions against the strategy tables"
+    )
+    parser.add_argument("--folder", default="hand_history")
+    parser.add_argument("--months", nargs="*", help="YYYY-MM months, default all")
+    parser.add_argument("--strategy", default="Strategy.xlsx")
+    parser.add_argument("--h17", action="store_true", help="Dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="No double after split")
+    parser.add_argument(
+        "--no-surrender", action="store_true", help="Late surrender not offered"
+    )
+    parser.add_argument(
+        "--deviations",
+        default="Deviations.txt",
+        help="Index table the bot ran with, mismatches it explains are deviations",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10, help="Costliest misplays shown")
+    args = parser.parse_args()
+
+    rules = RuleSet(
+        dealer_hits_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        late_surrender=not args.no_surrender,
+    )
+    result = audit(
+        args.folder, args.months, args.strategy, rules, args.workers, args.deviations
+    )
+    result.print_report(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..enums import Action
+
+# File header: magic, format version, record size. Bump the version whenever
+# HAND_DTYPE changes so old months are rejected instead of misread.
+MAGIC = b"BJHH"
+VERSION = 3
+HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "<u4"), ("itemsize", "<u4")])
+
+HAND_DTYPE = np.dtype(
+    [
+        ("time", "<f8"),  # Unix time the hand started
+        ("hand", "<u4"),  # Hand number within the session
+        ("table", "u1"),  # Table index in multi-table mode, else 0
+        ("player", "S6"),  # First player read, e.g. b"16" or b"8_18"
+        ("player_conf", "<f4"),
+        ("dealer", "S4"),
+        ("dealer_conf", "<f4"),
+        ("final_player", "S6"),  # Last player read of the hand
+        ("actions", "S8"),  # One ACTION_CODES letter per action, in order
+        ("flags", "u1"),  # FLAG_* bits
+        ("player_ms", "<f4"),  # Player OCR for the first decision
+        ("dealer_ms", "<f4"),  # Dealer OCR for the first decision
+        ("decide_ms", "<f4"),  # Reads done -> first action returned
+        ("click_ms", "<f4"),  # First click -> screen change, NaN if none seen
+        ("hand_s", "<f4"),  # Hand start -> hand complete
+    ]
+)
+
+# One row per decision the bot acted on, for the strategy audit
+DECISION_DTYPE = np.dtype(
+    [
+        ("time", "<f8"),
+        ("hand", "<u4"),
+        ("table", "u1"),
+        ("step", "u1"),  # Decision index within the hand
+        ("player", "S6"),
+        ("dealer", "S4"),
+        ("context", "u1"),  # CTX_* bits
+        ("action", "S1"),  # ACTION_CODES letter of the action taken
+    ]
+)
+
+RECORD_DTYPES = {"hands": HAND_DTYPE, "decisions": DECISION_DTYPE}
+
+ACTION_CODES = {
+    Action.HIT: "H",
+    Action.STAND: "S",
+    Action.DOUBLE: "D",
+    Action.SPLIT: "P",
+    Action.SURRENDER: "R",
+}
+
+FLAG_SPLIT = 1
+FLAG_DOUBLE = 2
+FLAG_SURRENDER = 4
+FLAG_TIMEOUT = 8
+
+CTX_FIRST = 1  # First decision of the hand, double and surrender allowed
+CTX_SPLIT_HAND = 2
+CTX_DOUBLE_OFFERED = 4  # Double button was on screen
+CTX_COMPOSITION_HIT = 8  # 15 v 10 hit because the specific card was a 7 or 8
+CTX_DEVIATIONS = 16  # Count based deviations were enabled
+CTX_SPLIT_OFFERED = 32  # Split button was on screen
+
+
+@dataclass
+class HandRecord:
+    """One hand as it's being played, turned into a HAND_DTYPE row when done"""
+
+    hand: int
+    player: str
+    dealer: str
+    player_conf: float = 0.0
+    dealer_conf: float = 0.0
+    started_at: float = 0.0
+    final_player: str = ""
+    actions: str = ""
+    flags: int = 0
+    player_ms: float = 0.0
+    dealer_ms: float = 0.0
+    decide_ms: float = float("nan")
+    click_ms: float = float("nan")
+    table: int = 0
+
+    def __post_init__(self):
+        self.started_at = self.started_at or time.time()
+        self.final_player = self.final_player or self.player
+
+    def add_action(self, action: Action, decide_seconds: Optional[float] = None):
+        code = ACTION_CODES.get(action)
+        if code is None:
+            return
+        if not self.actions and decide_seconds is not None:
+            self.decide_ms = decide_seconds * 1000
+        self.actions += code
+        if action == Action.SPLIT:
+            self.flags |= FLAG_SPLIT
+        elif action == Action.DOUBLE:
+            self.flags |= FLAG_DOUBLE
+        elif action == Action.SURRENDER:
+            self.flags |= FLAG_SURRENDER
+
+    def as_row(self) -> tuple:
+        return (
+            self.started_at,
+            self.hand,
+            self.table,
+            self.player,
+            self.player_conf,
+            self.dealer,
+            self.dealer_conf,
+            self.final_player,
+            # Longer split hands keep their first actions, the flags still hold
+            self.actions[: HAND_DTYPE["actions"].itemsize],
+            self.flags,
+            self.player_ms,
+            self.dealer_ms,
+            self.decide_ms,
+            self.click_ms,
+            time.time() - self.started_at,
+        )
+
+
+class HandHistory:
+    """Append-only binary hand and decision logs, one file per kind and month.
+
+    The bot thread only puts finished rows on a queue. A writer thread packs
+    them into RECORD_DTYPES arrays and appends a batch every ``batch_size``
+    rows or ``flush_interval`` seconds, whichever comes first. Tables in
+    multi-table mode share one HandHistory, so each file has one writer.
+    """
+
+    def __init__(
+        self,
+        folder: str = "hand_history",
+        batch_size: int = 64,
+        flush_interval: float = 5.0,
+    ):
+        self.folder = folder
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.hands_written = 0
+        self.batches_written = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+        os.makedirs(folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def record(self, hand: HandRecord):
+        if not self._closed:
+            self._queue.put(("hands", hand.as_row()))
+
+    def record_decision(
+        self,
+        hand: HandRecord,
+        player: str,
+        dealer: str,
+        context: int,
+        action: Action,
+    ):
+        """Log one decision of ``hand``. Call before adding the action to it."""
+        code = ACTION_CODES.get(action)
+        if code is None or self._closed:
+            return
+        row = (
+            time.time(),
+            hand.hand,
+            hand.table,
+            len(hand.actions),
+            player,
+            dealer,
+            context,
+            code,
+        )
+        self._queue.put(("decisions", row))
+
+    def flush(self, timeout: float = 2.0):
+        """Write out everything recorded so far"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _write(self):
+        pending: Dict[str, List[tuple]] = {kind: [] for kind in RECORD_DTYPES}
+        count = 0
+        deadline = None
+        while True:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+            if isinstance(item, tuple):
+                if not count:
+                    deadline = time.monotonic() + self.flush_interval
+                kind, row = item
+                pending[kind].append(row)
+                count += 1
+                if count < self.batch_size and time.monotonic() < deadline:
+                    continue
+            for kind, rows in pending.items():
+                if rows:
+                    self._append(kind, rows)
+                    rows.clear()
+            count = 0
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _append(self, kind: str, rows: List[tuple]):
+        dtype = RECORD_DTYPES[kind]
+        try:
+            batch = np.array(rows, dtype=dtype)
+            # Group by month so a batch spanning midnight on the 1st splits correctly
+            months = [
+                datetime.fromtimestamp(t).strftime("%Y-%m") for t in batch["time"]
+            ]
+            for month in sorted(set(months)):
+                mask = np.array([m == month for m in months])
+                path = month_path(self.folder, month, kind)
+                with open(path, "ab") as f:
+                    size = f.seek(0, os.SEEK_END)
+                    if size < HEADER_DTYPE.itemsize:
+                        f.truncate(0)
+                        np.array(
+                            [(MAGIC, VERSION, dtype.itemsize)], dtype=HEADER_DTYPE
+                        ).tofile(f)
+                    else:
+                        # Drop a partial record left by a crash so the batch lands aligned
+                        partial = (size - HEADER_DTYPE.itemsize) % dtype.itemsize
+                        if partial:
+                            f.truncate(size - partial)
+                    batch[mask].tofile(f)
+            if kind == "hands":
+                self.hands_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            # Never take the bot down over history
+            print(f"✗ Failed to write hand history: {e}")
+
+    def print_stats(self):
+        if self.hands_written:
+            print(
+                f"Hand history: {self.hands_written} hands in "
+                f"{self.batches_written} writes to {self.folder}"
+            )
+
+
+def month_path(folder: str, month: str, kind: str = "hands") -> str:
+    """Path of the ``kind`` file for a "YYYY-MM" month"""
+    return os.path.join(folder, f"{kind}-{month}.bin")
+
+
+def load_month(
+    folder: str = "hand_history", month: Optional[str] = None, kind: str = "hands"
+) -> np.ndarray:
+    """
+    Memory-map one month of history as a read-only RECORD_DTYPES[kind] array.
+    month is "YYYY-MM" and defaults to the current month.
+    """
+    dtype = RECORD_DTYPES[kind]
+    path = month_path(folder, month or datetime.now().strftime("%Y-%m"), kind)
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER_DTYPE.itemsize:
+        return np.zeros(0, dtype=dtype)
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+    if (
+        header["magic"] != MAGIC
+        or header["version"] != VERSION
+        or header["itemsize"] != dtype.itemsize
+    ):
+        raise ValueError(f"{path} is not a version {VERSION} {kind} history file")
+    # Ignore a partial record left by a crash mid-write, the next append drops it
+    count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(
+        path, dtype=dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,)
+    )
+
+
+def list_months(folder: str = "hand_history", kind: str = "hands") -> List[str]:
+    """Every "YYYY-MM" month with a ``kind`` file, oldest first"""
+    if not os.path.isdir(folder):
+        return []
+    prefix = f"{kind}-"
+    return sorted(
+        name[len(prefix) : -len(".bin")]
+        for name in os.listdir(folder)
+        if name.startswith(prefix) and name.endswith(".bin")
+    )
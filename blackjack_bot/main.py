@@ -10,13 +10,16 @@ from .bot import BlackjackBot
 def main(stop_event=None):
     variables = ReadVars.read_tuples_from_file("Vars.txt")
     bot = BlackjackBot(variables)
-    keyboard.add_hotkey("F8", bot.toggle_running)
+    hotkey = keyboard.add_hotkey("F8", bot.toggle_running)
     print("Press F8 to start/stop script. Press ESC to exit.")
 
-    bot_thread = threading.Thread(target=bot.run, daemon=True)
+    bot_thread = threading.Thread(target=bot.run, args=(stop_event,), daemon=True)
     bot_thread.start()
 
     try:
         bot_thread.join()
     except KeyboardInterrupt:
         print("Script interrupted")
+    finally:
+        # The GUI can start main() again, don't stack F8 handlers
+        keyboard.remove_hotkey(hotkey)
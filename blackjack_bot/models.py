@@ -1,6 +1,6 @@
 import time
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 from .enums import Action
 
@@ -11,10 +11,8 @@ class GameState:
 
     last_action: Action = Action.NONE
     in_split_hand: bool = False
-    hand_complete_printed: bool = False
     last_player_value: Optional[str] = None
     waiting_for_change: bool = False
-    change_start_time: float = 0
     cached_dealer: Optional[str] = None
     cached_dealer_hand_id: Optional[str] = None
     current_game_state: Optional[str] = None
@@ -29,6 +27,46 @@ class GameState:
         self.waiting_for_change = False
 
 
+@dataclass
+class ButtonSnapshot:
+    """Buttons seen in one capture, shared by every helper during a tick"""
+
+    buttons: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]] = field(
+        default_factory=dict
+    )
+    frame: Optional[object] = None
+    captured_at: float = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.buttons
+
+    def __getitem__(self, name: str):
+        return self.buttons[name]
+
+    def get(self, name: str, default=None):
+        return self.buttons.get(name, default)
+
+
+@dataclass
+class PlayerHand:
+    """One gold player total box and its OCR value"""
+
+    box: Tuple[int, int, int, int]
+    value: Optional[str]
+
+
+@dataclass
+class PlayerHands:
+    """Every player hand on the table, left to right, and the one being played"""
+
+    hands: List[PlayerHand]
+    active_index: int = 0
+
+    @property
+    def active(self) -> PlayerHand:
+        return self.hands[self.active_index]
+
+
 @dataclass
 class Statistics:
     """Track bot statistics"""
@@ -37,12 +75,17 @@ class Statistics:
     hands_played: int = 0
     start_time: Optional[float] = None
 
+    def hands_per_hour(self) -> float:
+        if not self.start_time:
+            return 0.0
+        hours = (time.time() - self.start_time) / 3600
+        return self.hands_played / hours if hours > 0 else 0.0
+
     def print_stats(self):
         """Print current statistics"""
         if self.start_time:
             elapsed = time.time() - self.start_time
-            hours = elapsed / 3600
-            hands_per_hour = self.hands_played / hours if hours > 0 else 0
+            hands_per_hour = self.hands_per_hour()
             print(f"Hands played: {self.hands_played}")
             print(f"Total bets placed: {self.bets_placed}")
             print(f"Elapsed time: {elapsed / 60:.2f} minutes")
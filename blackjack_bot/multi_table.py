@@ -0,0 +1,148 @@
+import argparse
+import threading
+import time
+from typing import List, Optional
+
+import keyboard
+
+import OCR
+import ReadVars
+import screen_capture
+
+from .bot import BlackjackBot
+from .game.input_backend import ClickQueue, QueuedBackend, create_input_backend
+from .history.store import HandHistory
+from .recognition import RecognitionService
+from .utils.event_log import event_log
+
+
+class MultiTableRunner:
+    """Runs one bot per table profile on a single shared screen capture.
+
+    Each table has its own thread and state machine. Grabs are cut from one
+    full-screen frame shared by all tables, and clicks go through one queue
+    so two tables never move the mouse at the same time.
+    """
+
+    def __init__(
+        self,
+        profiles: List[str],
+        base_config: str = "Vars.txt",
+        max_frame_age: float = 0.05,
+    ):
+        base = ReadVars.read_tuples_from_file(base_config)
+        screen_capture.enable_shared_frame(max_frame_age)
+        self.click_queue = ClickQueue(
+            create_input_backend(base.get("inputBackend", "lowlatency"))
+        )
+        OCR.configure_preprocessing(base)
+        # The in-process PaddleOCR model isn't thread-safe, so every table's
+        # OCR goes through worker processes, at least one
+        workers = max(1, base.get("recognitionWorkers", 0))
+        print(f"Starting {workers} OCR worker processes...")
+        self.recognition = RecognitionService(workers)
+        if not self.recognition.wait_ready():
+            event_log.warning(
+                "recognition_unhealthy",
+                "WARNING: OCR workers didn't start, recognizing in process",
+            )
+
+        # One writer for every table's rows, each row carries its table index
+        history_folder = base.get("handHistory", "hand_history")
+        self.history = HandHistory(history_folder) if history_folder else None
+
+        self.names = profiles
+        self.bots: List[BlackjackBot] = []
+        for table, profile in enumerate(profiles):
+            # A profile only needs the bboxes, everything else comes from the base config
+            config = dict(base)
+            config.update(ReadVars.read_tuples_from_file(profile))
+            print(f"Loading table {profile}")
+            self.bots.append(
+                BlackjackBot(
+                    config,
+                    QueuedBackend(self.click_queue),
+                    self.recognition,
+                    self.history,
+                    table,
+                )
+            )
+        self.running = False
+
+    def toggle_running(self):
+        self.running = not self.running
+        for bot in self.bots:
+            if bot.running != self.running:
+                bot.toggle_running()
+        if not self.running:
+            self.print_stats()
+
+    def print_stats(self):
+        event_log.flush()
+        total = 0.0
+        print("=" * 50)
+        for name, bot in zip(self.names, self.bots):
+            rate = bot.stats.hands_per_hour()
+            total += rate
+            print(f"{name}: {bot.stats.hands_played} hands, {rate:.1f} hands/hour")
+        per_table = total / len(self.bots) if self.bots else 0
+        print(f"All tables: {total:.1f} hands/hour ({per_table:.1f} per table)")
+        print(f"Full-screen grabs: {screen_capture.full_grabs}")
+        self.click_queue.print_stats()
+        print("=" * 50)
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Run every table until ESC or stop_event"""
+        stop_event = stop_event or threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._run_table, args=(bot, stop_event), daemon=True
+            )
+            for bot in self.bots
+        ]
+        for thread in threads:
+            thread.start()
+        while not stop_event.is_set():
+            if keyboard.is_pressed("esc"):
+                print("Exiting script.")
+                stop_event.set()
+                break
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join(timeout=5.0)
+        for bot in self.bots:
+            bot.close()
+        self.recognition.close()
+        if self.history is not None:
+            self.history.close()
+
+    @staticmethod
+    def _run_table(bot: BlackjackBot, stop_event: threading.Event):
+        event_log.bind(table=bot.table)
+        while not stop_event.is_set():
+            if not bot.running:
+                time.sleep(0.05)
+                continue
+            try:
+                bot.run_one_iteration()
+            except Exception as e:
+                event_log.error("loop_error", f"ERROR in table loop: {e}")
+                time.sleep(0.1)
+
+
+def main(profiles: List[str], stop_event=None):
+    runner = MultiTableRunner(profiles)
+    keyboard.add_hotkey("F8", runner.toggle_running)
+    print(f"{len(profiles)} tables loaded. Press F8 to start/stop. Press ESC to exit.")
+    try:
+        runner.run(stop_event)
+    except KeyboardInterrupt:
+        print("Script interrupted")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play several tables at once")
+    parser.add_argument(
+        "profiles", nargs="+", help="Vars.txt style files with each table's bboxes"
+    )
+    main(parser.parse_args().profiles)
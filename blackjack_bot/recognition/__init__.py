@@ -0,0 +1,3 @@
+from .service import RecognitionService
+
+__all__ = ["RecognitionService"]
@@ -0,0 +1,326 @@
+import abc
+import argparse
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+import OCR
+import resource_path
+
+Recognition = Tuple[Optional[str], float]
+
+CARD_FOLDER = "Captured_Cards"
+
+# Threshold of a tier that never reaches the calibration precision, above any confidence
+NEVER_ACCEPT = 2.0
+
+# Uncalibrated starting points, see calibrate(). Template scores mean nothing
+# until calibrated, so that tier only breaks ties until then. The last tier has
+# no threshold: whatever valid label it reads is the answer.
+DEFAULT_THRESHOLDS = {
+    "template": NEVER_ACCEPT,
+    "otsu": 0.9,
+    "original": 0.9,
+    "service": 0.9,
+}
+
+# Template score at which a calibration ROI is one of the references themselves
+REFERENCE_MATCH = 0.999
+
+
+class ReferenceMatcher:
+    """Nearest Captured_Cards reference by normalized correlation.
+
+    The references are loaded once, so one read is a resize and a single
+    matrix-vector product instead of ocr_card_old's disk reads and SSIMs.
+    """
+
+    SIZE = (48, 48)
+
+    def __init__(self, mode: str):
+        folder = resource_path.resource_path(os.path.join(CARD_FOLDER, mode))
+        self.labels: List[str] = []
+        vectors = []
+        for name in sorted(os.listdir(folder)):
+            label, ext = os.path.splitext(name)
+            if label.startswith("test") or ext.lower() != ".png":
+                continue
+            img = cv2.imread(os.path.join(folder, name))
+            if img is None:
+                continue
+            self.labels.append(label)
+            vectors.append(self._vector(img))
+        self.references = np.stack(vectors)
+
+    def _vector(self, img: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, self.SIZE, interpolation=cv2.INTER_AREA)
+        vector = small.astype(np.float32).ravel()
+        vector -= vector.mean()
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def scores(self, img: np.ndarray) -> Tuple[str, float, float]:
+        """(best label, best score, second best score)"""
+        scores = self.references @ self._vector(img)
+        order = np.argsort(scores)
+        return (
+            self.labels[order[-1]],
+            float(scores[order[-1]]),
+            float(scores[order[-2]]),
+        )
+
+
+class Tier(abc.ABC):
+    """One recognizer in the cascade. read() returns (label, confidence)."""
+
+    name = "tier"
+
+    @abc.abstractmethod
+    def read(self, img: np.ndarray, mode: str) -> Recognition:
+        pass
+
+
+class TemplateTier(Tier):
+    """Reference match, confident by how far the best beats the runner-up"""
+
+    name = "template"
+
+    def __init__(self):
+        self._matchers: Dict[str, ReferenceMatcher] = {}
+
+    def read(self, img: np.ndarray, mode: str) -> Recognition:
+        matcher = self._matchers.get(mode)
+        if matcher is None:
+            matcher = self._matchers[mode] = ReferenceMatcher(mode)
+        label, best, second = matcher.scores(img)
+        return label, best - second
+
+
+class PaddleTier(Tier):
+    """PaddleOCR with one preprocessing method, confident by its rec_score"""
+
+    def __init__(self, method: str):
+        self.name = method
+
+    def read(self, img: np.ndarray, mode: str) -> Recognition:
+        return OCR.read_card_image(img, self.name, mode=mode)
+
+
+class ServiceTier(Tier):
+    """The full OCR pipeline in RecognitionService worker processes"""
+
+    name = "service"
+
+    def __init__(self, recognition):
+        self.recognition = recognition
+
+    def read(self, img: np.ndarray, mode: str) -> Recognition:
+        return self.recognition.recognize(img, mode)
+
+
+class RecognizerCascade:
+    """Reads a total with the cheapest recognizer that is confident enough.
+
+    An exact-pixel cache answers repeat reads of an unchanged box. Otherwise
+    each tier in turn reads the box; a valid label at or above the tier's
+    threshold is accepted and cached, anything else escalates to the next
+    tier. If no tier is confident, the most confident valid label wins.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[Tier],
+        thresholds: Optional[Dict[str, float]] = None,
+        cache_size: int = 4096,
+    ):
+        self.tiers = list(tiers)
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        self.cache_size = cache_size
+        # key -> (label, the tier's confidence, whether it cleared the threshold)
+        self._cache: "OrderedDict[bytes, Tuple[str, float, bool]]" = OrderedDict()
+        # Whether the latest recognize() cleared a threshold, CardReader votes if not
+        self.last_confident = False
+        self.reads = 0
+        self.resolved: Dict[str, int] = {"cache": 0, "unresolved": 0}
+        self.seconds: Dict[str, float] = {}
+
+    @classmethod
+    def default(cls, recognition=None, thresholds=None) -> "RecognizerCascade":
+        """cache -> template -> OTSU -> fallbacks, or the worker pool for all OCR"""
+        if recognition is not None:
+            tiers = [TemplateTier(), ServiceTier(recognition)]
+        else:
+            tiers = [TemplateTier()] + [
+                PaddleTier(method) for method in OCR.PREPROCESSING_METHODS
+            ]
+        return cls(tiers, thresholds)
+
+    @staticmethod
+    def _key(img: np.ndarray, mode: str) -> bytes:
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16)
+        digest.update(f"{mode}{img.shape}".encode())
+        return digest.digest()
+
+    def recognize(self, img: np.ndarray, mode: str = "player") -> Recognition:
+        self.reads += 1
+        self.last_confident = False
+        key = self._key(img, mode)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.resolved["cache"] += 1
+            label, confidence, self.last_confident = cached
+            return label, confidence
+
+        best: Recognition = (None, 0.0)
+        for index, tier in enumerate(self.tiers):
+            started = time.perf_counter()
+            try:
+                label, confidence = tier.read(img, mode)
+            except Exception:
+                label, confidence = None, 0.0
+            self.seconds[tier.name] = (
+                self.seconds.get(tier.name, 0.0) + time.perf_counter() - started
+            )
+            # CardReader still checks dealer reads, e.g. "11" becomes "1_11"
+            if label not in OCR.valid_values:
+                continue
+            last = index == len(self.tiers) - 1
+            confident = confidence >= self.thresholds.get(tier.name, 0.0)
+            if last or confident:
+                self.resolved[tier.name] = self.resolved.get(tier.name, 0) + 1
+                self._store(key, (label, confidence, confident))
+                self.last_confident = confident
+                return label, confidence
+            if confidence > best[1] or best[0] is None:
+                best = (label, confidence)
+        self.resolved["unresolved"] += 1
+        return best
+
+    def _store(self, key: bytes, entry: Tuple[str, float, bool]):
+        self._cache[key] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def print_stats(self):
+        if not self.reads:
+            return
+        names = ["cache"] + [tier.name for tier in self.tiers] + ["unresolved"]
+        shares = " | ".join(
+            f"{name} {self.resolved.get(name, 0) / self.reads:.0%}" for name in names
+        )
+        print(f"Recognizer cascade: {self.reads} reads resolved by {shares}")
+        costs = ", ".join(
+            f"{name} {seconds / self.reads * 1000:.1f}"
+            for name, seconds in self.seconds.items()
+        )
+        if costs:
+            print(f"  ms per read spent in: {costs}")
+
+
+def calibrate(
+    rois: List[Tuple[str, str, np.ndarray]],
+    tiers: Sequence[Tier],
+    precision: float = 0.995,
+) -> Dict[str, float]:
+    """
+    Lowest threshold per tier at which the reads it would accept are at least
+    ``precision`` correct on the labeled ROIs (mode, truth, BGR image)
+    """
+    thresholds = {}
+    for tier in tiers:
+        reads = []
+        for mode, truth, img in rois:
+            try:
+                label, confidence = tier.read(img, mode)
+            except Exception:
+                continue
+            if label:
+                reads.append((confidence, label == truth))
+        if not reads:
+            continue
+        # Walk from the most confident read down while precision holds
+        reads.sort(key=lambda read: -read[0])
+        correct = 0
+        threshold = NEVER_ACCEPT
+        for count, (confidence, is_correct) in enumerate(reads, start=1):
+            correct += is_correct
+            if correct / count >= precision:
+                threshold = round(confidence, 4)
+        if threshold == NEVER_ACCEPT:
+            print(f"  {tier.name}: never reaches {precision:.1%}, reads escalate")
+        else:
+            print(f"  {tier.name}: accept at confidence >= {threshold:.3f}")
+        thresholds[tier.name] = threshold
+    return thresholds
+
+
+def held_out(
+    rois: List[Tuple[str, str, np.ndarray]],
+) -> List[Tuple[str, str, np.ndarray]]:
+    """The ROIs that aren't themselves Captured_Cards references"""
+    matchers: Dict[str, ReferenceMatcher] = {}
+    kept = []
+    for mode, truth, img in rois:
+        if mode not in matchers:
+            matchers[mode] = ReferenceMatcher(mode)
+        if matchers[mode].scores(img)[1] < REFERENCE_MATCH:
+            kept.append((mode, truth, img))
+    if len(kept) < len(rois):
+        print(f"Left out {len(rois) - len(kept)} totals that are reference images")
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calibrate the recognizer cascade's tier thresholds on labeled totals"
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="Totals labeled from real table frames, in the blackjack_bot.sim.frames "
+        "layout, default a fresh synthetic set (printed only)",
+    )
+    parser.add_argument("--count", type=int, default=200, help="Synthetic frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=2.0)
+    parser.add_argument("--precision", type=float, default=99.5, help="Percent")
+    parser.add_argument("--config", default="Vars.txt")
+    parser.add_argument("--no-write", action="store_true")
+    args = parser.parse_args()
+
+    import ReadVars
+
+    from ..sim.frames import FrameSynthesizer, TableLayout
+    from ..tools.bakeoff import corpus_is_synthetic, rois_from_folder, rois_from_samples
+
+    # Synthetic frames are drawn from the Captured_Cards references the template
+    # tier matches against, so it would look far more confident than it is
+    real = bool(args.corpus) and not corpus_is_synthetic(args.corpus)
+    if args.corpus:
+        rois = held_out(rois_from_folder(args.corpus))
+    else:
+        layout = TableLayout.from_config(ReadVars.read_tuples_from_file(args.config))
+        rois = rois_from_samples(
+            FrameSynthesizer(layout).corpus(args.count, args.seed, noise=args.noise)
+        )
+    cascade = RecognizerCascade.default()
+    print(f"Calibrating {len(cascade.tiers)} tiers on {len(rois)} totals")
+    thresholds = calibrate(rois, cascade.tiers[:-1], args.precision / 100)
+    if args.no_write:
+        return
+    if not real:
+        print("Not written: calibrate on a --corpus labeled from real table frames")
+        return
+    ReadVars.update_var_in_file("cascadeThresholds", thresholds, args.config)
+    print(f"Thresholds written to {args.config}")
+
+
+if __name__ == "__main__":
+    main()
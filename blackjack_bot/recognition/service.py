@@ -0,0 +1,233 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import OCR
+
+Recognition = Tuple[Optional[str], float]
+
+# The in-process model isn't thread-safe, fallback reads from several tables take turns
+_local_lock = threading.Lock()
+
+
+def _recognize(img, mode: str) -> Recognition:
+    if mode == "specific":
+        return OCR.ocr_specific_card_image(img), 0.0
+    return OCR.recognize_card_images([img], mode=mode)[0]
+
+
+def _worker_main(shm_name: str, ring_shape, requests, results, preprocessing):
+    """Worker process: warm up its own model, then recognize ROIs from the ring"""
+    OCR.configure_preprocessing(preprocessing)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=shm.buf)
+    # The first predict builds the inference graph, do it before real work
+    OCR.ocr_card_image(np.zeros((32, 32, 3), dtype=np.uint8))
+    results.put(("ready", None, 0.0))
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            request_id, slot, height, width, mode = request
+            img = ring[slot, :height, :width].copy()
+            try:
+                label, confidence = _recognize(img, mode)
+            except Exception:
+                label, confidence = None, 0.0
+            results.put((request_id, label, confidence))
+    finally:
+        del ring
+        shm.close()
+
+
+class RecognitionService:
+    """Card recognition in worker processes, each with its own warmed model.
+
+    ROIs are copied into a ring of shared memory slots and only the slot
+    index goes through the request queue. A collector thread resolves the
+    futures as labels and confidences come back, so capture and decisions
+    keep running while the workers predict. If a worker dies, or no slot
+    frees up within ``timeout``, ROIs are recognized in this process instead.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        slots: int = 16,
+        max_roi: Tuple[int, int] = (160, 320),
+        timeout: float = 5.0,
+        preprocessing: Optional[Dict] = None,
+        start_timeout: float = 120.0,
+    ):
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.max_roi = max_roi
+        self.ring_shape = (slots, max_roi[0], max_roi[1], 3)
+        self.requests_sent = 0
+        self.local_fallbacks = 0
+        self.pool_fallbacks = 0
+        self.latencies: List[float] = []
+
+        context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.ring_shape))
+        )
+        self._ring = np.ndarray(self.ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(slots):
+            self._free_slots.put(slot)
+        self._pending: Dict[int, Tuple[int, Future, float]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._ready_count = 0
+        self._ready = threading.Event()
+        self._closed = threading.Event()
+
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    self._shm.name,
+                    self.ring_shape,
+                    self._requests,
+                    self._results,
+                    # Spawned workers start with OCR's defaults
+                    preprocessing or OCR.preprocessing,
+                ),
+                daemon=True,
+            )
+            for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every worker has loaded and warmed its model. False if a
+        worker died first or it took longer than timeout (default start_timeout).
+        """
+        deadline = time.monotonic() + (
+            self.start_timeout if timeout is None else timeout
+        )
+        while not self._ready.wait(0.1):
+            if not self.healthy() or time.monotonic() > deadline:
+                return False
+        return True
+
+    def healthy(self) -> bool:
+        return all(worker.is_alive() for worker in self._workers)
+
+    def _recognize_locally(self, img, mode: str) -> Future:
+        future = Future()
+        with _local_lock:
+            future.set_result(_recognize(img, mode))
+        return future
+
+    def submit(self, img, mode: str = "player") -> Future:
+        """Queue one BGR image and return a Future of (label, confidence)"""
+        height, width = img.shape[:2]
+        if height > self.max_roi[0] or width > self.max_roi[1]:
+            # Doesn't fit a slot, recognize in this process instead
+            self.local_fallbacks += 1
+            return self._recognize_locally(img, mode)
+        if not self.healthy():
+            self.pool_fallbacks += 1
+            return self._recognize_locally(img, mode)
+        try:
+            slot = self._free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            # Every slot is held by requests that never came back
+            self.pool_fallbacks += 1
+            return self._recognize_locally(img, mode)
+        self._ring[slot, :height, :width] = img
+        request_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._pending[request_id] = (slot, future, time.perf_counter())
+        self._requests.put((request_id, slot, height, width, mode))
+        self.requests_sent += 1
+        return future
+
+    def recognize(self, img, mode: str = "player") -> Recognition:
+        return self.recognize_many([img], mode)[0]
+
+    def recognize_many(
+        self, images: Sequence, mode: str = "player"
+    ) -> List[Recognition]:
+        """Recognize several ROIs in parallel across the workers"""
+        futures = [self.submit(img, mode) for img in images]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=self.timeout))
+            except Exception:
+                results.append((None, 0.0))
+        return results
+
+    def _collect(self):
+        while not self._closed.is_set():
+            try:
+                message = self._results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            request_id, label, confidence = message
+            if request_id == "ready":
+                self._ready_count += 1
+                if self._ready_count == len(self._workers):
+                    self._ready.set()
+                continue
+            with self._lock:
+                slot, future, sent_at = self._pending.pop(request_id)
+            self.latencies.append(time.perf_counter() - sent_at)
+            self._free_slots.put(slot)
+            future.set_result((label, confidence))
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        # A killed worker can leave a queue lock held, don't wait on the queues
+        self._requests.cancel_join_thread()
+        self._results.cancel_join_thread()
+        self._closed.set()
+        self._collector.join(timeout=5.0)
+        with self._lock:
+            for _, future, _ in self._pending.values():
+                future.set_result((None, 0.0))
+            self._pending.clear()
+        del self._ring
+        self._shm.close()
+        self._shm.unlink()
+
+    def print_stats(self):
+        if not self.latencies:
+            return
+        ordered = sorted(self.latencies)
+        median = ordered[len(ordered) // 2]
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"Recognition service: {len(self._workers)} workers, "
+            f"{self.requests_sent} requests, {self.local_fallbacks} too large for a slot, "
+            f"p50={median * 1000:.0f}ms p95={p95 * 1000:.0f}ms"
+        )
+        if self.pool_fallbacks:
+            print(
+                f"  {self.pool_fallbacks} recognized in process, "
+                f"{sum(not w.is_alive() for w in self._workers)} workers died"
+            )
@@ -0,0 +1,14 @@
+from .engine import BlackjackEngine, Rules
+from .frames import FrameSpec, FrameSynthesizer, Sample, TableLayout
+from .table import SimulatedBackend, SimulatedTable
+
+__all__ = [
+    "BlackjackEngine",
+    "FrameSpec",
+    "FrameSynthesizer",
+    "Rules",
+    "Sample",
+    "SimulatedBackend",
+    "SimulatedTable",
+    "TableLayout",
+]
@@ -0,0 +1,273 @@
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from ..enums import Action
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+
+
+def card_value(rank: str) -> int:
+    """Hard value of a card, aces count 1"""
+    if rank == "A":
+        return 1
+    if rank in ("J", "Q", "K"):
+        return 10
+    return int(rank)
+
+
+def hand_total(cards: List[str]):
+    """(best total, soft) of a list of ranks"""
+    low = sum(card_value(rank) for rank in cards)
+    if "A" in cards and low + 10 <= 21:
+        return low + 10, True
+    return low, False
+
+
+def total_label(cards: List[str]) -> str:
+    """A total the way the table shows it and OCR reads it, e.g. "16" or "8_18" """
+    total, soft = hand_total(cards)
+    if soft and total < 21:
+        return f"{total - 10}_{total}"
+    return str(total)
+
+
+@dataclass
+class Rules:
+    """Table rules of the simulated game"""
+
+    decks: int = 8
+    penetration: float = 0.75
+    dealer_hits_soft_17: bool = False
+    double_after_split: bool = True
+    surrender: bool = True  # Late surrender, first decision only
+    max_hands: int = 4  # Hands after resplitting
+    blackjack_pays: float = 1.5
+
+
+@dataclass
+class SimHand:
+    cards: List[str]
+    bet: float = 1.0
+    split: bool = False
+    done: bool = False
+    surrendered: bool = False
+
+    @property
+    def total(self) -> int:
+        return hand_total(self.cards)[0]
+
+    @property
+    def label(self) -> str:
+        return total_label(self.cards)
+
+    def is_blackjack(self) -> bool:
+        return not self.split and len(self.cards) == 2 and self.total == 21
+
+
+@dataclass
+class EngineStats:
+    rounds: int = 0
+    hands: int = 0
+    wagered: float = 0.0
+    net: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    pushes: int = 0
+    blackjacks: int = 0
+    actions: Dict[str, int] = field(default_factory=dict)
+    rejected: int = 0  # Actions asked for that weren't allowed
+    shuffles: int = 0
+
+
+class BlackjackEngine:
+    """Blackjack game logic for the simulated table, with no timing or drawing.
+
+    A round goes ``deal`` -> ``act`` until ``phase`` leaves "player" ->
+    ``play_dealer`` when it's "dealer". The dealer peeks for blackjack, so a
+    dealer natural ends the round on the deal. Split hands are dealt their
+    second card one at a time, when the hand before them is finished, like
+    the live table.
+    """
+
+    def __init__(self, rules: Optional[Rules] = None, seed: Optional[int] = None):
+        self.rules = rules or Rules()
+        self.rng = random.Random(seed)
+        self.stats = EngineStats()
+        self.shoe: List[str] = []
+        self.hands: List[SimHand] = []
+        self.dealer: List[str] = []
+        self.active = 0
+        self.phase = "betting"
+        self._shuffle()
+
+    def _shuffle(self):
+        self.shoe = RANKS * 4 * self.rules.decks
+        self.rng.shuffle(self.shoe)
+        self._cut = int(len(self.shoe) * (1 - self.rules.penetration))
+        self.stats.shuffles += 1
+
+    def _draw(self) -> str:
+        return self.shoe.pop()
+
+    @property
+    def hand(self) -> Optional[SimHand]:
+        """The hand being played"""
+        if self.phase != "player":
+            return None
+        return self.hands[self.active]
+
+    def deal(self):
+        """Start a round with a one unit bet"""
+        if self.phase != "betting":
+            raise ValueError(f"Can't deal while {self.phase}")
+        if len(self.shoe) <= self._cut:
+            self._shuffle()
+        self.stats.rounds += 1
+        self.hands = [SimHand([self._draw()])]
+        self.dealer = [self._draw()]
+        self.hands[0].cards.append(self._draw())
+        self.dealer.append(self._draw())
+        self.active = 0
+        dealer_natural = hand_total(self.dealer)[0] == 21
+        if dealer_natural or self.hands[0].is_blackjack():
+            self._settle()
+            return
+        self.phase = "player"
+
+    def available_actions(self) -> Set[Action]:
+        hand = self.hand
+        if hand is None:
+            return set()
+        actions = {Action.HIT, Action.STAND}
+        two_cards = len(hand.cards) == 2
+        if two_cards and (not hand.split or self.rules.double_after_split):
+            actions.add(Action.DOUBLE)
+        if (
+            two_cards
+            and card_value(hand.cards[0]) == card_value(hand.cards[1])
+            and len(self.hands) < self.rules.max_hands
+        ):
+            actions.add(Action.SPLIT)
+        if two_cards and len(self.hands) == 1 and self.rules.surrender:
+            actions.add(Action.SURRENDER)
+        return actions
+
+    def act(self, action: Action):
+        """Apply a player action to the active hand"""
+        if action not in self.available_actions():
+            self.stats.rejected += 1
+            raise ValueError(f"{action.value} is not allowed now")
+        self.stats.actions[action.value] = self.stats.actions.get(action.value, 0) + 1
+        hand = self.hand
+        if action == Action.HIT:
+            hand.cards.append(self._draw())
+            if hand.total >= 21:
+                self._finish_hand()
+        elif action == Action.STAND:
+            self._finish_hand()
+        elif action == Action.DOUBLE:
+            hand.bet *= 2
+            hand.cards.append(self._draw())
+            self._finish_hand()
+        elif action == Action.SPLIT:
+            second = SimHand([hand.cards.pop()], hand.bet, split=True)
+            hand.split = True
+            self.hands.insert(self.active + 1, second)
+            self._start_hand()
+        elif action == Action.SURRENDER:
+            hand.surrendered = True
+            self._finish_hand()
+
+    def _start_hand(self):
+        """Give the active split hand its second card"""
+        hand = self.hands[self.active]
+        if len(hand.cards) == 1:
+            hand.cards.append(self._draw())
+        # Split aces get one card, 21 plays itself
+        if (hand.split and hand.cards[0] == "A") or hand.total == 21:
+            self._finish_hand()
+
+    def _finish_hand(self):
+        self.hands[self.active].done = True
+        if self.active + 1 < len(self.hands):
+            self.active += 1
+            self._start_hand()
+            return
+        live = [h for h in self.hands if not h.surrendered and h.total <= 21]
+        if live:
+            self.phase = "dealer"
+        else:
+            self._settle()
+
+    def play_dealer(self):
+        """Draw the dealer out and settle the round"""
+        if self.phase != "dealer":
+            raise ValueError(f"Dealer can't play while {self.phase}")
+        while True:
+            total, soft = hand_total(self.dealer)
+            if total > 17 or (
+                total == 17 and not (soft and self.rules.dealer_hits_soft_17)
+            ):
+                break
+            self.dealer.append(self._draw())
+        self._settle()
+
+    def _settle(self):
+        dealer_total = hand_total(self.dealer)[0]
+        dealer_natural = dealer_total == 21 and len(self.dealer) == 2
+        stats = self.stats
+        for hand in self.hands:
+            stats.hands += 1
+            stats.wagered += hand.bet
+            if hand.surrendered:
+                result = -0.5
+            elif hand.is_blackjack():
+                result = 0.0 if dealer_natural else self.rules.blackjack_pays
+                stats.blackjacks += not dealer_natural
+            elif hand.total > 21 or dealer_natural:
+                result = -1.0
+            elif dealer_total > 21 or hand.total > dealer_total:
+                result = 1.0
+            elif hand.total < dealer_total:
+                result = -1.0
+            else:
+                result = 0.0
+            stats.net += result * hand.bet
+            if result > 0:
+                stats.wins += 1
+            elif result < 0:
+                stats.losses += 1
+            else:
+                stats.pushes += 1
+        self.phase = "betting"
+
+    def player_labels(self) -> List[str]:
+        return [hand.label for hand in self.hands]
+
+    def dealer_label(self) -> Optional[str]:
+        """Upcard total while the player acts, the full total once settled"""
+        if not self.dealer:
+            return None
+        if self.phase == "player":
+            return total_label(self.dealer[:1])
+        return str(hand_total(self.dealer)[0])
+
+    def print_stats(self):
+        stats = self.stats
+        edge = stats.net / stats.wagered * 100 if stats.wagered else 0.0
+        actions = ", ".join(
+            f"{k.lower()} {v}" for k, v in sorted(stats.actions.items())
+        )
+        print(
+            f"Simulated table: {stats.rounds} rounds, {stats.hands} hands, "
+            f"net {stats.net:+.1f} units ({edge:+.2f}% of {stats.wagered:.0f} wagered)"
+        )
+        print(
+            f"  {stats.wins} won, {stats.losses} lost, {stats.pushes} pushed, "
+            f"{stats.blackjacks} blackjacks, {stats.shuffles} shuffles"
+        )
+        if actions:
+            print(f"  Actions: {actions}")
+        if stats.rejected:
+            print(f"  {stats.rejected} actions rejected as not allowed")
@@ -0,0 +1,418 @@
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import resource_path
+
+Box = Tuple[int, int, int, int]
+
+BUTTON_FOLDER = "BJ Buttons"
+CARD_FOLDER = "Captured_Cards"
+BACKDROP = "Game Location.PNG"
+
+# Flat box colors inside the color_classes ranges find_player looks for
+GOLD_RGB = (200, 152, 56)
+BLACK_RGB = (0, 0, 0)
+TEXT_DARK_RGB = (24, 18, 8)
+TEXT_LIGHT_RGB = (245, 245, 245)
+
+# Native size of a player total box, scaled with FrameSpec.scale
+PLAYER_BOX_SIZE = (46, 40)
+
+# Left to right, (available, unavailable) templates of the gameplay buttons
+GAMEPLAY_BUTTONS = [
+    ("SurrenderAvailable.PNG", "SurrenderUnavailable.PNG"),
+    ("DoubleAvailable.PNG", "DoubleUnavailable.PNG"),
+    ("HitAvailable.PNG", None),
+    ("StandAvailable.PNG", None),
+    ("SplitAvailable.PNG", "SplitUnavailable.PNG"),
+]
+
+SPECIFIC_CARDS = ["K", "Q", "J", "10", "9", "8", "7", "6", "5"]
+
+
+@dataclass
+class TableLayout:
+    """Screen size and the Vars.txt regions frames are drawn into"""
+
+    screen: Tuple[int, int] = (1920, 1080)
+    player_table: Box = (7, 441, 1902, 899)
+    dealer: Box = (1005, 288, 1042, 318)
+    buttons: Box = (702, 904, 1202, 1016)
+    specific_card: Box = (895, 686, 920, 716)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "TableLayout":
+        defaults = cls()
+        return cls(
+            player_table=config.get("playerTable", defaults.player_table),
+            dealer=config.get("dealer", defaults.dealer),
+            buttons=config.get("buttonBbox", defaults.buttons),
+            specific_card=config.get("specificCard", defaults.specific_card),
+        )
+
+
+@dataclass
+class FrameSpec:
+    """What to draw in one frame and how to degrade it"""
+
+    buttons: List[str] = field(default_factory=list)
+    player: List[str] = field(default_factory=list)
+    dealer: Optional[str] = None
+    specific_card: Optional[str] = None
+    scale: float = 1.0
+    jitter: int = 2  # Max random offset in pixels of every element
+    noise: float = 0.0  # Gaussian noise sigma in 0-255 units
+    jpeg_quality: Optional[int] = None  # JPEG round trip when set
+
+
+@dataclass
+class Sample:
+    """A synthesized full-screen RGB frame and where everything was drawn"""
+
+    frame: np.ndarray
+    spec: FrameSpec
+    buttons: Dict[str, Box] = field(default_factory=dict)
+    player_boxes: List[Box] = field(default_factory=list)
+    dealer_box: Optional[Box] = None
+
+    def labels(self) -> Dict:
+        """Ground truth as plain JSON values"""
+        return {
+            "spec": asdict(self.spec),
+            "buttons": {name: list(box) for name, box in self.buttons.items()},
+            "player": [
+                {"label": label, "box": list(box)}
+                for label, box in zip(self.spec.player, self.player_boxes)
+            ],
+            "dealer": (
+                {"label": self.spec.dealer, "box": list(self.dealer_box)}
+                if self.dealer_box
+                else None
+            ),
+        }
+
+
+class FrameSynthesizer:
+    """Composes table frames from the button templates and captured card totals.
+
+    Buttons are alpha blended at their template size times ``scale``. Card
+    totals are redrawn as flat gold (player) or black (dealer) boxes with the
+    digits cut out of the Captured_Cards images, because the captures
+    themselves are blurred upscales whose colors no longer match the live
+    table. Totals with no capture (busts, 21) and the specific card are drawn
+    as text.
+    """
+
+    def __init__(
+        self, layout: Optional[TableLayout] = None, backdrop: Optional[str] = BACKDROP
+    ):
+        self.layout = layout or TableLayout()
+        width, height = self.layout.screen
+        self.backdrop = np.empty((height, width, 3), dtype=np.uint8)
+        self.backdrop[:] = (22, 70, 40)
+        if backdrop:
+            img = cv2.imread(resource_path.resource_path(backdrop))
+            if img is not None:
+                self.backdrop = cv2.resize(
+                    cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (width, height)
+                )
+        self.button_images = self._load_buttons()
+        self.player_glyphs = self._load_glyphs("player")
+        self.dealer_glyphs = self._load_glyphs("dealer")
+
+    @staticmethod
+    def _load_buttons() -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """name -> (RGB image, alpha 0-1)"""
+        folder = resource_path.resource_path(BUTTON_FOLDER)
+        buttons = {}
+        for name in os.listdir(folder):
+            img = cv2.imread(os.path.join(folder, name), cv2.IMREAD_UNCHANGED)
+            if img is None:
+                continue
+            if img.shape[2] == 4:
+                alpha = img[..., 3].astype(np.float32) / 255
+            else:
+                alpha = np.ones(img.shape[:2], dtype=np.float32)
+            buttons[name] = (cv2.cvtColor(img[..., :3], cv2.COLOR_BGR2RGB), alpha)
+        return buttons
+
+    @staticmethod
+    def _load_glyphs(mode: str) -> Dict[str, np.ndarray]:
+        """label -> anti-aliased digit mask (0-1) cropped to the digits"""
+        folder = resource_path.resource_path(os.path.join(CARD_FOLDER, mode))
+        glyphs = {}
+        for name in os.listdir(folder):
+            label, ext = os.path.splitext(name)
+            if label.startswith("test") or ext.lower() != ".png":
+                continue
+            img = cv2.imread(os.path.join(folder, name))
+            if img is None:
+                continue
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY).astype(np.float32)
+            if mode == "player":
+                # Dark digits inside the hull of the gold tag
+                gold = (hsv[..., 0] >= 10) & (hsv[..., 0] <= 35) & (hsv[..., 1] > 90)
+                points = cv2.findNonZero(gold.astype(np.uint8))
+                if points is None:
+                    continue
+                inside = np.zeros(gray.shape, dtype=np.uint8)
+                cv2.fillConvexPoly(inside, cv2.convexHull(points), 1)
+                inside = cv2.erode(inside, np.ones((5, 5), np.uint8))
+                mask = np.clip((130 - gray) / 80, 0, 1) * inside
+            else:
+                # Light, unsaturated digits on the black box
+                mask = np.clip((gray - 110) / 100, 0, 1) * (hsv[..., 1] < 60)
+            points = cv2.findNonZero((mask > 0.5).astype(np.uint8))
+            if points is None:
+                continue
+            x, y, w, h = cv2.boundingRect(points)
+            glyphs[label] = mask[y : y + h, x : x + w]
+        return glyphs
+
+    def render(self, spec: FrameSpec, rng: Optional[np.random.Generator] = None):
+        """Draw one frame. Returns a Sample with the frame and its labels."""
+        rng = rng or np.random.default_rng()
+        frame = self.backdrop.copy()
+        sample = Sample(frame, spec)
+
+        def jitter() -> int:
+            return (
+                int(rng.integers(-spec.jitter, spec.jitter + 1)) if spec.jitter else 0
+            )
+
+        # Buttons in one row, centered in the button region
+        images = [
+            (name, self._scaled(self.button_images[name], spec.scale))
+            for name in spec.buttons
+        ]
+        gap = int(8 * spec.scale)
+        bx1, by1, bx2, by2 = self.layout.buttons
+        row_width = sum(img.shape[1] for _, (img, _) in images) + gap * (
+            len(images) - 1
+        )
+        x = (bx1 + bx2 - row_width) // 2
+        for name, (img, alpha) in images:
+            y = (by1 + by2 - img.shape[0]) // 2 + jitter()
+            box = self._blend(frame, img, alpha, x + jitter(), y)
+            if box:
+                sample.buttons[name] = box
+            x += img.shape[1] + gap
+
+        # Player totals spread evenly across the table
+        px1, py1, px2, py2 = self.layout.player_table
+        width = int(PLAYER_BOX_SIZE[0] * spec.scale)
+        height = int(PLAYER_BOX_SIZE[1] * spec.scale)
+        for index, label in enumerate(spec.player):
+            center = px1 + (px2 - px1) * (index + 1) // (len(spec.player) + 1)
+            x = center - width // 2 + jitter()
+            y = (py1 + py2 - height) // 2 + jitter()
+            box = (x, y, x + width, y + height)
+            self._draw_total(frame, box, label, GOLD_RGB)
+            sample.player_boxes.append(box)
+
+        if spec.dealer:
+            dx1, dy1, dx2, dy2 = self.layout.dealer
+            cx, cy = (dx1 + dx2) // 2 + jitter(), (dy1 + dy2) // 2 + jitter()
+            half_w = int((dx2 - dx1) * spec.scale) // 2
+            half_h = int((dy2 - dy1) * spec.scale) // 2
+            box = (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+            self._draw_total(frame, box, spec.dealer, BLACK_RGB)
+            sample.dealer_box = box
+
+        if spec.specific_card:
+            sx1, sy1, sx2, sy2 = self.layout.specific_card
+            cv2.rectangle(frame, (sx1, sy1), (sx2 - 1, sy2 - 1), (250, 250, 250), -1)
+            font_scale = (sy2 - sy1) / 40 * spec.scale
+            (text_w, text_h), _ = cv2.getTextSize(
+                spec.specific_card, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2
+            )
+            cv2.putText(
+                frame,
+                spec.specific_card,
+                ((sx1 + sx2 - text_w) // 2, (sy1 + sy2 + text_h) // 2),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                font_scale,
+                (20, 20, 20),
+                2,
+                cv2.LINE_AA,
+            )
+
+        if spec.noise:
+            noisy = frame + rng.normal(0, spec.noise, frame.shape)
+            frame[:] = np.clip(noisy, 0, 255)
+        if spec.jpeg_quality:
+            _, encoded = cv2.imencode(
+                ".jpg",
+                cv2.cvtColor(frame, cv2.COLOR_RGB2BGR),
+                [cv2.IMWRITE_JPEG_QUALITY, spec.jpeg_quality],
+            )
+            frame[:] = cv2.cvtColor(
+                cv2.imdecode(encoded, cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB
+            )
+        return sample
+
+    @staticmethod
+    def _scaled(image: Tuple[np.ndarray, np.ndarray], scale: float):
+        img, alpha = image
+        if scale == 1.0:
+            return img, alpha
+        size = (
+            max(1, round(img.shape[1] * scale)),
+            max(1, round(img.shape[0] * scale)),
+        )
+        return (
+            cv2.resize(img, size, interpolation=cv2.INTER_AREA),
+            cv2.resize(alpha, size, interpolation=cv2.INTER_AREA),
+        )
+
+    @staticmethod
+    def _blend(frame, img, alpha, x: int, y: int) -> Optional[Box]:
+        """Alpha blend img onto frame at (x, y), clipped to the frame"""
+        height, width = frame.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + img.shape[1], width), min(y + img.shape[0], height)
+        if x1 >= x2 or y1 >= y2:
+            return None
+        src = img[y1 - y : y2 - y, x1 - x : x2 - x].astype(np.float32)
+        a = alpha[y1 - y : y2 - y, x1 - x : x2 - x, None]
+        dst = frame[y1:y2, x1:x2].astype(np.float32)
+        frame[y1:y2, x1:x2] = (src * a + dst * (1 - a)).astype(np.uint8)
+        return x1, y1, x2, y2
+
+    def _draw_total(self, frame, box: Box, label: str, fill):
+        x1, y1, x2, y2 = box
+        cv2.rectangle(frame, (x1, y1), (x2 - 1, y2 - 1), fill, -1)
+        glyphs = self.dealer_glyphs if fill == BLACK_RGB else self.player_glyphs
+        glyph = glyphs.get(label)
+        if glyph is None:
+            glyph = self._text_glyph(label)
+        text = TEXT_LIGHT_RGB if fill == BLACK_RGB else TEXT_DARK_RGB
+        # Digits fill 80% of the box, keeping their aspect ratio
+        fit = min((x2 - x1) * 0.8 / glyph.shape[1], (y2 - y1) * 0.7 / glyph.shape[0])
+        size = (max(1, int(glyph.shape[1] * fit)), max(1, int(glyph.shape[0] * fit)))
+        mask = cv2.resize(glyph, size, interpolation=cv2.INTER_AREA)
+        color = np.empty(mask.shape + (3,), dtype=np.uint8)
+        color[:] = text
+        self._blend(
+            frame,
+            color,
+            mask,
+            (x1 + x2 - size[0]) // 2,
+            (y1 + y2 - size[1]) // 2,
+        )
+
+    @staticmethod
+    def _text_glyph(label: str) -> np.ndarray:
+        """Digit mask for a total with no captured image, e.g. a bust or 21"""
+        text = label.replace("_", "/")
+        (width, height), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2
+        )
+        canvas = np.zeros((height + baseline + 4, width + 4), dtype=np.uint8)
+        cv2.putText(
+            canvas,
+            text,
+            (2, height + 2),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            255,
+            2,
+            cv2.LINE_AA,
+        )
+        x, y, w, h = cv2.boundingRect(cv2.findNonZero(canvas))
+        return canvas[y : y + h, x : x + w].astype(np.float32) / 255
+
+    def random_spec(self, rng: np.random.Generator, **overrides) -> FrameSpec:
+        """A plausible table state: waiting for rebet, dealing or mid hand"""
+        phase = rng.choice(["rebet", "dealing", "active"], p=[0.2, 0.1, 0.7])
+        spec = FrameSpec()
+        if phase == "rebet":
+            spec.buttons = ["RebetDealAvailable.PNG"]
+        elif phase == "dealing":
+            spec.buttons = ["RebetDealUnavailable.PNG"]
+        else:
+            for available, unavailable in GAMEPLAY_BUTTONS:
+                if unavailable is None or rng.random() < 0.6:
+                    spec.buttons.append(available)
+                else:
+                    spec.buttons.append(unavailable)
+        if phase != "rebet":
+            hands = 1 + int(rng.random() < 0.1) + int(rng.random() < 0.03)
+            labels = sorted(self.player_glyphs)
+            spec.player = [str(rng.choice(labels)) for _ in range(hands)]
+            spec.dealer = str(rng.choice(sorted(self.dealer_glyphs)))
+            if rng.random() < 0.2:
+                spec.specific_card = str(rng.choice(SPECIFIC_CARDS))
+        for key, value in overrides.items():
+            setattr(spec, key, value)
+        return spec
+
+    def corpus(self, count: int, seed: int = 0, **overrides) -> Iterator[Sample]:
+        """``count`` random labeled samples, the same ones for the same seed"""
+        rng = np.random.default_rng(seed)
+        for _ in range(count):
+            yield self.render(self.random_spec(rng, **overrides), rng)
+
+    def write_corpus(
+        self,
+        folder: str,
+        count: int,
+        seed: int = 0,
+        image_format: str = "png",
+        **overrides,
+    ):
+        """Save frames as images plus one labels.jsonl line per frame"""
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "labels.jsonl"), "w") as labels:
+            for index, sample in enumerate(self.corpus(count, seed, **overrides)):
+                filename = f"frame_{index:06d}.{image_format}"
+                cv2.imwrite(
+                    os.path.join(folder, filename),
+                    cv2.cvtColor(sample.frame, cv2.COLOR_RGB2BGR),
+                )
+                entry = {"file": filename, "synthetic": True, **sample.labels()}
+                labels.write(json.dumps(entry) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a labeled synthetic frame corpus"
+    )
+    parser.add_argument("output", help="Folder for the frames and labels.jsonl")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--jpeg", type=int, default=None, help="JPEG quality")
+    parser.add_argument("--format", default="png", choices=("png", "jpg"))
+    parser.add_argument(
+        "--config", default=None, help="Vars.txt style file to take the layout from"
+    )
+    args = parser.parse_args()
+
+    layout = None
+    if args.config:
+        import ReadVars
+
+        layout = TableLayout.from_config(ReadVars.read_tuples_from_file(args.config))
+    FrameSynthesizer(layout).write_corpus(
+        args.output,
+        args.count,
+        args.seed,
+        args.format,
+        scale=args.scale,
+        noise=args.noise,
+        jpeg_quality=args.jpeg,
+    )
+    print(f"Wrote {args.count} frames to {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+import screen_capture
+
+from ..enums import Action
+from ..game.input_backend import InputBackend
+from .engine import BlackjackEngine, Rules
+from .frames import GAMEPLAY_BUTTONS, FrameSpec, FrameSynthesizer, Sample, TableLayout
+
+# Clickable template -> what it does
+BUTTON_ACTIONS = {
+    "RebetDealAvailable.PNG": Action.REBET,
+    "SurrenderAvailable.PNG": Action.SURRENDER,
+    "DoubleAvailable.PNG": Action.DOUBLE,
+    "HitAvailable.PNG": Action.HIT,
+    "StandAvailable.PNG": Action.STAND,
+    "SplitAvailable.PNG": Action.SPLIT,
+}
+
+
+class SimulatedTable:
+    """A blackjack table drawn offscreen that reacts to clicks.
+
+    ``frame`` is a screen_capture frame source: it advances the game to the
+    current time and returns the full-screen frame, redrawn only when what's
+    on the table changed. ``click`` maps a screen point to the button drawn
+    there. Every click starts an animation: the deal, a card or the dealer
+    drawing out takes ``deal_delay``, ``card_delay`` or ``dealer_delay``
+    seconds to show, and clicks during an animation are ignored.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[BlackjackEngine] = None,
+        layout: Optional[TableLayout] = None,
+        deal_delay: float = 1.0,
+        card_delay: float = 0.35,
+        dealer_delay: float = 1.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engine = engine or BlackjackEngine()
+        self.synthesizer = FrameSynthesizer(layout)
+        self.deal_delay = deal_delay
+        self.card_delay = card_delay
+        self.dealer_delay = dealer_delay
+        self.clock = clock
+        self.clicks = 0
+        self.missed_clicks = 0  # Not on a clickable button
+        self.ignored_clicks = 0  # During an animation
+        self.frames_rendered = 0
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[float, Callable[[], None]]] = None
+        self._dealing = False
+        self._sample: Optional[Sample] = None
+
+    def frame(self) -> np.ndarray:
+        with self._lock:
+            return self._current().frame
+
+    def click(self, x: int, y: int):
+        with self._lock:
+            sample = self._current()
+            self.clicks += 1
+            action = None
+            for name, (x1, y1, x2, y2) in sample.buttons.items():
+                if x1 <= x < x2 and y1 <= y < y2:
+                    action = BUTTON_ACTIONS.get(name)
+                    break
+            if action is None:
+                self.missed_clicks += 1
+            elif self._pending is not None:
+                self.ignored_clicks += 1
+            elif action == Action.REBET:
+                self._dealing = True
+                self._schedule(self.deal_delay, self._deal)
+            else:
+                self._schedule(self.card_delay, lambda: self.engine.act(action))
+
+    def _deal(self):
+        self._dealing = False
+        self.engine.deal()
+
+    def _schedule(self, delay: float, step: Callable[[], None]):
+        self._pending = (self.clock() + delay, step)
+
+    def _advance(self):
+        while self._pending is not None and self._pending[0] <= self.clock():
+            _, step = self._pending
+            self._pending = None
+            step()
+            if self.engine.phase == "dealer":
+                self._schedule(self.dealer_delay, self.engine.play_dealer)
+
+    def _current(self) -> Sample:
+        self._advance()
+        spec = self.frame_spec()
+        if self._sample is None or spec != self._sample.spec:
+            self._sample = self.synthesizer.render(spec)
+            self.frames_rendered += 1
+        return self._sample
+
+    def frame_spec(self) -> FrameSpec:
+        """What the table shows right now"""
+        engine = self.engine
+        spec = FrameSpec(jitter=0)
+        if self._dealing:
+            spec.buttons = ["RebetDealUnavailable.PNG"]
+            return spec
+        if engine.phase == "betting":
+            spec.buttons = ["RebetDealAvailable.PNG"]
+        elif engine.phase == "player":
+            allowed = engine.available_actions()
+            for available, unavailable in GAMEPLAY_BUTTONS:
+                if BUTTON_ACTIONS[available] in allowed:
+                    spec.buttons.append(available)
+                elif unavailable is not None:
+                    spec.buttons.append(unavailable)
+            spec.specific_card = engine.hand.cards[0]
+        spec.player = engine.player_labels()
+        spec.dealer = engine.dealer_label()
+        return spec
+
+    def print_stats(self):
+        self.engine.print_stats()
+        print(
+            f"  {self.clicks} clicks, {self.missed_clicks} missed a button, "
+            f"{self.ignored_clicks} during an animation, "
+            f"{self.frames_rendered} frames drawn"
+        )
+
+
+class SimulatedBackend(InputBackend):
+    """Sends the bot's clicks to a SimulatedTable instead of the mouse"""
+
+    name = "simulated"
+
+    def __init__(self, table: SimulatedTable):
+        super().__init__()
+        self.table = table
+
+    def _send_click(self, x: int, y: int):
+        self.table.click(x, y)
+
+
+def run_bot(config: Dict, table: SimulatedTable, seconds: float):
+    """Play the unmodified bot against ``table`` for ``seconds``, then print stats"""
+    from ..bot import BlackjackBot
+
+    screen_capture.set_frame_source(table.frame)
+    try:
+        bot = BlackjackBot(config, input_backend=SimulatedBackend(table))
+        stop_event = threading.Event()
+        bot_thread = threading.Thread(
+            target=bot.run, args=(stop_event,), kwargs={"hotkeys": False}
+        )
+        bot.toggle_running()
+        bot_thread.start()
+        try:
+            stop_event.wait(seconds)
+        except KeyboardInterrupt:
+            print("Simulation interrupted")
+        # Turning the bot off prints its stats
+        bot.toggle_running()
+        stop_event.set()
+        bot_thread.join()
+        table.print_stats()
+    finally:
+        screen_capture.set_frame_source(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the bot headless against a simulated table"
+    )
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--config", default="Vars.txt")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--deal-delay", type=float, default=1.0)
+    parser.add_argument("--card-delay", type=float, default=0.35)
+    parser.add_argument("--dealer-delay", type=float, default=1.2)
+    parser.add_argument("--h17", action="store_true", help="Dealer hits soft 17")
+    args = parser.parse_args()
+
+    import ReadVars
+
+    config = ReadVars.read_tuples_from_file(args.config)
+    rules = Rules(
+        decks=config.get("decks", 8),
+        penetration=config.get("penetration", 0.75),
+        dealer_hits_soft_17=args.h17,
+    )
+    table = SimulatedTable(
+        BlackjackEngine(rules, args.seed),
+        TableLayout.from_config(config),
+        args.deal_delay,
+        args.card_delay,
+        args.dealer_delay,
+    )
+    run_bot(config, table, args.minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
 from .decider import StrategyDecider
+from .deviations import DeviationEngine, RunningCount
+from .generator import RuleSet, StrategyGenerator
 from .tables import StrategyTables
 
-__all__ = ["StrategyTables", "StrategyDecider"]
+__all__ = [
+    "StrategyTables",
+    "StrategyDecider",
+    "DeviationEngine",
+    "RunningCount",
+    "RuleSet",
+    "StrategyGenerator",
+]
@@ -1,7 +1,7 @@
-import time
 from typing import Optional, Tuple
 
 from ..enums import Action
+from .deviations import DeviationEngine
 from .tables import StrategyTables
 
 
@@ -16,12 +16,19 @@ class StrategyDecider:
         "14": "14",
         "16": "16",
         "18": "18",
+        "20": "20",
         "2_12": "2_12",
     }
 
-    def __init__(self, strategy_tables: StrategyTables, surrender15_specific: int):
+    def __init__(
+        self,
+        strategy_tables: StrategyTables,
+        surrender15_specific: int,
+        deviations: Optional[DeviationEngine] = None,
+    ):
         self.strategy = strategy_tables
         self.surrender15_specific = surrender15_specific
+        self.deviations = deviations
 
     def should_split(
         self, player: str, dealer: str, last_action: Action, in_split_hand: bool
@@ -33,6 +40,10 @@ class StrategyDecider:
         if not pair_notation:
             return False, None
         should_split = self.strategy.split_cache.get((pair_notation, dealer), False)
+        if self.deviations:
+            should_split = self.deviations.lookup(
+                "split", pair_notation, dealer, should_split
+            )
         return should_split, pair_notation
 
     def should_surrender(
@@ -46,6 +57,10 @@ class StrategyDecider:
         if last_action != Action.REBET or "_" in player:
             return False, False
         should_surrender = self.strategy.surrender_cache.get((player, dealer), False)
+        if self.deviations:
+            should_surrender = self.deviations.lookup(
+                "surrender", player, dealer, should_surrender
+            )
         if (
             should_surrender
             and player == "15"
@@ -58,23 +73,28 @@ class StrategyDecider:
 
     def get_soft_action(self, player: str, dealer: str) -> str:
         """Get action for soft hands"""
-        return self.strategy.soft_cache.get((player, dealer), "S")
+        action = self.strategy.soft_cache.get((player, dealer), "S")
+        if self.deviations:
+            action = self.deviations.lookup("soft", player, dealer, action)
+        return action
 
     def get_hard_action(self, player: str, dealer: str) -> str:
         """Get action for hard hands"""
-        return self.strategy.hard_cache.get((player, dealer), "S")
+        action = self.strategy.hard_cache.get((player, dealer), "S")
+        if self.deviations:
+            action = self.deviations.lookup("hard", player, dealer, action)
+        return action
 
     def can_double(
-        self, last_action: Action, in_split_hand: bool, button_manager
+        self, last_action: Action, in_split_hand: bool, buttons, button_manager
     ) -> bool:
-        """Check if doubling is allowed"""
+        """Check if doubling is allowed, refreshing the tick's button snapshot"""
         if not in_split_hand and last_action != Action.REBET:
             return False
         max_attempts = 3
         for attempt in range(max_attempts):
-            buttons = button_manager.check_buttons()
             if "DoubleAvailable.PNG" in buttons:
                 return True
             if attempt < max_attempts - 1:
-                time.sleep(0.1)
+                button_manager.wait_for_change(buttons, 0.1)
         return False
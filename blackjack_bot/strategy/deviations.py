@@ -0,0 +1,157 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import ReadVars
+
+# Hi-Lo tags for card values 1 (ace) through 10
+HI_LO_TAGS = {1: -1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1}
+
+DeviationKey = Tuple[str, str, str]
+
+
+class RunningCount:
+    """Hi-Lo running count with O(1) updates per card.
+
+    Only the dealer upcard is counted. It is the one card read every round
+    whatever its value; the player's cards are only known for some totals
+    and a hit card that busts is never read, so counting them would tilt the
+    count towards the cards that happen to be readable. Nothing on screen
+    shows the shuffle either, so the shoe position is estimated from rounds
+    played at
+    ``cards_per_round`` each (or the cards seen, if more), and the count
+    resets when that estimate reaches the cut card.
+    """
+
+    def __init__(
+        self,
+        decks: float = 8,
+        penetration: float = 0.75,
+        cards_per_round: float = 5.4,
+    ):
+        self.decks = decks
+        self.penetration = penetration
+        self.cards_per_round = cards_per_round
+        self.running = 0
+        self.cards_seen = 0
+        self.cards_dealt = 0.0  # Estimated, rounds before the current one
+        self.shuffles = 0
+        self._round_seen: Optional[int] = None
+
+    def new_round(self):
+        """Move the shoe estimate past the last round, resetting at the cut card"""
+        if self._round_seen is not None:
+            self.cards_dealt += max(self.cards_per_round, self._round_seen)
+            if self.cards_dealt >= self.decks * 52 * self.penetration:
+                self.reset()
+                self.shuffles += 1
+        self._round_seen = 0
+
+    def add_card(self, value: int):
+        self.running += HI_LO_TAGS[value]
+        self.cards_seen += 1
+        if self._round_seen is not None:
+            self._round_seen += 1
+
+    def true_count(self) -> float:
+        """Running count divided by the estimated decks remaining"""
+        dealt = self.cards_dealt + (self._round_seen or 0)
+        decks_left = max(self.decks - dealt / 52, 0.5)
+        return self.running / decks_left
+
+    def reset(self):
+        self.running = 0
+        self.cards_seen = 0
+        self.cards_dealt = 0.0
+        self._round_seen = None
+
+
+class DeviationEngine:
+    """Applies count-based index plays on top of the compiled strategy tables.
+
+    Every true count bucket gets its own precomputed overlay, so a decision
+    is a single dict lookup and a card update only swaps the active overlay.
+    """
+
+    TABLES = ("hard", "soft", "split", "surrender")
+
+    def __init__(
+        self,
+        entries: Dict[DeviationKey, Tuple[str, int, object]],
+        decks: float = 8,
+        penetration: float = 0.75,
+        min_count: int = -10,
+        max_count: int = 10,
+        cards_per_round: float = 5.4,
+    ):
+        self.count = RunningCount(decks, penetration, cards_per_round)
+        self.entries = entries
+        self.min_count = min_count
+        self.max_count = max_count
+        self.deviations_applied = 0
+        self._overlays = {
+            true_count: self._build_overlay(true_count)
+            for true_count in range(min_count, max_count + 1)
+        }
+        self._active = self._overlays[0]
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        decks: float = 8,
+        penetration: float = 0.75,
+        cards_per_round: float = 5.4,
+    ) -> "DeviationEngine":
+        """Load an index table such as ``hard 16 10 = (">=", 0, "S")``"""
+        entries = {}
+        for name, value in ReadVars.read_tuples_from_file(path).items():
+            parts = name.split()
+            if len(parts) != 3 or parts[0] not in cls.TABLES:
+                print(f"WARNING: Skipping invalid deviation '{name}'")
+                continue
+            op, index, action = value
+            if op not in (">=", "<"):
+                print(f"WARNING: Skipping deviation '{name}' with operator {op}")
+                continue
+            if parts[0] in ("split", "surrender"):
+                action = bool(action)
+            entries[(parts[0], parts[1], parts[2])] = (op, index, action)
+        print(f"Loaded {len(entries)} strategy deviations")
+        return cls(entries, decks, penetration, cards_per_round=cards_per_round)
+
+    def _build_overlay(self, true_count: int) -> Dict[DeviationKey, object]:
+        overlay = {}
+        for key, (op, index, action) in self.entries.items():
+            if (op == ">=" and true_count >= index) or (
+                op == "<" and true_count < index
+            ):
+                overlay[key] = action
+        return overlay
+
+    def add_card(self, value: int):
+        """Count a card and switch to the overlay for the new true count"""
+        self.count.add_card(value)
+        true_count = math.floor(self.count.true_count())
+        true_count = min(max(true_count, self.min_count), self.max_count)
+        self._active = self._overlays[true_count]
+
+    def lookup(self, table: str, player: str, dealer: str, default):
+        """Return the deviation for this spot at the current count, else default"""
+        action = self._active.get((table, player, dealer), default)
+        if action != default:
+            self.deviations_applied += 1
+        return action
+
+    def observe_hand_start(self, player_text: str, dealer_text: str):
+        """Start a round and count its dealer upcard"""
+        self.count.new_round()
+        self.add_card(1 if dealer_text == "1_11" else int(dealer_text))
+
+    def print_stats(self):
+        count = self.count
+        print(
+            f"Count: running {count.running}, true {count.true_count():.1f}, "
+            f"{count.cards_seen} cards seen of about {count.cards_dealt:.0f} dealt "
+            f"this shoe, {count.shuffles} estimated shuffles"
+        )
+        print(f"Strategy deviations applied: {self.deviations_applied}")
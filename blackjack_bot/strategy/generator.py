@@ -0,0 +1,263 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+DEALER_COLUMNS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "1_11"]
+DEALER_UPCARDS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 1]
+HARD_ROWS = [str(total) for total in range(20, 3, -1)]
+SOFT_ROWS = [f"{low}_{low + 10}" for low in range(10, 2, -1)]
+SPLIT_ROWS = ["2_12", "20", "18", "16", "14", "12", "10", "8", "6", "4"]
+SURRENDER_ROWS = HARD_ROWS
+
+# Infinite-deck draw probabilities for card values 1 (ace) through 10
+CARD_PROBABILITIES = {value: 1 / 13 for value in range(1, 10)}
+CARD_PROBABILITIES[10] = 4 / 13
+
+# Dealer final totals 17-21, index 5 is a bust
+BUST = 5
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Table rules that change basic strategy"""
+
+    dealer_hits_soft_17: bool = False
+    double_after_split: bool = True
+    late_surrender: bool = True
+    dealer_peeks: bool = True
+
+    def describe(self) -> str:
+        """Short human readable summary written to the Source sheet"""
+        return ", ".join(
+            [
+                "H17" if self.dealer_hits_soft_17 else "S17",
+                "DAS" if self.double_after_split else "No DAS",
+                "Late surrender" if self.late_surrender else "No surrender",
+                "Dealer peeks" if self.dealer_peeks else "No peek",
+            ]
+        )
+
+
+def hand_value(low: int, has_ace: bool) -> int:
+    """Best total for a hand counting aces as 1 in ``low``"""
+    if has_ace and low + 10 <= 21:
+        return low + 10
+    return low
+
+
+def dealer_distribution(upcard: int, rules: RuleSet) -> List[float]:
+    """Probabilities of the dealer finishing on 17-21 or busting"""
+    outcomes = [0.0] * 6
+
+    def draw(low: int, has_ace: bool, probability: float):
+        value = hand_value(low, has_ace)
+        soft = has_ace and low + 10 <= 21
+        if value > 21:
+            outcomes[BUST] += probability
+            return
+        if value > 17 or (value == 17 and not (soft and rules.dealer_hits_soft_17)):
+            outcomes[value - 17] += probability
+            return
+        for card, card_probability in CARD_PROBABILITIES.items():
+            draw(low + card, has_ace or card == 1, probability * card_probability)
+
+    # Condition the hole card on the dealer not having blackjack
+    hole_cards = dict(CARD_PROBABILITIES)
+    if rules.dealer_peeks:
+        if upcard == 1:
+            del hole_cards[10]
+        elif upcard == 10:
+            del hole_cards[1]
+    total = sum(hole_cards.values())
+    for card, card_probability in hole_cards.items():
+        draw(upcard + card, upcard == 1 or card == 1, card_probability / total)
+    return outcomes
+
+
+class HandEvaluator:
+    """Expected values for player options against one dealer upcard"""
+
+    def __init__(self, dealer_outcomes: List[float]):
+        self.dealer = dealer_outcomes
+        self._best_cache: Dict[Tuple[int, bool], float] = {}
+
+    def stand(self, value: int) -> float:
+        if value > 21:
+            return -1.0
+        win = self.dealer[BUST]
+        lose = 0.0
+        for index in range(5):
+            final = 17 + index
+            if final < value:
+                win += self.dealer[index]
+            elif final > value:
+                lose += self.dealer[index]
+        return win - lose
+
+    def best_after_hit(self, low: int, has_ace: bool) -> float:
+        """EV of a hand that may only hit or stand from here on"""
+        if low > 21:
+            return -1.0
+        key = (low, has_ace)
+        if key not in self._best_cache:
+            self._best_cache[key] = max(
+                self.stand(hand_value(low, has_ace)), self.hit(low, has_ace)
+            )
+        return self._best_cache[key]
+
+    def hit(self, low: int, has_ace: bool) -> float:
+        return sum(
+            probability * self.best_after_hit(low + card, has_ace or card == 1)
+            for card, probability in CARD_PROBABILITIES.items()
+        )
+
+    def double(self, low: int, has_ace: bool) -> float:
+        return 2 * sum(
+            probability * self.stand(hand_value(low + card, has_ace or card == 1))
+            for card, probability in CARD_PROBABILITIES.items()
+        )
+
+    def options(self, low: int, has_ace: bool, can_double: bool = True) -> Dict:
+        evs = {
+            "S": self.stand(hand_value(low, has_ace)),
+            "H": self.hit(low, has_ace),
+        }
+        if can_double:
+            evs["D"] = self.double(low, has_ace)
+        return evs
+
+    def split(self, card: int, double_after_split: bool) -> float:
+        """EV of splitting a pair of ``card`` (no resplits, one card to aces)"""
+        ev = 0.0
+        for drawn, probability in CARD_PROBABILITIES.items():
+            low = card + drawn
+            has_ace = card == 1 or drawn == 1
+            if card == 1:
+                hand_ev = self.stand(hand_value(low, has_ace))
+            else:
+                hand_ev = max(self.options(low, has_ace, double_after_split).values())
+            ev += probability * hand_ev
+        return 2 * ev
+
+
+def _solve_dealer_upcard(upcard: int, rules: RuleSet) -> Dict[str, Dict[str, object]]:
+    """Compute one dealer column of every sheet. Runs in a worker process.
+
+    EVs are exact for an infinite deck, which matches published multi-deck
+    charts except for a couple of marginal soft doubles.
+    """
+    evaluator = HandEvaluator(dealer_distribution(upcard, rules))
+    column: Dict[str, Dict[str, object]] = {
+        "Split": {},
+        "Surrender": {},
+        "Soft Totals": {},
+        "Hard Totals": {},
+    }
+
+    for row in HARD_ROWS:
+        evs = evaluator.options(int(row), False)
+        column["Hard Totals"][row] = max(evs, key=evs.get)
+        column["Surrender"][row] = bool(
+            rules.late_surrender and max(evs.values()) < -0.5
+        )
+
+    for row in SOFT_ROWS:
+        low = int(row.split("_")[0])
+        evs = evaluator.options(low, True)
+        action = max(evs, key=evs.get)
+        if action == "D" and evs["S"] > evs["H"]:
+            action = "Ds"
+        column["Soft Totals"][row] = action
+
+    for row in SPLIT_ROWS:
+        card = 1 if row == "2_12" else int(row) // 2
+        unsplit = evaluator.options(card * 2, card == 1)
+        best_unsplit = max(unsplit.values())
+        if rules.late_surrender and card != 1:
+            best_unsplit = max(best_unsplit, -0.5)
+        split_ev = evaluator.split(card, rules.double_after_split)
+        column["Split"][row] = bool(split_ev > best_unsplit)
+
+    return column
+
+
+class StrategyGenerator:
+    """Derives basic strategy tables for a rule set in the Strategy.xlsx layout"""
+
+    SHEET_ROWS = {
+        "Split": SPLIT_ROWS,
+        "Surrender": SURRENDER_ROWS,
+        "Soft Totals": SOFT_ROWS,
+        "Hard Totals": HARD_ROWS,
+    }
+
+    def __init__(self, rules: RuleSet, max_workers: int = None):
+        self.rules = rules
+        self.max_workers = max_workers
+
+    def generate(self) -> Dict[str, pd.DataFrame]:
+        """Solve every dealer upcard in parallel and assemble the sheets"""
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            columns = list(
+                pool.map(
+                    _solve_dealer_upcard,
+                    DEALER_UPCARDS,
+                    [self.rules] * len(DEALER_UPCARDS),
+                )
+            )
+
+        sheets = {}
+        for sheet, rows in self.SHEET_ROWS.items():
+            data = {
+                dealer_col: [column[sheet][row] for row in rows]
+                for dealer_col, column in zip(DEALER_COLUMNS, columns)
+            }
+            df = pd.DataFrame(data, index=pd.Index(rows, name="Hand"))
+            sheets[sheet] = df
+        return sheets
+
+    def write_workbook(self, path: str) -> Dict[str, pd.DataFrame]:
+        """Generate the tables and write them in the layout StrategyTables reads"""
+        sheets = self.generate()
+        with pd.ExcelWriter(path) as writer:
+            for sheet, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet)
+            pd.DataFrame({"Rules": [self.rules.describe()]}).to_excel(
+                writer, sheet_name="Source", index=False
+            )
+        return sheets
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate basic strategy tables in the Strategy.xlsx layout"
+    )
+    parser.add_argument("output", help="Path of the workbook to write")
+    parser.add_argument("--h17", action="store_true", help="Dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="No double after split")
+    parser.add_argument(
+        "--no-surrender", action="store_true", help="Late surrender not offered"
+    )
+    parser.add_argument(
+        "--no-peek", action="store_true", help="Dealer does not peek for blackjack"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    rules = RuleSet(
+        dealer_hits_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        late_surrender=not args.no_surrender,
+        dealer_peeks=not args.no_peek,
+    )
+    print(f"Generating strategy for: {rules.describe()}")
+    StrategyGenerator(rules, max_workers=args.workers).write_workbook(args.output)
+    print(f"Strategy written to {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
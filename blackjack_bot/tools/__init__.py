@@ -0,0 +1 @@
+"""Command line tools, run with python -m blackjack_bot.tools.<name>"""
@@ -0,0 +1,331 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..recognition.cascade import ReferenceMatcher
+from ..sim.frames import FrameSynthesizer
+
+# (mode, true label, BGR image of the total box)
+Roi = Tuple[str, str, np.ndarray]
+
+REJECT = "none"
+
+# Every worker holds its own OCR model, so all cores would mean one model per core
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _paddle_method(method: str):
+    def build() -> Callable[[str, np.ndarray], Optional[str]]:
+        import OCR
+
+        return lambda mode, img: OCR.read_card_image(img, method, mode=mode)[0]
+
+    return build
+
+
+def _paddle_pipeline() -> Callable[[str, np.ndarray], Optional[str]]:
+    import OCR
+
+    return lambda mode, img: OCR.recognize_card_images([img], mode=mode)[0][0]
+
+
+def _ssim_old() -> Callable[[str, np.ndarray], Optional[str]]:
+    import OCR
+
+    def read(mode: str, img: np.ndarray) -> Optional[str]:
+        # The legacy reader prints every tie-break
+        with contextlib.redirect_stdout(io.StringIO()):
+            return OCR.ocr_card_old_image(img, mode)
+
+    return read
+
+
+def _reference() -> Callable[[str, np.ndarray], Optional[str]]:
+    matchers: Dict[str, ReferenceMatcher] = {}
+
+    def read(mode: str, img: np.ndarray) -> Optional[str]:
+        if mode not in matchers:
+            matchers[mode] = ReferenceMatcher(mode)
+        label, best, _ = matchers[mode].scores(img)
+        return label if best >= 0.5 else None
+
+    return read
+
+
+# name -> builder of read(mode, img) -> label or None, run once per worker
+RECOGNIZERS: Dict[str, Callable[[], Callable[[str, np.ndarray], Optional[str]]]] = {
+    "paddle.pipeline": _paddle_pipeline,
+    "paddle.otsu": _paddle_method("otsu"),
+    "paddle.original": _paddle_method("original"),
+    "paddle.adaptive": _paddle_method("adaptive"),
+    "ssim.ocr_card_old": _ssim_old,
+    "reference.ncc": _reference,
+}
+
+_worker_readers: Dict[str, Callable[[str, np.ndarray], Optional[str]]] = {}
+
+
+def _read_chunk(
+    recognizer: str, items: List[Tuple[str, np.ndarray]]
+) -> List[Tuple[Optional[str], float]]:
+    """Worker: (prediction, seconds) for each item"""
+    read = _worker_readers.get(recognizer)
+    if read is None:
+        read = _worker_readers[recognizer] = RECOGNIZERS[recognizer]()
+        # First calls load models and caches, keep them out of the latencies
+        try:
+            read(*items[0])
+        except Exception:
+            pass
+    results = []
+    for mode, img in items:
+        start = time.perf_counter()
+        try:
+            label = read(mode, img)
+        except Exception:
+            label = None
+        results.append((label, time.perf_counter() - start))
+    return results
+
+
+@dataclass
+class RecognizerReport:
+    name: str
+    truth: List[str] = field(default_factory=list)
+    predicted: List[str] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.truth)
+
+    def rate(self, kind: str) -> float:
+        if not self.truth:
+            return 0.0
+        pairs = zip(self.truth, self.predicted)
+        if kind == "correct":
+            hits = sum(t == p for t, p in pairs)
+        elif kind == "wrong":
+            hits = sum(p != REJECT and t != p for t, p in pairs)
+        else:
+            hits = sum(p == REJECT for _, p in pairs)
+        return hits / len(self.truth)
+
+    def latency_ms(self, percentile: float) -> float:
+        return float(np.percentile(self.latencies, percentile)) * 1000
+
+    @property
+    def throughput(self) -> float:
+        """ROIs per second across the whole pool"""
+        return self.count / self.wall_seconds if self.wall_seconds else 0.0
+
+    def confusion(self) -> Tuple[List[str], np.ndarray]:
+        """(labels, matrix) with true labels on rows and predictions on columns"""
+        labels = sorted(set(self.truth) | (set(self.predicted) - {REJECT})) + [REJECT]
+        index = {label: i for i, label in enumerate(labels)}
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        for t, p in zip(self.truth, self.predicted):
+            matrix[index[t], index[p]] += 1
+        return labels, matrix
+
+    def top_confusions(self, top: int = 3) -> List[Tuple[str, str, int]]:
+        labels, matrix = self.confusion()
+        np.fill_diagonal(matrix, 0)
+        order = np.argsort(matrix, axis=None)[::-1][:top]
+        rows, cols = np.unravel_index(order, matrix.shape)
+        return [
+            (labels[r], labels[c], int(matrix[r, c]))
+            for r, c in zip(rows, cols)
+            if matrix[r, c]
+        ]
+
+    def write_confusion(self, path: str):
+        labels, matrix = self.confusion()
+        with open(path, "w") as f:
+            f.write("truth\\predicted," + ",".join(labels) + "\n")
+            for label, row in zip(labels, matrix):
+                f.write(label + "," + ",".join(str(v) for v in row) + "\n")
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "accuracy": round(self.rate("correct"), 4),
+            "error_rate": round(self.rate("wrong"), 4),
+            "reject_rate": round(self.rate("reject"), 4),
+            "p50_ms": round(self.latency_ms(50), 3),
+            "p99_ms": round(self.latency_ms(99), 3),
+            "throughput": round(self.throughput, 1),
+        }
+
+
+def rois_from_samples(samples) -> List[Roi]:
+    rois = []
+    for sample in samples:
+        frame = cv2.cvtColor(sample.frame, cv2.COLOR_RGB2BGR)
+        for label, (x1, y1, x2, y2) in zip(sample.spec.player, sample.player_boxes):
+            rois.append(("player", label, frame[y1:y2, x1:x2]))
+        if sample.dealer_box:
+            x1, y1, x2, y2 = sample.dealer_box
+            rois.append(("dealer", sample.spec.dealer, frame[y1:y2, x1:x2]))
+    return rois
+
+
+def corpus_is_synthetic(folder: str) -> bool:
+    """Whether blackjack_bot.sim.frames drew the corpus rather than a real table"""
+    with open(os.path.join(folder, "labels.jsonl")) as labels:
+        return any(json.loads(line).get("synthetic") for line in labels)
+
+
+def rois_from_folder(folder: str) -> List[Roi]:
+    """ROIs from a corpus written by ``python -m blackjack_bot.sim.frames``"""
+    rois = []
+    with open(os.path.join(folder, "labels.jsonl")) as labels:
+        for line in labels:
+            entry = json.loads(line)
+            frame = cv2.imread(os.path.join(folder, entry["file"]))
+            if frame is None:
+                continue
+            boxes = [("player", hand) for hand in entry["player"]]
+            if entry["dealer"]:
+                boxes.append(("dealer", entry["dealer"]))
+            for mode, item in boxes:
+                x1, y1, x2, y2 = item["box"]
+                rois.append((mode, item["label"], frame[y1:y2, x1:x2]))
+    return rois
+
+
+def bakeoff(
+    rois: List[Roi],
+    recognizers: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 16,
+) -> List[RecognizerReport]:
+    """Run every recognizer over the ROIs, one after another, each across the pool"""
+    reports = []
+    items = [(mode, img) for mode, _, img in rois]
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    # Spawned, not forked, so no worker inherits a PaddleOCR model imported here
+    with ProcessPoolExecutor(
+        max_workers=max_workers or DEFAULT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        for name in recognizers or list(RECOGNIZERS):
+            # Untimed pass so every worker has built the recognizer
+            list(pool.map(_read_chunk, [name] * len(chunks), [c[:1] for c in chunks]))
+            report = RecognizerReport(name, [label for _, label, _ in rois])
+            start = time.perf_counter()
+            for results in pool.map(_read_chunk, [name] * len(chunks), chunks):
+                for label, seconds in results:
+                    report.predicted.append(label or REJECT)
+                    report.latencies.append(seconds)
+            report.wall_seconds = time.perf_counter() - start
+            reports.append(report)
+            print(f"  {name}: done in {report.wall_seconds:.1f}s")
+    return reports
+
+
+def print_reports(reports: List[RecognizerReport], max_error: float = 0.01):
+    print(
+        f"{'Recognizer':<20}{'ROIs':>6}{'Correct':>9}{'Wrong':>8}{'Reject':>8}"
+        f"{'p50 ms':>9}{'p99 ms':>9}{'ROI/s':>9}"
+    )
+    for report in reports:
+        s = report.summary()
+        print(
+            f"{report.name:<20}{s['count']:>6}{s['accuracy']:>9.1%}"
+            f"{s['error_rate']:>8.1%}{s['reject_rate']:>8.1%}"
+            f"{s['p50_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['throughput']:>9.1f}"
+        )
+    for report in reports:
+        confusions = report.top_confusions()
+        if confusions:
+            text = ", ".join(f"{t} as {p} x{n}" for t, p, n in confusions)
+            print(f"  {report.name} most confused: {text}")
+    # Rejects count as misses too, a recognizer that reads nothing is never fastest
+    eligible = [r for r in reports if 1 - r.rate("correct") <= max_error]
+    if eligible:
+        best = min(eligible, key=lambda r: r.latency_ms(50))
+        print(
+            f"\nFastest with <= {max_error:.1%} missed reads: {best.name} "
+            f"(p50 {best.latency_ms(50):.2f} ms, {best.rate('wrong'):.1%} wrong)"
+        )
+    else:
+        print(f"\nNo recognizer misses <= {max_error:.1%} of reads")
+
+
+def write_reports(reports: List[RecognizerReport], folder: str):
+    os.makedirs(folder, exist_ok=True)
+    for report in reports:
+        report.write_confusion(os.path.join(folder, f"{report.name}_confusion.csv"))
+    with open(os.path.join(folder, "summary.json"), "w") as f:
+        json.dump({r.name: r.summary() for r in reports}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare every card recognizer's accuracy and latency on labeled ROIs"
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="Folder written by blackjack_bot.sim.frames, default a fresh synthetic one",
+    )
+    parser.add_argument("--count", type=int, default=200, help="Synthetic frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--jpeg", type=int, default=None, help="JPEG quality")
+    parser.add_argument(
+        "--recognizers",
+        nargs="*",
+        choices=list(RECOGNIZERS),
+        default=None,
+        help="Default all",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Processes, each loads its own OCR model (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-error",
+        type=float,
+        default=1.0,
+        help="Wrong or rejected read %% the recommended recognizer may have",
+    )
+    parser.add_argument(
+        "--output", default=None, help="Folder for confusion CSVs and summary.json"
+    )
+    args = parser.parse_args()
+
+    if args.corpus:
+        rois = rois_from_folder(args.corpus)
+    else:
+        samples = FrameSynthesizer().corpus(
+            args.count, args.seed, noise=args.noise, jpeg_quality=args.jpeg
+        )
+        rois = rois_from_samples(samples)
+    print(
+        f"Running {len(args.recognizers or RECOGNIZERS)} recognizers on {len(rois)} ROIs"
+    )
+    reports = bakeoff(rois, args.recognizers, args.workers)
+    print()
+    print_reports(reports, args.max_error / 100)
+    if args.output:
+        write_reports(reports, args.output)
+        print(f"Confusion matrices written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
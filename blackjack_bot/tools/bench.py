@@ -0,0 +1,347 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import resource_path
+import screen_capture
+
+from ..sim.frames import SPECIFIC_CARDS, FrameSpec, FrameSynthesizer, TableLayout
+
+BASELINE_FOLDER = "benchmarks"
+
+
+@dataclass
+class Fixtures:
+    """Frames and card crops every stage runs over, the same for the same seed"""
+
+    layout: TableLayout
+    frames: List[np.ndarray] = field(default_factory=list)  # Full-screen RGB
+    player_crops: List[np.ndarray] = field(default_factory=list)  # BGR
+    player_bboxes: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    player_frames: List[np.ndarray] = field(default_factory=list)
+    specific_frames: List[np.ndarray] = field(default_factory=list)
+
+
+def build_fixtures(
+    layout: Optional[TableLayout] = None, count: int = 24, seed: int = 0
+) -> Fixtures:
+    synthesizer = FrameSynthesizer(layout)
+    fixtures = Fixtures(synthesizer.layout)
+    for sample in synthesizer.corpus(count, seed):
+        fixtures.frames.append(sample.frame)
+        for x1, y1, x2, y2 in sample.player_boxes:
+            fixtures.player_crops.append(
+                cv2.cvtColor(sample.frame[y1:y2, x1:x2], cv2.COLOR_RGB2BGR)
+            )
+            fixtures.player_bboxes.append((x1, y1, x2, y2))
+            fixtures.player_frames.append(sample.frame)
+    for card in SPECIFIC_CARDS:
+        spec = FrameSpec(specific_card=card, jitter=0)
+        fixtures.specific_frames.append(synthesizer.render(spec).frame)
+    return fixtures
+
+
+class _FrameServer:
+    """Serves one fixture frame at a time through screen_capture"""
+
+    def __init__(self, frames: List[np.ndarray]):
+        self.frames = frames
+        self.index = 0
+        screen_capture.set_frame_source(lambda: self.frames[self.index])
+
+    def select(self, i: int):
+        self.index = i % len(self.frames)
+
+
+def _check_buttons(fx: Fixtures) -> Callable[[int], None]:
+    import ButtonChecker
+
+    x1, y1, x2, y2 = fx.layout.buttons
+    crops = [cv2.cvtColor(f[y1:y2, x1:x2], cv2.COLOR_RGB2BGR) for f in fx.frames]
+
+    def step(i: int):
+        ButtonChecker.check_buttons(fx.layout.buttons, screen_img=crops[i % len(crops)])
+
+    return step
+
+
+def _detect_boxes(fx: Fixtures) -> Callable[[int], None]:
+    import find_player
+
+    server = _FrameServer(fx.frames)
+
+    def step(i: int):
+        server.select(i)
+        find_player.detect_boxes(fx.layout.player_table, mode="player")
+
+    return step
+
+
+def _ocr_card(fx: Fixtures) -> Callable[[int], None]:
+    import OCR
+
+    server = _FrameServer(fx.player_frames)
+
+    def step(i: int):
+        server.select(i)
+        OCR.ocr_card(fx.player_bboxes[i % len(fx.player_bboxes)], mode="player")
+
+    return step
+
+
+def _ocr_method(method: str):
+    def factory(fx: Fixtures) -> Callable[[int], None]:
+        import OCR
+
+        crops = fx.player_crops
+
+        def step(i: int):
+            OCR.read_card_image(crops[i % len(crops)], method, mode="player")
+
+        return step
+
+    return factory
+
+
+def _ocr_specific_card(fx: Fixtures) -> Callable[[int], None]:
+    import OCR
+
+    server = _FrameServer(fx.specific_frames)
+
+    def step(i: int):
+        server.select(i)
+        OCR.ocr_specific_card(fx.layout.specific_card)
+
+    return step
+
+
+def _strategy_load(fx: Fixtures) -> Callable[[int], None]:
+    from ..strategy.tables import StrategyTables
+
+    path = resource_path.resource_path("Strategy.xlsx")
+
+    def step(i: int):
+        # The tables print their progress, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            StrategyTables(path)
+
+    return step
+
+
+def _strategy_lookup(fx: Fixtures) -> Callable[[int], None]:
+    from ..enums import Action
+    from ..strategy.decider import StrategyDecider
+    from ..strategy.tables import StrategyTables
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tables = StrategyTables(resource_path.resource_path("Strategy.xlsx"))
+    decider = StrategyDecider(tables, 1)
+    dealers = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "1_11"]
+    hard = [str(total) for total in range(4, 21)]
+    soft = [f"{low}_{low + 10}" for low in range(2, 11)]
+
+    def step(i: int):
+        # One pass over every hand a decision can be made on
+        for dealer in dealers:
+            for player in hard:
+                decider.should_split(player, dealer, Action.REBET, False)
+                decider.should_surrender(player, dealer, Action.REBET, "7")
+                decider.get_hard_action(player, dealer)
+            for player in soft:
+                decider.should_split(player, dealer, Action.REBET, False)
+                decider.get_soft_action(player, dealer)
+
+    return step
+
+
+# name -> (factory building the timed step from the fixtures, default runs)
+STAGES: Dict[str, Tuple[Callable[[Fixtures], Callable[[int], None]], int]] = {
+    "buttons.check_buttons": (_check_buttons, 200),
+    "find_player.detect_boxes": (_detect_boxes, 200),
+    "ocr.ocr_card": (_ocr_card, 50),
+    "ocr.otsu": (_ocr_method("otsu"), 50),
+    "ocr.original": (_ocr_method("original"), 50),
+    "ocr.adaptive": (_ocr_method("adaptive"), 50),
+    "ocr.specific_card": (_ocr_specific_card, 50),
+    "strategy.load": (_strategy_load, 5),
+    "strategy.lookup": (_strategy_lookup, 500),
+}
+
+
+@dataclass
+class StageResult:
+    runs: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+
+
+def time_stage(step: Callable[[int], None], runs: int, warmup: int = 3) -> StageResult:
+    for i in range(warmup):
+        step(i)
+    samples = np.empty(runs)
+    for i in range(runs):
+        start = time.perf_counter()
+        step(i)
+        samples[i] = time.perf_counter() - start
+    samples *= 1000
+    return StageResult(
+        runs,
+        float(np.percentile(samples, 50)),
+        float(np.percentile(samples, 95)),
+        float(samples.mean()),
+    )
+
+
+def run_stages(
+    fixtures: Fixtures, names: List[str], runs_scale: float = 1.0
+) -> Dict[str, StageResult]:
+    results = {}
+    try:
+        for name in names:
+            factory, runs = STAGES[name]
+            results[name] = time_stage(
+                factory(fixtures), max(1, int(runs * runs_scale))
+            )
+            print(f"  {name}: p50 {results[name].p50_ms:.3f} ms")
+    finally:
+        screen_capture.set_frame_source(None)
+    return results
+
+
+def machine_name() -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", platform.node() or "unknown")
+
+
+def baseline_path(folder: str = BASELINE_FOLDER, machine: Optional[str] = None):
+    return os.path.join(folder, f"{machine or machine_name()}.json")
+
+
+def load_baseline(path: str) -> Dict[str, StageResult]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    return {name: StageResult(**stage) for name, stage in data["stages"].items()}
+
+
+def save_baseline(path: str, results: Dict[str, StageResult]):
+    """Write results over the stored baseline, keeping stages not rerun"""
+    stages = {name: asdict(stage) for name, stage in load_baseline(path).items()}
+    stages.update({name: asdict(stage) for name, stage in results.items()})
+    data = {
+        "machine": machine_name(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "stages": stages,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def compare(
+    results: Dict[str, StageResult],
+    baseline: Dict[str, StageResult],
+    threshold: float = 10.0,
+) -> List[str]:
+    """Print the comparison table. Returns the stages more than threshold % slower."""
+    slower = []
+    print(
+        f"{'Stage':<26}{'Baseline p50':>14}{'Now p50':>12}{'Change':>9}"
+        f"{'Now p95':>12}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            base_text, change_text, flag = "-", "new", ""
+        else:
+            change = (result.p50_ms / base.p50_ms - 1) * 100 if base.p50_ms else 0.0
+            base_text = f"{base.p50_ms:.3f} ms"
+            change_text = f"{change:+.1f}%"
+            flag = ""
+            if change > threshold:
+                flag = "  SLOWER"
+                slower.append(name)
+        print(
+            f"{name:<26}{base_text:>14}{result.p50_ms:>9.3f} ms{change_text:>9}"
+            f"{result.p95_ms:>9.3f} ms{flag}"
+        )
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time each recognition and strategy stage against this machine's baseline"
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help=f"Stage names or prefixes (default all): {', '.join(STAGES)}",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Flag stages whose p50 is more than this %% slower",
+    )
+    parser.add_argument("--save", action="store_true", help="Store as the baseline")
+    parser.add_argument("--runs-scale", type=float, default=1.0)
+    parser.add_argument("--baseline-dir", default=BASELINE_FOLDER)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--config", default=None, help="Vars.txt style file to take the layout from"
+    )
+    args = parser.parse_args()
+
+    names = [
+        name
+        for name in STAGES
+        if not args.stages or any(name.startswith(s) for s in args.stages)
+    ]
+    if not names:
+        parser.error("no stage matches " + " ".join(args.stages))
+    layout = None
+    if args.config:
+        import ReadVars
+
+        layout = TableLayout.from_config(ReadVars.read_tuples_from_file(args.config))
+
+    print(f"Building fixtures (seed {args.seed})...")
+    fixtures = build_fixtures(layout, seed=args.seed)
+    print(f"Timing {len(names)} stages on {machine_name()}...")
+    results = run_stages(fixtures, names, args.runs_scale)
+
+    path = baseline_path(args.baseline_dir)
+    baseline = load_baseline(path)
+    print()
+    slower = compare(results, baseline, args.threshold)
+    if args.save:
+        save_baseline(path, results)
+        print(f"\nBaseline saved to {path}")
+    elif not baseline:
+        print(f"\nNo baseline for {machine_name()} yet, run with --save to store one")
+    if slower and not args.save:
+        print(f"\n{len(slower)} stages more than {args.threshold:g}% slower")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import OCR
+import ReadVars
+
+from ..sim.frames import SPECIFIC_CARDS, FrameSpec, FrameSynthesizer, TableLayout
+from .bakeoff import (
+    DEFAULT_WORKERS,
+    Roi,
+    corpus_is_synthetic,
+    rois_from_folder,
+    rois_from_samples,
+)
+
+# Settings are tuples of (OCR.preprocessing key, value) so they can be dict keys
+Settings = Tuple[Tuple[str, object], ...]
+
+_worker_rois: Dict[str, List[Roi]] = {}
+
+
+def _init_worker(rois: Dict[str, List[Roi]]):
+    _worker_rois.update(rois)
+
+
+def _read(target: str, mode: str, img: np.ndarray) -> Optional[str]:
+    if target == "specific":
+        return OCR.ocr_specific_card_image(img)
+    return OCR.recognize_card_images([img], mode=mode)[0][0]
+
+
+def _evaluate(target: str, settings: Settings, start: int, stop: int):
+    """Worker: (correct reads, seconds per read) for ROIs start:stop of target"""
+    OCR.configure_preprocessing(dict(settings))
+    rois = _worker_rois[target][start:stop]
+    # Keep model warmup out of the latencies
+    _read(target, rois[0][0], rois[0][2])
+    correct = 0
+    latencies = []
+    for mode, truth, img in rois:
+        began = time.perf_counter()
+        label = _read(target, mode, img)
+        latencies.append(time.perf_counter() - began)
+        correct += label == truth
+    return correct, latencies
+
+
+@dataclass
+class SweepResult:
+    target: str
+    settings: Settings
+    correct: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        """Mean, not median, so the fallback reads a setting causes are counted"""
+        return float(np.mean(self.latencies)) * 1000 if self.latencies else 0.0
+
+    def describe(self) -> str:
+        return " ".join(f"{key}={value}" for key, value in self.settings)
+
+
+def card_grid(
+    scales: List[float], interpolations: List[str], adaptive: List[Tuple[int, int]]
+) -> List[Settings]:
+    return [
+        (
+            ("scale", scale),
+            ("interpolation", interpolation),
+            ("adaptive_block", block),
+            ("adaptive_c", c),
+        )
+        for scale, interpolation, (block, c) in itertools.product(
+            scales, interpolations, adaptive
+        )
+    ]
+
+
+def specific_grid(scales: List[float], interpolations: List[str]) -> List[Settings]:
+    return [
+        (("specific_scale", scale), ("specific_interpolation", interpolation))
+        for scale, interpolation in itertools.product(scales, interpolations)
+    ]
+
+
+def specific_rois(
+    layout: TableLayout, repeats: int = 4, seed: int = 0, noise: float = 0.0
+) -> List[Roi]:
+    """Every specific card a few times, labeled the way ocr_specific_card reads it"""
+    synthesizer = FrameSynthesizer(layout)
+    rng = np.random.default_rng(seed)
+    x1, y1, x2, y2 = layout.specific_card
+    rois = []
+    for card in SPECIFIC_CARDS * repeats:
+        sample = synthesizer.render(FrameSpec(specific_card=card, noise=noise), rng)
+        truth = "10" if card in ("K", "Q", "J") else card
+        rois.append(("specific", truth, sample.frame[y1:y2, x1:x2, ::-1].copy()))
+    return rois
+
+
+def specific_rois_from_folder(folder: str) -> List[Roi]:
+    """Captured specific cards, one subfolder per label ("10", "9" ... "5")"""
+    rois = []
+    for label in sorted(os.listdir(folder)):
+        path = os.path.join(folder, label)
+        if not os.path.isdir(path):
+            continue
+        for name in sorted(os.listdir(path)):
+            img = cv2.imread(os.path.join(path, name))
+            if img is not None:
+                rois.append(("specific", label, img))
+    return rois
+
+
+def sweep(
+    grids: Dict[str, List[Settings]],
+    rois: Dict[str, List[Roi]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = 32,
+) -> List[SweepResult]:
+    """Evaluate every settings point of every target over its ROIs on all cores"""
+    results: Dict[Tuple[str, Settings], SweepResult] = {}
+    tasks = []
+    for target, grid in grids.items():
+        count = len(rois[target])
+        for settings in grid:
+            results[(target, settings)] = SweepResult(target, settings)
+            for start in range(0, count, chunk_size):
+                tasks.append((target, settings, start, min(start + chunk_size, count)))
+    # Spawned, not forked, so no worker inherits the PaddleOCR model imported here
+    with ProcessPoolExecutor(
+        max_workers=max_workers or DEFAULT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(rois,),
+    ) as pool:
+        columns = list(zip(*tasks))
+        for (target, settings, _, _), (correct, latencies) in zip(
+            tasks, pool.map(_evaluate, *columns)
+        ):
+            result = results[(target, settings)]
+            result.correct += correct
+            result.latencies.extend(latencies)
+    return list(results.values())
+
+
+def pareto_front(results: List[SweepResult]) -> List[SweepResult]:
+    """Results no other result beats on both latency and accuracy, fastest first"""
+    front = []
+    best_accuracy = -1.0
+    for result in sorted(results, key=lambda r: (r.mean_ms, -r.accuracy)):
+        if result.accuracy > best_accuracy:
+            front.append(result)
+            best_accuracy = result.accuracy
+    return front
+
+
+def choose(front: List[SweepResult], tolerance: float) -> SweepResult:
+    """Fastest front point within tolerance of the best accuracy"""
+    best_accuracy = max(result.accuracy for result in front)
+    return next(r for r in front if r.accuracy >= best_accuracy - tolerance)
+
+
+def print_front(target: str, front: List[SweepResult], chosen: SweepResult):
+    print(f"\n{target} Pareto front (mean latency vs accuracy):")
+    for result in front:
+        marker = "  <- chosen" if result is chosen else ""
+        print(
+            f"  {result.mean_ms:8.2f} ms  {result.accuracy:6.1%}  "
+            f"{result.describe()}{marker}"
+        )
+
+
+def write_settings(chosen: List[SweepResult], config: str):
+    names = {key: name for name, key in OCR.PREPROCESSING_VARS.items()}
+    for result in chosen:
+        for key, value in result.settings:
+            ReadVars.update_var_in_file(names[key], value, config)
+
+
+def _numbers(values: List[str]) -> List[float]:
+    """Whole numbers stay ints so Vars.txt gets "2" rather than "2.0" """
+    return [int(v) if v.is_integer() else v for v in map(float, values)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep OCR preprocessing settings and pick the fastest accurate ones"
+    )
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        help="Labeled totals in the blackjack_bot.sim.frames layout, default synthetic",
+    )
+    parser.add_argument(
+        "--specific-corpus",
+        default=None,
+        help="Captured specific cards, one subfolder per label, default synthetic ones",
+    )
+    parser.add_argument("--count", type=int, default=200, help="Synthetic frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--scales", nargs="+", default=["1", "1.5", "2", "3"])
+    parser.add_argument(
+        "--interpolations",
+        nargs="+",
+        choices=list(OCR.INTERPOLATIONS),
+        default=["linear", "cubic", "area"],
+    )
+    parser.add_argument(
+        "--adaptive",
+        nargs="+",
+        default=["11:2", "7:2", "15:4"],
+        help="Adaptive threshold block:C pairs, block odd",
+    )
+    parser.add_argument("--specific-scales", nargs="+", default=["2", "3", "4", "5"])
+    parser.add_argument(
+        "--specific-interpolations",
+        nargs="+",
+        choices=list(OCR.INTERPOLATIONS),
+        default=["linear", "cubic"],
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Accuracy points below the best a faster setting may give up",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Processes, each loads its own OCR model (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument("--config", default="Vars.txt")
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="Write the chosen settings of every target read from a given corpus",
+    )
+    args = parser.parse_args()
+
+    layout = TableLayout.from_config(ReadVars.read_tuples_from_file(args.config))
+    if args.corpus:
+        card_rois = rois_from_folder(args.corpus)
+    else:
+        card_rois = rois_from_samples(
+            FrameSynthesizer(layout).corpus(args.count, args.seed, noise=args.noise)
+        )
+    if args.specific_corpus:
+        specific = specific_rois_from_folder(args.specific_corpus)
+    else:
+        specific = specific_rois(layout, seed=args.seed, noise=args.noise)
+    rois = {"card": card_rois, "specific": specific}
+    # Synthetic frames only approximate the table, settings tuned on them are
+    # printed but never written
+    measured = {
+        "card": args.corpus and not corpus_is_synthetic(args.corpus),
+        "specific": args.specific_corpus,
+    }
+    adaptive = [tuple(int(v) for v in pair.split(":")) for pair in args.adaptive]
+    grids = {
+        "card": card_grid(_numbers(args.scales), args.interpolations, adaptive),
+        "specific": specific_grid(
+            _numbers(args.specific_scales), args.specific_interpolations
+        ),
+    }
+    print(
+        f"Sweeping {len(grids['card'])} card settings over {len(card_rois)} totals and "
+        f"{len(grids['specific'])} specific card settings over {len(rois['specific'])} cards"
+    )
+    results = sweep(grids, rois, args.workers)
+
+    chosen = []
+    for target in grids:
+        front = pareto_front([r for r in results if r.target == target])
+        best = choose(front, args.tolerance / 100)
+        print_front(target, front, best)
+        if measured[target]:
+            chosen.append(best)
+    if not args.write:
+        return
+    if not chosen:
+        print("\nNothing written, only settings from --corpus or --specific-corpus are")
+        return
+    write_settings(chosen, args.config)
+    targets = " and ".join(result.target for result in chosen)
+    print(f"\nChosen {targets} settings written to {args.config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
-from .screenshot import ScreenshotManager
+from .event_log import EventLog, event_log
+from .flight_recorder import FlightRecorder
 
-__all__ = ["ScreenshotManager"]
+__all__ = ["EventLog", "FlightRecorder", "event_log"]
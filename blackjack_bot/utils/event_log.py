@@ -0,0 +1,115 @@
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Optional
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+
+class EventLog:
+    """Structured event log written off the bot thread.
+
+    Logging an event is one put on a SimpleQueue. A writer thread prints the
+    message to the console and appends a JSON line to a rotating file. In
+    quiet mode only warnings and errors reach the console.
+    """
+
+    def __init__(self):
+        self.level = INFO
+        self.console_level = INFO
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file_logger: Optional[logging.Logger] = None
+        # Fields bound to the logging thread, e.g. the table in multi-table mode
+        self._local = threading.local()
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def configure(
+        self,
+        quiet: bool = False,
+        path: Optional[str] = None,
+        level: int = INFO,
+        max_bytes: int = 5_000_000,
+        backup_count: int = 5,
+    ):
+        """Set levels and the rotating file. An empty path disables the file."""
+        self.level = level
+        self.console_level = WARNING if quiet else level
+        # Write what's queued to the old file before its handler is closed
+        self.flush()
+        previous = self._file_logger.handlers if self._file_logger else []
+        self._file_logger = None
+        if path:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            file_logger = logging.getLogger(f"blackjack_bot.events.{path}")
+            file_logger.handlers = [handler]
+            file_logger.setLevel(DEBUG)
+            file_logger.propagate = False
+            self._file_logger = file_logger
+        for handler in previous:
+            handler.close()
+
+    def bind(self, **fields):
+        """Add fields to every event logged from the calling thread"""
+        self._local.fields = fields
+
+    def log(self, level: int, event: str, message: str = "", **fields):
+        if level < self.level:
+            return
+        bound = getattr(self._local, "fields", None)
+        if bound:
+            fields = {**bound, **fields}
+        self._queue.put((time.time(), level, event, message, fields))
+
+    def debug(self, event: str, message: str = "", **fields):
+        self.log(DEBUG, event, message, **fields)
+
+    def info(self, event: str, message: str = "", **fields):
+        self.log(INFO, event, message, **fields)
+
+    def warning(self, event: str, message: str = "", **fields):
+        self.log(WARNING, event, message, **fields)
+
+    def error(self, event: str, message: str = "", **fields):
+        self.log(ERROR, event, message, **fields)
+
+    def flush(self, timeout: float = 2.0):
+        """Wait until everything queued so far has been written"""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _write(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            timestamp, level, event, message, fields = item
+            try:
+                if message and level >= self.console_level:
+                    print(message)
+                if self._file_logger is not None:
+                    record = {
+                        "time": round(timestamp, 3),
+                        "level": logging.getLevelName(level),
+                        "event": event,
+                        "message": message.strip(),
+                        **fields,
+                    }
+                    self._file_logger.log(level, json.dumps(record, default=str))
+            except Exception:
+                # A full disk or closed console must never take the bot down
+                pass
+
+
+event_log = EventLog()
@@ -0,0 +1,149 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+
+import screen_capture
+
+Box = Tuple[int, int, int, int]
+
+TICK_DTYPE = np.dtype(
+    [
+        ("time", "<f8"),
+        ("phase", "S24"),
+        ("player", "S6"),
+        ("dealer", "S4"),
+        ("action", "S10"),
+    ]
+)
+
+
+class FlightRecorder:
+    """Keeps the last ``ticks`` ticks of screen regions and decisions in memory.
+
+    Every grab inside one of the configured regions is copied into a
+    preallocated ring slot, so nothing is allocated or encoded while the bot
+    plays. ``dump`` copies the ring and writes it as a compressed .npz on a
+    background thread.
+    """
+
+    def __init__(
+        self, rois: Dict[str, Box], ticks: int = 16, folder: str = "split_errors"
+    ):
+        self.rois = {name: tuple(box) for name, box in rois.items() if box}
+        self.ticks = ticks
+        self.folder = folder
+        self._frames = {
+            name: np.zeros((ticks, y2 - y1, x2 - x1, 3), dtype=np.uint8)
+            for name, (x1, y1, x2, y2) in self.rois.items()
+        }
+        # Part of each slot written this tick, relative to the region, -1 if none
+        self._extents = {
+            name: np.full((ticks, 4), -1, dtype=np.int32) for name in self.rois
+        }
+        self._meta = np.zeros(ticks, dtype=TICK_DTYPE)
+        self._slot = -1
+        self._recorded = 0
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="flight-recorder"
+        )
+        self.dumps_written = 0
+
+    def begin_tick(self, phase: str):
+        """Move to the next slot and start capturing this thread's grabs into it"""
+        screen_capture.set_grab_listener(self.record_grab)
+        self._slot = (self._slot + 1) % self.ticks
+        self._recorded = min(self._recorded + 1, self.ticks)
+        for extents in self._extents.values():
+            extents[self._slot] = -1
+        meta = self._meta[self._slot]
+        meta["time"] = time.time()
+        meta["phase"] = phase
+        meta["player"] = meta["dealer"] = meta["action"] = b""
+
+    def note(self, player: str = "", dealer: str = "", action: str = ""):
+        """Attach the tick's reads and decision to the current slot"""
+        if self._slot < 0:
+            return
+        meta = self._meta[self._slot]
+        if player:
+            meta["player"] = player
+        if dealer:
+            meta["dealer"] = dealer
+        if action:
+            meta["action"] = action
+
+    def record_grab(self, bbox: Box, img: np.ndarray):
+        """screen_capture listener: copy a grab into its region's slot"""
+        if self._slot < 0:
+            return
+        for name, (x1, y1, x2, y2) in self.rois.items():
+            if bbox[0] >= x1 and bbox[1] >= y1 and bbox[2] <= x2 and bbox[3] <= y2:
+                break
+        else:
+            return
+        left, top = bbox[0] - x1, bbox[1] - y1
+        height, width = img.shape[:2]
+        self._frames[name][self._slot, top : top + height, left : left + width] = img[
+            ..., :3
+        ]
+        extent = self._extents[name][self._slot]
+        if extent[0] < 0:
+            extent[:] = (left, top, left + width, top + height)
+        else:
+            extent[:2] = np.minimum(extent[:2], (left, top))
+            extent[2:] = np.maximum(extent[2:], (left + width, top + height))
+
+    def dump(self, reason: str, details: str = ""):
+        """Save the ring, oldest tick first, without blocking the caller on disk"""
+        if self._recorded == 0:
+            return
+        order = [
+            (self._slot - age) % self.ticks for age in range(self._recorded - 1, -1, -1)
+        ]
+        arrays = {"ticks": self._meta[order].copy()}
+        for name, frames in self._frames.items():
+            for index, slot in enumerate(order):
+                x1, y1, x2, y2 = self._extents[name][slot]
+                if x1 < 0:
+                    continue
+                # Only the part of the region that was actually grabbed
+                arrays[f"{name}_{index}"] = frames[slot, y1:y2, x1:x2].copy()
+                arrays[f"{name}_{index}_box"] = np.array(
+                    (x1, y1, x2, y2), dtype=np.int32
+                ) + np.tile(self.rois[name][:2], 2)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        stem = f"{reason}_{details}" if details else reason
+        path = os.path.join(self.folder, f"{stem}_{timestamp}.npz")
+        self._writer.submit(self._write, path, arrays)
+
+    def _write(self, path: str, arrays: Dict[str, np.ndarray]):
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            np.savez_compressed(path, **arrays)
+            self.dumps_written += 1
+        except Exception as e:
+            print(f"✗ Failed to save flight recorder dump: {e}")
+
+    def close(self):
+        screen_capture.set_grab_listener(None)
+        self._writer.shutdown(wait=True)
+
+    def print_stats(self):
+        if self.dumps_written:
+            print(f"Flight recorder: {self.dumps_written} dumps in {self.folder}")
+
+
+def load_dump(path: str) -> Tuple[np.ndarray, Dict[str, Dict[int, np.ndarray]]]:
+    """Tick metadata and {region: {tick index: RGB image}} from a dump"""
+    data = np.load(path)
+    regions: Dict[str, Dict[int, np.ndarray]] = {}
+    for key in data.files:
+        if key == "ticks" or key.endswith("_box"):
+            continue
+        name, index = key.rsplit("_", 1)
+        regions.setdefault(name, {})[int(index)] = data[key]
+    return data["ticks"], regions
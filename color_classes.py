@@ -0,0 +1,77 @@
+import sys
+
+import cv2
+import numpy as np
+
+# Class bits, one per HSV range the bot tests. A pixel can be in several.
+PLAYER_GOLD = 1
+DEALER_BLACK = 2
+SPLIT_AVAILABLE = 4
+DOUBLE_AVAILABLE = 8
+SURRENDER_AVAILABLE = 16
+
+# (lower, upper) HSV bounds, same values cv2.inRange used per call before
+HSV_RANGES = {
+    PLAYER_GOLD: (np.array([20, 161, 54]), np.array([21, 206, 245])),
+    DEALER_BLACK: (np.array([0, 0, 0]), np.array([0, 0, 0])),
+    SPLIT_AVAILABLE: (np.array([28, 255, 223]), np.array([28, 255, 236])),
+    DOUBLE_AVAILABLE: (np.array([45, 193, 245]), np.array([45, 194, 255])),
+    SURRENDER_AVAILABLE: (np.array([0, 0, 242]), np.array([60, 5, 255])),
+}
+
+_lut = None
+
+
+def build_lut():
+    """Classify all 2^24 BGR colors once. Index is b | (g << 8) | (r << 16)."""
+    lut = np.zeros(1 << 24, dtype=np.uint8)
+    g, b = np.meshgrid(
+        np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8), indexing="ij"
+    )
+    block = np.empty((256, 256, 3), dtype=np.uint8)
+    block[..., 0] = b
+    block[..., 1] = g
+
+    # One 256x256 slice per red value keeps the build at a few MB of scratch
+    for r in range(256):
+        block[..., 2] = r
+        hsv = cv2.cvtColor(block, cv2.COLOR_BGR2HSV)
+        classes = lut[r << 16 : (r + 1) << 16]
+        for color_class, (lower, upper) in HSV_RANGES.items():
+            mask = cv2.inRange(hsv, lower, upper).reshape(-1)
+            classes[mask > 0] |= color_class
+    return lut
+
+
+def get_lut():
+    """Build the lookup table on first use and keep it for the session"""
+    global _lut
+    if _lut is None:
+        _lut = build_lut()
+    return _lut
+
+
+def classify(img_bgr):
+    """
+    OPTIMIZED: One vectorized pass from BGR straight to class bitmasks,
+    replacing a cvtColor to HSV plus an inRange per color test.
+    """
+    if sys.byteorder == "little":
+        # BGRA pixels read as uint32 are b | g << 8 | r << 16 | a << 24
+        index = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2BGRA).view(np.uint32)[..., 0]
+        index &= 0xFFFFFF
+    else:
+        index = img_bgr[..., 0].astype(np.uint32)
+        index |= img_bgr[..., 1].astype(np.uint32) << 8
+        index |= img_bgr[..., 2].astype(np.uint32) << 16
+    return np.take(get_lut(), index)
+
+
+def class_mask(classes, color_class):
+    """0/255 mask of pixels in a class, same format cv2.inRange returns"""
+    return ((classes & color_class) != 0).view(np.uint8) * np.uint8(255)
+
+
+def has_class(classes, color_class):
+    """True if any pixel in the classified region belongs to the class"""
+    return bool(np.any(classes & color_class))
@@ -1,33 +1,30 @@
 from PIL import ImageGrab
 import cv2
 import numpy as np
-import pyautogui
 
 import cv2
 import numpy as np
-import pyautogui
 from PIL import ImageGrab
 import os
 
 import cv2
 import numpy as np
-import pyautogui
 from PIL import ImageGrab
 import os
 
+import color_classes
+import screen_capture
+
 def detect_boxes(bbox=(123, 449, 1777, 857), mode='player', min_area=400, tolerance=15):
     
     if mode == 'player':
-        lower_color = np.array([20, 161, 54])  # Example lower HSV for gold
-        upper_color = np.array([21, 206, 245])  # Example upper HSV for gold
+        color_class = color_classes.PLAYER_GOLD  # gold total box
     elif mode == 'dealer':
-        lower_color = np.array([0, 0, 0])  # Example lower HSV for black
-        upper_color = np.array([0, 0, 0])  # Example upper HSV for black
-    screenshot = ImageGrab.grab(bbox=bbox)
-    img_np = np.array(screenshot)
+        color_class = color_classes.DEALER_BLACK  # black total box
+    img_np = screen_capture.grab(bbox)
     img = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-    hsv_img = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv_img, lower_color, upper_color)
+    # OPTIMIZATION: precomputed BGR -> color class lookup instead of HSV + inRange
+    mask = color_classes.class_mask(color_classes.classify(img), color_class)
 
     kernel = np.ones((3, 3), np.uint8)
     mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
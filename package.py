@@ -80,6 +80,7 @@ def build_exe():
     single_files = [
         "Vars.txt",
         "Strategy.xlsx",
+        "Deviations.txt",
         "Game Location.PNG",
     ]
 
@@ -129,26 +130,52 @@ def build_exe():
         "BlackjackMain",
         "boundingbox",
         "ButtonChecker",
+        "color_classes",
         "find_player",
         "NumberGrabber",
         "OCR",
         "ReadVars",
         "resource_path",
+        "screen_capture",
         # blackjack_bot package
         "blackjack_bot",
         "blackjack_bot.bot",
+        "blackjack_bot.daemon",
         "blackjack_bot.enums",
         "blackjack_bot.main",
         "blackjack_bot.models",
+        "blackjack_bot.multi_table",
         "blackjack_bot.game",
         "blackjack_bot.game.action_executor",
+        "blackjack_bot.game.box_tracker",
         "blackjack_bot.game.button_manager",
         "blackjack_bot.game.card_reader",
+        "blackjack_bot.game.hand_validator",
+        "blackjack_bot.game.input_backend",
+        "blackjack_bot.game.poll_scheduler",
+        "blackjack_bot.game.state_machine",
+        "blackjack_bot.recognition",
+        "blackjack_bot.recognition.service",
+        "blackjack_bot.recognition.cascade",
         "blackjack_bot.strategy",
         "blackjack_bot.strategy.decider",
+        "blackjack_bot.strategy.deviations",
+        "blackjack_bot.strategy.generator",
         "blackjack_bot.strategy.tables",
         "blackjack_bot.utils",
-        "blackjack_bot.utils.screenshot",
+        "blackjack_bot.utils.flight_recorder",
+        "blackjack_bot.sim",
+        "blackjack_bot.sim.engine",
+        "blackjack_bot.sim.frames",
+        "blackjack_bot.sim.table",
+        "blackjack_bot.tools",
+        "blackjack_bot.tools.bakeoff",
+        "blackjack_bot.tools.bench",
+        "blackjack_bot.tools.sweep",
+        "blackjack_bot.utils.event_log",
+        "blackjack_bot.history",
+        "blackjack_bot.history.store",
+        "blackjack_bot.history.audit",
     ]
 
     for module in hidden_imports:
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+from PIL import ImageGrab
+
+# Shared full-screen frame for multi-table mode. Off by default: every grab
+# goes straight to ImageGrab like before.
+_lock = threading.Lock()
+_local = threading.local()
+_max_age = None
+_frame = None
+_frame_time = 0.0
+_source = None
+full_grabs = 0
+
+
+def enable_shared_frame(max_age=0.05):
+    """Serve every grab from one full-screen capture at most max_age seconds old.
+    Bboxes must be on the primary screen."""
+    global _max_age
+    _max_age = max_age
+
+
+def mark_click():
+    """Frames captured before this thread's last click are stale for it"""
+    require_new_frame()
+
+
+def require_new_frame():
+    """This thread's next grab captures the screen again instead of reusing
+    the shared frame, e.g. to re-read a region that may have been misread"""
+    _local.stale_before = time.perf_counter()
+
+
+def set_frame_source(source):
+    """Serve grabs from source(), a callable returning a full-screen RGB array,
+    instead of the screen. None goes back to the screen."""
+    global _source
+    _source = source
+
+
+def set_grab_listener(listener):
+    """Call listener(bbox, img) after every grab made by this thread, None to stop"""
+    _local.listener = listener
+
+
+def grab(bbox):
+    """RGB array of a screen region"""
+    x1, y1, x2, y2 = bbox
+    if _source is not None:
+        img = _source()[y1:y2, x1:x2]
+    elif _max_age is None:
+        img = np.array(ImageGrab.grab(bbox=bbox))
+    else:
+        img = _current_frame()[y1:y2, x1:x2]
+    listener = getattr(_local, "listener", None)
+    if listener is not None:
+        listener(bbox, img)
+    return img
+
+
+def _current_frame():
+    global _frame, _frame_time, full_grabs
+    stale_before = getattr(_local, "stale_before", 0.0)
+    with _lock:
+        now = time.perf_counter()
+        if (
+            _frame is None
+            or now - _frame_time > _max_age
+            or _frame_time <= stale_before
+        ):
+            _frame = np.array(ImageGrab.grab())
+            _frame_time = now
+            full_grabs += 1
+        return _frame
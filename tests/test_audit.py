@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from blackjack_bot.history.audit import (
+    ACTIONS,
+    HIT,
+    MISREADS,
+    PLAYER_READS,
+    STAND,
+    SURRENDER,
+    audit_decisions,
+    build_deviations,
+    build_transitions,
+)
+from blackjack_bot.history.store import (
+    CTX_DEVIATIONS,
+    CTX_FIRST,
+    DECISION_DTYPE,
+)
+from blackjack_bot.strategy.generator import DEALER_COLUMNS
+
+TRANSITIONS = build_transitions()
+
+
+@pytest.fixture
+def expected():
+    """Every spot says stand"""
+    return np.full(
+        (3, 2, 2, len(PLAYER_READS), len(DEALER_COLUMNS)), STAND, dtype=np.uint8
+    )
+
+
+@pytest.fixture
+def ev():
+    """Standing is worth 0, every other action costs 0.1"""
+    values = np.full((len(PLAYER_READS), len(DEALER_COLUMNS), len(ACTIONS)), -0.1)
+    values[:, :, STAND] = 0.0
+    return values
+
+
+def decisions(*rows):
+    """rows of (time, hand, table, player, action, context)"""
+    return np.array(
+        [
+            (t, hand, table, 0, player, "10", context, action)
+            for t, hand, table, player, action, context in rows
+        ],
+        dtype=DECISION_DTYPE,
+    )
+
+
+def test_empty(expected, ev):
+    result = audit_decisions(decisions(), expected, ev, TRANSITIONS)
+    assert result.decisions == 0
+    assert result.misplays == 0
+
+
+def test_misplay_is_counted_and_costed(expected, ev):
+    rows = decisions((1.0, 1, 0, "16", "H", CTX_FIRST), (5.0, 2, 0, "17", "S", 0))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS)
+    assert result.decisions == 2
+    assert result.misplays == 1
+    assert result.misplay_cost == pytest.approx(0.1)
+    p, d = PLAYER_READS.index("16"), DEALER_COLUMNS.index("10")
+    assert result.cells[p, d, STAND, HIT] == 1
+
+
+def test_deviation_is_not_a_misplay(expected, ev):
+    deviations = build_deviations({("hard", "16", "10"): ("<", 0, "H")})
+    rows = decisions((1.0, 1, 0, "16", "H", CTX_FIRST | CTX_DEVIATIONS))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS, deviations)
+    assert result.misplays == 0
+    assert result.deviation_plays == 1
+
+
+def test_mismatch_without_an_index_is_a_misplay(expected, ev):
+    deviations = build_deviations({("hard", "16", "10"): ("<", 0, "H")})
+    rows = decisions(
+        (1.0, 1, 0, "16", "D", CTX_FIRST | CTX_DEVIATIONS),
+        (5.0, 2, 0, "15", "H", CTX_FIRST | CTX_DEVIATIONS),
+    )
+    result = audit_decisions(rows, expected, ev, TRANSITIONS, deviations)
+    assert result.misplays == 2
+    assert result.deviation_plays == 0
+
+
+def test_index_turning_an_option_off(expected, ev):
+    expected[:, :, :, PLAYER_READS.index("15"), DEALER_COLUMNS.index("10")] = SURRENDER
+    deviations = build_deviations({("surrender", "15", "10"): ("<", 0, 0)})
+    rows = decisions((1.0, 1, 0, "15", "H", CTX_FIRST | CTX_DEVIATIONS))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS, deviations)
+    assert result.deviation_plays == 1
+
+
+def test_unreadable_rows(expected, ev):
+    rows = decisions((1.0, 1, 0, "??", "H", CTX_FIRST))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS)
+    assert result.unreadable == 1
+    assert result.misplays == 0
+
+
+def test_soft_total_read_as_hard(expected, ev):
+    # A soft 17 read as 17, then 12 after drawing a 5
+    rows = decisions((1.0, 1, 0, "17", "H", CTX_FIRST), (2.0, 1, 0, "12", "S", 0))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS)
+    assert result.misreads[MISREADS.index("soft read as hard")] == 1
+
+
+def test_tables_are_paired_separately(expected, ev):
+    # Table 1's read lands between table 0's hit and its next read
+    rows = decisions(
+        (1.0, 1, 0, "12", "H", CTX_FIRST),
+        (1.5, 1, 1, "4", "H", CTX_FIRST),
+        (2.0, 1, 0, "19", "S", 0),
+        (2.5, 1, 1, "9", "S", 0),
+    )
+    result = audit_decisions(rows, expected, ev, TRANSITIONS)
+    assert result.misreads.sum() == 0
+
+
+def test_rows_past_owned_only_follow_a_hit(expected, ev):
+    rows = decisions((1.0, 1, 0, "17", "H", CTX_FIRST), (2.0, 1, 0, "12", "H", 0))
+    result = audit_decisions(rows, expected, ev, TRANSITIONS, owned=1)
+    assert result.decisions == 1
+    assert result.misplays == 1
+    assert result.misreads[MISREADS.index("soft read as hard")] == 1
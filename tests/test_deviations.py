@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pytest
+
+from blackjack_bot.strategy.deviations import DeviationEngine, RunningCount
+
+DEVIATIONS = os.path.join(os.path.dirname(__file__), "..", "Deviations.txt")
+
+
+def test_running_count_tags():
+    count = RunningCount(decks=1)
+    for value in (2, 5, 7, 10, 1):
+        count.add_card(value)
+    assert count.running == 0
+    count.add_card(6)
+    assert count.running == 1
+
+
+def test_true_count_uses_decks_left():
+    count = RunningCount(decks=2, cards_per_round=52)
+    count.new_round()
+    for _ in range(4):
+        count.add_card(5)
+    count.new_round()
+    # One deck's worth of rounds estimated dealt, one left
+    assert count.cards_dealt == 52
+    assert count.true_count() == pytest.approx(4.0)
+
+
+def test_round_counts_the_cards_seen_when_more_than_the_estimate():
+    count = RunningCount(decks=8, cards_per_round=2)
+    count.new_round()
+    for _ in range(5):
+        count.add_card(9)
+    count.new_round()
+    assert count.cards_dealt == 5
+
+
+def test_count_resets_at_the_cut_card():
+    count = RunningCount(decks=1, penetration=0.5, cards_per_round=10)
+    count.new_round()
+    count.add_card(3)
+    for _ in range(2):
+        count.new_round()
+    assert count.running == 1
+    count.new_round()  # 30 cards estimated dealt, the cut card is at 26
+    assert count.running == 0
+    assert count.shuffles == 1
+
+
+def engine(**kwargs):
+    entries = {
+        ("hard", "16", "10"): (">=", 0, "S"),
+        ("hard", "12", "4"): ("<", 0, "H"),
+    }
+    return DeviationEngine(entries, decks=1, **kwargs)
+
+
+def test_lookup_at_zero_count():
+    deviations = engine()
+    assert deviations.lookup("hard", "16", "10", "H") == "S"
+    assert deviations.lookup("hard", "12", "4", "S") == "S"
+    assert deviations.deviations_applied == 1
+
+
+def test_lookup_follows_the_true_count():
+    deviations = engine()
+    deviations.add_card(10)
+    assert deviations.lookup("hard", "16", "10", "H") == "H"
+    assert deviations.lookup("hard", "12", "4", "S") == "H"
+
+
+def test_hand_start_counts_only_the_dealer_upcard():
+    deviations = engine()
+    deviations.observe_hand_start("3_13", "10")
+    assert deviations.count.running == -1
+    deviations.observe_hand_start("15", "1_11")
+    assert deviations.count.running == -2
+    deviations.observe_hand_start("8_18", "5")
+    assert deviations.count.running == -1
+
+
+def test_count_over_a_fair_shoe_averages_zero():
+    """Late in the shoe, where the reads used to leave it near -2.5"""
+    rng = np.random.default_rng(7)
+    cards = [min(rank, 10) for rank in range(1, 14)] * 4 * 8
+    finals = []
+    for _ in range(1000):
+        shoe = rng.permutation(cards)
+        deviations = DeviationEngine({}, decks=8, penetration=0.75)
+        position = 0
+        # 55 rounds is about 300 cards, just short of the cut card
+        for _ in range(55):
+            # Player, dealer, player, hole card, then about 1.4 cards drawn
+            player = shoe[position] + shoe[position + 2]
+            soft = 1 in (shoe[position], shoe[position + 2])
+            upcard = shoe[position + 1]
+            deviations.observe_hand_start(
+                f"{player}_{player + 10}" if soft and player <= 11 else str(player),
+                "1_11" if upcard == 1 else str(upcard),
+            )
+            position += 5 + int(rng.random() < 0.4)
+        finals.append(deviations.count.running)
+    assert abs(np.mean(finals)) < 0.6
+
+
+def test_from_file_reads_every_table():
+    deviations = DeviationEngine.from_file(DEVIATIONS)
+    assert deviations.entries[("hard", "16", "10")] == (">=", 0, "S")
+    assert deviations.entries[("split", "20", "5")] == (">=", 5, True)
+    assert deviations.entries[("surrender", "15", "10")] == ("<", 0, False)
@@ -0,0 +1,65 @@
+from blackjack_bot.game.hand_validator import HandValidator, totals_after_hit
+
+
+def test_hard_total_only_grows():
+    totals = totals_after_hit("16")
+    assert totals == {str(total) for total in range(17, 27)}
+
+
+def test_hard_total_turns_soft_only_with_an_ace():
+    totals = totals_after_hit("6")
+    assert "7_17" in totals
+    assert {"8", "16"} <= totals
+    assert not any("_" in total for total in totals - {"7_17"})
+
+
+def test_soft_total_can_turn_hard():
+    totals = totals_after_hit("5_15")
+    assert {"6_16", "10_20", "21", "12", "15"} <= totals
+    assert "5_15" not in totals
+
+
+def test_reads_pass_until_the_bot_hits():
+    validator = HandValidator()
+    assert validator.check_player("12")
+    assert validator.check_player("4")
+
+
+def test_impossible_read_after_hit_is_rejected():
+    validator = HandValidator()
+    validator.hit("12")
+    assert validator.check_player("12")  # The card hasn't landed yet
+    assert validator.check_player("19")
+    assert not validator.check_player("11")
+    assert validator.player_rejected == 1
+
+
+def test_other_hands_are_not_checked():
+    validator = HandValidator()
+    validator.hit("12", hand_index=0)
+    assert validator.check_player("4", hand_index=1)
+
+
+def test_consistent_read_after_a_rejection_counts_as_prevented():
+    validator = HandValidator()
+    validator.hit("12")
+    assert not validator.check_player("11")
+    assert validator.check_player("15")
+    assert validator.prevented == 1
+
+
+def test_repeated_value_is_trusted():
+    validator = HandValidator(trust_after=3)
+    validator.hit("12")
+    assert not validator.check_player("11")
+    assert not validator.check_player("11")
+    assert validator.check_player("11")
+    assert validator.trusted == 1
+    assert validator.hit_on is None
+
+
+def test_new_round_forgets_the_hand():
+    validator = HandValidator()
+    validator.hit("12")
+    validator.new_round()
+    assert validator.check_player("4")
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from blackjack_bot.enums import Action
+from blackjack_bot.history.store import (
+    FLAG_DOUBLE,
+    HEADER_DTYPE,
+    HAND_DTYPE,
+    HandHistory,
+    HandRecord,
+    list_months,
+    load_month,
+    month_path,
+)
+
+STARTED = datetime(2026, 1, 15, 12).timestamp()
+
+
+def hand(number: int, table: int = 0) -> HandRecord:
+    return HandRecord(number, "11", "6", 0.99, 0.98, started_at=STARTED, table=table)
+
+
+def write(folder, *hands):
+    history = HandHistory(str(folder))
+    for record in hands:
+        history.record(record)
+    history.close()
+
+
+def test_round_trip(tmp_path):
+    record = hand(1, table=2)
+    record.add_action(Action.DOUBLE, 0.004)
+    record.final_player = "21"
+    write(tmp_path, record)
+
+    rows = load_month(str(tmp_path), "2026-01")
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["hand"] == 1
+    assert row["table"] == 2
+    assert row["player"] == b"11"
+    assert row["final_player"] == b"21"
+    assert row["actions"] == b"D"
+    assert row["flags"] == FLAG_DOUBLE
+    assert row["decide_ms"] == pytest.approx(4.0)
+    assert list_months(str(tmp_path)) == ["2026-01"]
+
+
+def test_appends_to_an_existing_month(tmp_path):
+    write(tmp_path, hand(1))
+    write(tmp_path, hand(2), hand(3))
+    assert list(load_month(str(tmp_path), "2026-01")["hand"]) == [1, 2, 3]
+
+
+def test_partial_record_is_ignored_then_dropped(tmp_path):
+    write(tmp_path, hand(1))
+    path = month_path(str(tmp_path), "2026-01")
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (HAND_DTYPE.itemsize // 2))
+    assert list(load_month(str(tmp_path), "2026-01")["hand"]) == [1]
+
+    write(tmp_path, hand(2))
+    assert list(load_month(str(tmp_path), "2026-01")["hand"]) == [1, 2]
+    assert os.path.getsize(path) == HEADER_DTYPE.itemsize + 2 * HAND_DTYPE.itemsize
+
+
+def test_missing_month_is_empty(tmp_path):
+    rows = load_month(str(tmp_path), "2020-01")
+    assert rows.dtype == HAND_DTYPE
+    assert len(rows) == 0
+
+
+def test_other_version_is_rejected(tmp_path):
+    write(tmp_path, hand(1))
+    path = month_path(str(tmp_path), "2026-01")
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    header["version"] = 99
+    with open(path, "r+b") as f:
+        header.tofile(f)
+    with pytest.raises(ValueError):
+        load_month(str(tmp_path), "2026-01")
+
+
+def test_decisions_carry_hand_and_table(tmp_path):
+    history = HandHistory(str(tmp_path))
+    record = hand(7, table=1)
+    history.record_decision(record, "11", "6", 1, Action.DOUBLE)
+    record.add_action(Action.DOUBLE)
+    history.record_decision(record, "21", "6", 0, Action.NONE)
+    history.close()
+
+    rows = load_month(str(tmp_path), kind="decisions")
+    assert len(rows) == 1
+    assert (rows[0]["hand"], rows[0]["table"], rows[0]["step"]) == (7, 1, 0)
+    assert rows[0]["action"] == b"D"
@@ -0,0 +1,60 @@
+import pytest
+
+from blackjack_bot.enums import GamePhase
+from blackjack_bot.game import poll_scheduler
+from blackjack_bot.game.poll_scheduler import PollScheduler
+
+BOUNDS = {GamePhase.ACTIVE_GAME: (0.01, 0.1)}
+
+
+class Clock:
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(poll_scheduler.time, "perf_counter", lambda: clock.wall)
+    monkeypatch.setattr(poll_scheduler.time, "process_time", lambda: clock.cpu)
+    return clock
+
+
+def test_polls_fast_until_a_change_is_seen(clock):
+    scheduler = PollScheduler(BOUNDS)
+    assert scheduler.next_interval(GamePhase.ACTIVE_GAME, False) == 0.01
+
+
+def test_change_polls_again_straight_away(clock):
+    scheduler = PollScheduler(BOUNDS)
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, False)
+    clock.wall = 1.0
+    assert scheduler.next_interval(GamePhase.ACTIVE_GAME, True) == 0.0
+
+
+def test_interval_follows_the_change_rate(clock):
+    scheduler = PollScheduler(BOUNDS, polls_per_change=20, smoothing=1.0)
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, False)
+    clock.wall = 0.6
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, True)
+    assert scheduler.interval(GamePhase.ACTIVE_GAME) == pytest.approx(0.03)
+
+
+def test_interval_stays_within_the_phase_bounds(clock):
+    scheduler = PollScheduler(BOUNDS, smoothing=1.0)
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, False)
+    clock.wall = 100.0
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, True)
+    assert scheduler.interval(GamePhase.ACTIVE_GAME) == 0.1
+
+
+def test_cpu_budget_throttles_and_recovers(clock):
+    scheduler = PollScheduler(BOUNDS, cpu_budget=0.25)
+    clock.wall, clock.cpu = 1.0, 0.9
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, False)
+    assert scheduler.throttle == pytest.approx(1.25)
+    assert scheduler.interval(GamePhase.ACTIVE_GAME) == pytest.approx(0.0125)
+    clock.wall = 2.0
+    scheduler.next_interval(GamePhase.ACTIVE_GAME, False)
+    assert scheduler.throttle == 1.0
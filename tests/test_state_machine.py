@@ -0,0 +1,84 @@
+from blackjack_bot.enums import Detector, Event, GamePhase
+from blackjack_bot.game.state_machine import GameStateMachine
+
+
+def test_starts_dealing_with_the_full_scan():
+    machine = GameStateMachine()
+    assert machine.phase == GamePhase.DEALING
+    assert machine.needs(Detector.BUTTONS)
+    assert not machine.needs(Detector.REBET)
+
+
+def test_hand_cycle():
+    machine = GameStateMachine(debounced={})
+    assert machine.fire(Event.GAMEPLAY_BUTTONS)
+    assert machine.phase == GamePhase.ACTIVE_GAME
+    assert machine.fire(Event.CARD_REQUESTED)
+    assert machine.phase == GamePhase.WAITING_FOR_CARD_CHANGE
+    assert machine.fire(Event.PLAYER_CHANGED)
+    assert machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.phase == GamePhase.HAND_COMPLETE
+    assert machine.fire(Event.REBET_AVAILABLE)
+    assert machine.fire(Event.REBET_CLICKED)
+    assert machine.phase == GamePhase.DEALING
+    assert machine.transition_count == 6
+
+
+def test_bust_while_waiting_for_the_card_completes_the_hand():
+    machine = GameStateMachine()
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    machine.fire(Event.CARD_REQUESTED)
+    assert machine.needs(Detector.BUTTONS)
+    machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.phase == GamePhase.HAND_COMPLETE
+
+
+def test_events_without_a_transition_are_ignored():
+    machine = GameStateMachine()
+    assert not machine.fire(Event.PLAYER_CHANGED)
+    assert machine.phase == GamePhase.DEALING
+    assert machine.transition_count == 0
+
+
+def test_debounced_event_needs_consecutive_ticks():
+    machine = GameStateMachine()
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    assert not machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert not machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.phase == GamePhase.HAND_COMPLETE
+
+
+def test_other_event_breaks_the_streak():
+    machine = GameStateMachine()
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    assert not machine.fire(Event.NO_GAMEPLAY_BUTTONS)
+    assert machine.phase == GamePhase.ACTIVE_GAME
+
+
+def test_timeout_fires_once_the_phase_runs_too_long():
+    machine = GameStateMachine()
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    machine.fire(Event.CARD_REQUESTED)
+    assert not machine.check_timeout()
+    machine.entered_at -= 10
+    assert machine.check_timeout()
+    assert machine.phase == GamePhase.ACTIVE_GAME
+
+
+def test_listeners_see_every_move_and_resync():
+    machine = GameStateMachine()
+    moves = []
+    machine.on_transition(lambda *move: moves.append(move))
+    machine.fire(Event.GAMEPLAY_BUTTONS)
+    machine.resync()
+    machine.resync()
+    assert moves == [
+        (GamePhase.DEALING, GamePhase.ACTIVE_GAME, Event.GAMEPLAY_BUTTONS),
+        (GamePhase.ACTIVE_GAME, GamePhase.DEALING, None),
+    ]